@@ -0,0 +1,222 @@
+# batch.py  –  Student Project AI Workflow, headless batch mode
+#
+# Scaffolds, timelines, branding, task plans and submission reports for many
+# projects at once, with the same folder layout as the Streamlit app.
+#
+#   python "Day 10/batch.py" projects.csv --out-dir cohort --workers 8 --rpm 15
+#
+# Input is CSV or JSONL with one project per row/line. Columns:
+#   title, students (comma-separated), department, domain        (required)
+#   duration_weeks, team_roles, feedback, project_dir, final_report (optional)
+#
+# project_dir (default: the slugified title) must stay inside --out-dir and be
+# unique: rows that would share a folder stop the batch before anything runs.
+#
+# Finished projects are appended to <out-dir>/batch_checkpoint.jsonl; a re-run
+# skips them, so an interrupted batch resumes where it stopped. Per-project
+# traces go to --trace-file (JSONL) and totals to --metrics-file (Prometheus).
+# --bundle reports.zip streams every finished project's report files, plus
+# one consolidated PDF with a page per project, into a single ZIP.
+
+import argparse
+import csv
+import json
+import os
+import re
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agentkit import tracing
+from agentkit.llm_client import is_transient
+from agentkit.ratelimit import retry
+from agentkit.reports import consolidated_pdf, iter_zip
+from project_pipeline import load_agents, make_project, run_project
+
+REQUIRED = ["title", "students", "department", "domain"]
+CHECKPOINT_FILE = "batch_checkpoint.jsonl"
+
+# === INPUT ===
+def read_projects(path):
+    if path.endswith(".jsonl"):
+        with open(path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f if line.strip()]
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        return list(csv.DictReader(f))
+
+def slugify(text):
+    return re.sub(r"[^a-z0-9]+", "_", text.lower()).strip("_") or "project"
+
+def to_project(row, out_dir):
+    row = {k.strip(): (v.strip() if isinstance(v, str) else v) for k, v in row.items() if k}
+    row.setdefault("students", row.get("student_names", ""))
+    missing = [field for field in REQUIRED if not row.get(field)]
+    if missing:
+        raise ValueError(f"missing {', '.join(missing)}")
+    name = row.get("project_dir") or slugify(row["title"])
+    project_dir = os.path.normpath(os.path.join(out_dir, name))
+    root = os.path.realpath(out_dir)
+    real = os.path.realpath(project_dir)
+    if real == root or os.path.commonpath([root, real]) != root:
+        raise ValueError(f"project_dir {name!r} is outside --out-dir")
+    project = make_project(
+        project_dir,
+        row["title"],
+        row["students"],
+        row.get("duration_weeks") or 8,
+        row["department"],
+        row["domain"],
+        team_roles=row.get("team_roles", ""),
+        feedback=row.get("feedback", ""),
+    )
+    return project, row.get("final_report") or None
+
+def shared_dirs(projects):
+    """``{project_dir: [row numbers]}`` for folders claimed by more than one row."""
+    rows = {}
+    for line_no, project in projects:
+        rows.setdefault(os.path.realpath(project["project_dir"]), []).append(line_no)
+    return {project_dir: line_nos for project_dir, line_nos in rows.items() if len(line_nos) > 1}
+
+# === CHECKPOINT ===
+class Checkpoint:
+    """Append-only JSONL log of finished projects, safe across worker threads."""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self.done = set()
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    if line.strip():
+                        record = json.loads(line)
+                        if record.get("status") == "done":
+                            self.done.add(record["project_dir"])
+
+    def record(self, **record):
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(record) + "\n")
+            if record.get("status") == "done":
+                self.done.add(record["project_dir"])
+
+# === BUNDLE ===
+def bundle_entries(project_dirs, out_dir):
+    """ZIP entries: each project's report .txt/.pdf, then one consolidated PDF."""
+    pages = []
+    for project_dir in sorted(project_dirs):
+        base = os.path.join(project_dir, "submission_report")
+        if not os.path.exists(base + ".txt"):
+            continue
+        name = os.path.relpath(project_dir, out_dir)
+        with open(base + ".txt", "r", encoding="utf-8") as f:
+            pages.append(f"Project: {name}\n{f.read()}")
+        yield f"{name}/submission_report.txt", base + ".txt"
+        yield f"{name}/submission_report.pdf", base + ".pdf"
+    yield "all_submission_reports.pdf", consolidated_pdf(pages)
+
+def write_bundle(path, project_dirs, out_dir):
+    with open(path, "wb") as f:
+        for chunk in iter_zip(bundle_entries(project_dirs, out_dir)):
+            f.write(chunk)
+
+# === RUN ===
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the Day 10 project agents for many projects.")
+    parser.add_argument("input", help="CSV or JSONL file of project metadata")
+    parser.add_argument("--out-dir", default="projects", help="where project folders are created")
+    parser.add_argument("--api-key", default=os.environ.get("GOOGLE_API_KEY"), help="Gemini API key (default: $GOOGLE_API_KEY)")
+    parser.add_argument("--workers", type=int, default=4, help="projects processed concurrently")
+    parser.add_argument("--rpm", type=float, default=15, help="Gemini requests per minute quota")
+    parser.add_argument("--retries", type=int, default=2,
+                        help="retries per agent on transient API errors (on top of the client's own)")
+    parser.add_argument("--trace-file", help="append one JSON trace per project to this file")
+    parser.add_argument("--metrics-file", help="write Prometheus metrics here when the batch ends")
+    parser.add_argument("--bundle", help="write all finished projects' reports to this ZIP")
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error("no API key: pass --api-key or set GOOGLE_API_KEY")
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    checkpoint = Checkpoint(os.path.join(args.out_dir, CHECKPOINT_FILE))
+
+    rows = []
+    for line_no, row in enumerate(read_projects(args.input), start=1):
+        try:
+            rows.append((line_no, *to_project(row, args.out_dir)))
+        except ValueError as exc:
+            print(f"⚠️  row {line_no}: skipped ({exc})", file=sys.stderr)
+    # Two rows in one folder would overwrite each other's files and share a
+    # checkpoint entry, so the second would be skipped on resume.
+    clashes = shared_dirs((line_no, project) for line_no, project, _ in rows)
+    for project_dir, line_nos in clashes.items():
+        print(f"❌ rows {', '.join(map(str, line_nos))} all write to {project_dir}: "
+              "give them distinct project_dir values", file=sys.stderr)
+    if clashes:
+        return 2
+    jobs = [(project, final_report) for _, project, final_report in rows
+            if project["project_dir"] not in checkpoint.done]
+
+    print(f"📋 {len(jobs)} projects to run ({len(checkpoint.done)} already done)")
+    if not jobs:
+        if args.bundle:
+            write_bundle(args.bundle, checkpoint.done, args.out_dir)
+            print(f"📦 {len(checkpoint.done)} project reports bundled in {args.bundle}")
+        return 0
+
+    # Every worker shares one client and one bucket, so throughput is capped
+    # by the API quota no matter how many workers run. The client retries
+    # 429s before the first token; the node retry below covers the rest
+    # (e.g. a stream that breaks halfway). Only transient API errors are
+    # retried: a reply that fails validation (StructuredOutputError) or a
+    # missing file would fail the same way again.
+    agents = load_agents(args.api_key, rpm=args.rpm, burst=max(1, args.workers))
+
+    def log_retry(attempt, exc, delay):
+        print(f"   ↻ retry {attempt} in {delay:.1f}s: {exc}", file=sys.stderr)
+
+    with_retries = retry(retries=args.retries, retry_if=is_transient, on_retry=log_retry)
+
+    def run_one(project, final_report):
+        data = None
+        if final_report:
+            with open(final_report, "rb") as f:
+                data = f.read()
+        with tracing.trace("project_workflow", title=project["title"]) as project_trace:
+            timings = run_project(project, agents, final_report=data, wrap_node=with_retries)
+        if args.trace_file:
+            tracing.write_jsonl(project_trace, args.trace_file)
+        return timings
+
+    failures = 0
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        futures = {pool.submit(run_one, project, report): project for project, report in jobs}
+        for i, future in enumerate(as_completed(futures), start=1):
+            project = futures[future]
+            try:
+                timings = future.result()
+            except Exception as exc:
+                failures += 1
+                checkpoint.record(project_dir=project["project_dir"], status="failed", error=str(exc))
+                print(f"❌ [{i}/{len(jobs)}] {project['title']}: {exc}", file=sys.stderr)
+                continue
+            checkpoint.record(project_dir=project["project_dir"], status="done", timings=timings)
+            print(f"✅ [{i}/{len(jobs)}] {project['title']} ({timings['total']:.1f}s)")
+
+    elapsed = time.perf_counter() - start
+    print(f"🏁 {len(jobs) - failures} done, {failures} failed in {elapsed:.0f}s")
+    if args.bundle:
+        write_bundle(args.bundle, checkpoint.done, args.out_dir)
+        print(f"📦 {len(checkpoint.done)} project reports bundled in {args.bundle}")
+    if args.metrics_file:
+        with open(args.metrics_file, "w", encoding="utf-8") as f:
+            f.write(tracing.metrics.prometheus_text())
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
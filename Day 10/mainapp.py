@@ -1,16 +1,22 @@
 import streamlit as st
 import os
-import json
-from datetime import datetime
-from fpdf import FPDF
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain.prompts import PromptTemplate
-from langchain.chains import LLMChain, RetrievalQA
-from langchain.document_loaders import TextLoader
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain.vectorstores import FAISS
-from langchain.embeddings import HuggingFaceEmbeddings
-import re
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agentkit import tracing
+from agentkit.dag import run_dag
+from agentkit.debug_panel import render_debug_panel
+from agentkit.streaming import TokenBuffer
+from project_pipeline import (
+    build_checklist,
+    build_pipeline,
+    create_scaffold,
+    format_timeline,
+    load_agents,
+    make_project,
+    save_final_report,
+    write_submission_report,
+)
 
 st.set_page_config(page_title="Student Project AI Workflow", layout="wide")
 
@@ -36,10 +42,6 @@ st.markdown("""
     </style>
 """, unsafe_allow_html=True)
 
-# Emoji remover for PDF compatibility
-def remove_emojis(text):
-    return re.sub(r'[^\x00-\x7F]+', '', text)
-
 st.title("🤖 Student Project AI Workflow")
 
 API_KEY = st.text_input("🔑 Enter your Gemini API Key", type="password")
@@ -60,158 +62,81 @@ if generate_button:
     if not all([API_KEY, title, student_names, department, domain]):
         st.error("Please fill in all required fields.")
     else:
-        os.makedirs(project_dir, exist_ok=True)
-        for folder in ['docs', 'assets', 'src', 'report']:
-            os.makedirs(os.path.join(project_dir, folder), exist_ok=True)
-
-        team = [name.strip() for name in student_names.split(",")]
-        metadata = {
-            "title": title,
-            "team": team,
-            "duration_weeks": duration_weeks,
-            "department": department,
-            "domain": domain,
-            "created_at": datetime.now().isoformat()
-        }
-
-        with open(os.path.join(project_dir, "metadata.json"), "w") as f:
-            json.dump(metadata, f, indent=4)
-
-        with open(os.path.join(project_dir, "README.md"), "w") as f:
-            f.write(f"# {title}\n\n**Department**: {department}\n**Domain**: {domain}\n**Team**: {', '.join(team)}\n**Duration**: {duration_weeks} weeks")
-
-        with open(os.path.join(project_dir, "timeline.txt"), "w") as f:
-            f.write("WEEK 1: Project kickoff, literature review\nWEEK 2: Finalize problem statement")
-
-        st.success("✅ Project scaffold created.")
-
-        # Timeline Agent
-        loader = TextLoader(os.path.join(project_dir, "README.md"))
-        docs = loader.load()
-        splitter = RecursiveCharacterTextSplitter(chunk_size=500, chunk_overlap=50)
-        chunks = splitter.split_documents(docs)
-        embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
-        vectordb = FAISS.from_documents(chunks, embeddings)
-        retriever = vectordb.as_retriever()
-
-        llm = ChatGoogleGenerativeAI(model="gemini-2.0-flash", google_api_key=API_KEY)
-        qa_chain = RetrievalQA.from_chain_type(llm=llm, retriever=retriever)
-
-        prompt = f"""
-You are an academic timeline generator. Create 3–5 project phases for:
-- Title: {title}
-- Domain: {domain}
-Each phase must include: name, goal, start_week, and end_week.
-Return in plain text format.
-"""
-        timeline_text = qa_chain.run(prompt)
-        with open(os.path.join(project_dir, "timeline_detailed.txt"), "w") as f:
-            f.write(timeline_text)
-        st.text_area("📅 Timeline Output", timeline_text, height=250, key="timeline_output")
-
-        # Branding Agent
-        timeline_summary = timeline_text.replace("\n", " ")
-        branding_template = PromptTemplate(
-            input_variables=["title", "domain", "team", "timeline"],
-            template="""
-You are a branding assistant.
-Project Title: {title}
-Domain: {domain}
-Team: {team}
-Timeline: {timeline}
-Generate:
-1. LinkedIn post
-2. GitHub README additions
-3. Resume bullets
-4. One-paragraph case booklet summary
-"""
-        )
-
-        branding_chain = LLMChain(llm=llm, prompt=branding_template)
-        branding_output = branding_chain.run(
-            title=title,
-            domain=domain,
-            team=", ".join(team),
-            timeline=timeline_summary
+        project = make_project(
+            project_dir, title, student_names, duration_weeks, department, domain,
+            team_roles=team_roles, feedback=feedback_input,
         )
+        create_scaffold(project)
+        st.success("✅ Project scaffold created.")
 
-        with open(os.path.join(project_dir, "branding_output.txt"), "w", encoding="utf-8") as f:
-            f.write(branding_output)
-        st.text_area("🎨 Branding Output", branding_output, height=300, key="branding_output")
-
-        # Task Agent
-        task_template = PromptTemplate(
-            input_variables=["title", "domain", "team_roles", "feedback"],
-            template="""
-Project Title: {title}
-Domain: {domain}
-Roles & Skills:
-{team_roles}
-Feedback:
-{feedback}
-Create a detailed task plan and timeline update as readable text.
-"""
-        )
+        # Save uploaded report first so the agents can use it as context
+        if uploaded_pdf:
+            save_final_report(project, uploaded_pdf.getvalue())
+            st.success("✅ Final report uploaded to /report")
 
-        task_chain = LLMChain(llm=llm, prompt=task_template)
-        task_output = task_chain.run(
-            title=title,
-            domain=domain,
-            team_roles=team_roles,
-            feedback=feedback_input
-        )
+        # Agents over one shared rate-limited client, built once per key and
+        # process: they queue for the key's quota together and 429s are
+        # retried instead of failing the run.
+        agents = load_agents(API_KEY)
 
-        with open(os.path.join(project_dir, "task_plan.txt"), "w", encoding="utf-8") as f:
-            f.write(task_output)
-        st.text_area("🧩 Task Plan Output", task_output, height=300, key="task_plan_output")
-
-        # Checklist & Summary
-        checklist = {
-            "README.md created": True,
-            "Project folders organized": True,
-            "metadata.json present": True,
-            "timeline_detailed.txt generated": True,
-            "branding_output.txt available": True,
-            "Final report added in /report": bool(uploaded_pdf),
-            "Assets uploaded in /assets": True
+        # Output slots in pipeline order; each is filled as its agent finishes
+        slots = {
+            "timeline": st.empty(),
+            "branding": st.empty(),
+            "tasks": st.empty(),
         }
-
-        summary_text = f"""
-📋 Student Project Submission Report
-Generated at: {datetime.now().isoformat()}
-
-✔️ Completed:
-"""
-        for item, done in checklist.items():
-            if done:
-                summary_text += f"- {item}\n"
-
-        summary_text += "\n❌ Missing:\n"
-        for item, done in checklist.items():
-            if not done:
-                summary_text += f"- {item}\n"
-
-        # Clean and write
-        clean_summary = remove_emojis(summary_text)
-
-        with open(os.path.join(project_dir, "submission_report.txt"), "w", encoding="utf-8") as f:
-            f.write(summary_text)
-
-        pdf = FPDF()
-        pdf.add_page()
-        pdf.set_font("Arial", size=12)
-        for line in clean_summary.split("\n"):
-            pdf.cell(200, 10, txt=line, ln=True)
-
-        pdf_path = os.path.join(project_dir, "submission_report.pdf")
-        pdf.output(pdf_path)
+        OUTPUTS = {
+            "timeline": ("📅 Timeline Output", 250, "timeline_output"),
+            "branding": ("🎨 Branding Output", 300, "branding_output"),
+            "tasks": ("🧩 Task Plan Output", 300, "task_plan_output"),
+        }
+        # Agents run on worker threads and stream tokens into these buffers;
+        # the script thread renders them while it waits.
+        buffers = {name: TokenBuffer() for name in OUTPUTS}
+        ttfts = {}
+        finished = set()
+
+        def show_output(name, text, seconds):
+            finished.add(name)
+            if name == "timeline":
+                # The timeline agent returns typed phases
+                text = format_timeline(text)
+            label, height, key = OUTPUTS[name]
+            with slots[name].container():
+                st.text_area(label, text, height=height, key=key)
+                ttft = ttfts.get(name)
+                first = f", first token after {ttft:.2f}s" if ttft is not None else ""
+                st.caption(f"⏱️ {seconds:.1f}s{first}")
+
+        def show_partial_outputs():
+            for name, buffer in buffers.items():
+                if name not in finished and buffer.changed():
+                    label = OUTPUTS[name][0]
+                    slots[name].markdown(f"**{label}**\n\n{buffer.text()} ▌")
+
+        for name, (label, _, _) in OUTPUTS.items():
+            slots[name].info(f"{label.split(' ', 1)[1]}: running…")
+
+        # Agents and report are spans of one trace, shown in the debug panel
+        with tracing.trace("project_workflow", title=title) as workflow_trace:
+            pipeline = build_pipeline(
+                project, agents, on_token={name: b.push for name, b in buffers.items()}, ttfts=ttfts
+            )
+            outputs, timings = run_dag(pipeline, on_done=show_output, on_tick=show_partial_outputs)
+
+            agent_seconds = sum(t for name, t in timings.items() if name != "total")
+            st.caption(
+                f"⏱️ Agents finished in {timings['total']:.1f}s wall time "
+                f"({agent_seconds:.1f}s if run one after another)"
+            )
+
+            # Checklist & Summary
+            checklist = build_checklist(project, bool(uploaded_pdf))
+            summary_text, pdf_data = write_submission_report(project, checklist)
+        st.session_state.last_trace = workflow_trace
 
         st.success("📄 Submission Report Generated")
-        st.download_button("📥 Download PDF Report", open(pdf_path, "rb"), file_name="submission_report.pdf")
+        st.download_button("📥 Download PDF Report", pdf_data, file_name="submission_report.pdf", mime="application/pdf")
         st.text_area("📋 Report Summary", summary_text, height=250, key="report_summary")
 
-        # Save uploaded report
-        if uploaded_pdf:
-            with open(os.path.join(project_dir, "report", "final_report.pdf"), "wb") as f:
-                f.write(uploaded_pdf.read())
-            st.success("✅ Final report uploaded to /report")
+render_debug_panel(st.sidebar, st.session_state.get("last_trace"))
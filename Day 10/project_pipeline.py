@@ -0,0 +1,377 @@
+# project_pipeline.py  –  Student Project AI Workflow, minus the UI
+#
+# Scaffold, agents (timeline, branding, task) and submission report for one
+# project. Used by the Streamlit app (mainapp.py) and the batch runner
+# (batch.py), so both produce exactly the same folder layout. The agents live
+# in an agent runtime (agentkit.runtime): load_agents() gives one per API key
+# and process, build_agents() one over any LLM (e.g. a benchmark stand-in).
+
+import os
+import sys
+import json
+import hashlib
+import time
+from datetime import datetime
+from typing import NamedTuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agentkit import resources, runtime, tracing
+from agentkit.context import ContextPlanner
+from agentkit.dag import Node, run_dag
+from agentkit.ingest import iter_pdf_pages
+from agentkit.reports import write_report
+from agentkit.runtime import Agent, AgentRuntime
+from agentkit.streaming import qa_prompt, stream_text
+from agentkit.structured import format_instructions, generate_structured
+
+EMBED_MODEL = "all-MiniLM-L6-v2"
+CHAT_MODEL = "gemini-2.0-flash"
+SUBFOLDERS = ["docs", "assets", "src", "report"]
+
+# Small project corpora go straight into the prompt; only big ones (e.g. a
+# long final report) are embedded, and then through the on-disk index cache.
+context_planner = ContextPlanner(token_budget=3000)
+
+TIMELINE_PROMPT = """
+You are an academic timeline generator. Create 3–5 project phases for:
+- Title: {title}
+- Domain: {domain}
+- Duration: {duration_weeks} weeks
+Each phase must include: name, goal, start_week, and end_week.
+{format_instructions}
+"""
+
+# Timeline agent output: validated JSON, kept as typed phases
+TIMELINE_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "phases": {
+            "type": "array",
+            "minItems": 3,
+            "maxItems": 5,
+            "items": {
+                "type": "object",
+                "properties": {
+                    "name": {"type": "string", "minLength": 1},
+                    "goal": {"type": "string"},
+                    "start_week": {"type": "integer", "minimum": 1},
+                    "end_week": {"type": "integer", "minimum": 1},
+                },
+                "required": ["name", "goal", "start_week", "end_week"],
+            },
+        },
+    },
+    "required": ["phases"],
+}
+
+class Phase(NamedTuple):
+    name: str
+    goal: str
+    start_week: int
+    end_week: int
+
+# Questions used to pull report passages for the timeline and task planner.
+# Only project facts go into a query: the prompt's instructions and JSON schema
+# would match report text on wording rather than on topic.
+TIMELINE_CONTEXT_QUERY = "{title}: {domain} project over {duration_weeks} weeks"
+TASK_CONTEXT_QUERY = "Current project status, open problems, results and next steps"
+
+# Prompt templates are plain format strings (one human message each), so
+# importing this module doesn't load LangChain.
+BRANDING_TEMPLATE = """
+You are a branding assistant.
+Project Title: {title}
+Domain: {domain}
+Team: {team}
+Timeline: {timeline}
+Generate:
+1. LinkedIn post
+2. GitHub README additions
+3. Resume bullets
+4. One-paragraph case booklet summary
+"""
+
+TASK_TEMPLATE = """
+Project Title: {title}
+Domain: {domain}
+Roles & Skills:
+{team_roles}
+Feedback:
+{feedback}
+Project Context:
+{context}
+Create a detailed task plan and timeline update as readable text.
+"""
+
+# === PROJECT ===
+def make_project(project_dir, title, student_names, duration_weeks, department, domain,
+                 team_roles="", feedback=""):
+    """Project metadata dict shared by every step below."""
+    if isinstance(student_names, str):
+        student_names = student_names.split(",")
+    return {
+        "project_dir": project_dir,
+        "title": title,
+        "team": [name.strip() for name in student_names if name.strip()],
+        "duration_weeks": int(duration_weeks),
+        "department": department,
+        "domain": domain,
+        "team_roles": team_roles or "",
+        "feedback": feedback or "",
+    }
+
+def create_scaffold(project):
+    project_dir = project["project_dir"]
+    os.makedirs(project_dir, exist_ok=True)
+    for folder in SUBFOLDERS:
+        os.makedirs(os.path.join(project_dir, folder), exist_ok=True)
+
+    metadata = {
+        "title": project["title"],
+        "team": project["team"],
+        "duration_weeks": project["duration_weeks"],
+        "department": project["department"],
+        "domain": project["domain"],
+        "created_at": datetime.now().isoformat()
+    }
+
+    with open(os.path.join(project_dir, "metadata.json"), "w") as f:
+        json.dump(metadata, f, indent=4)
+
+    with open(os.path.join(project_dir, "README.md"), "w") as f:
+        f.write(f"# {project['title']}\n\n**Department**: {project['department']}\n**Domain**: {project['domain']}\n**Team**: {', '.join(project['team'])}\n**Duration**: {project['duration_weeks']} weeks")
+
+    with open(os.path.join(project_dir, "timeline.txt"), "w") as f:
+        f.write("WEEK 1: Project kickoff, literature review\nWEEK 2: Finalize problem statement")
+
+def final_report_path(project):
+    return os.path.join(project["project_dir"], "report", "final_report.pdf")
+
+def save_final_report(project, data):
+    with open(final_report_path(project), "wb") as f:
+        f.write(data)
+
+def iter_project_corpus(project):
+    """README plus the uploaded final report's pages (if any), lazily."""
+    from langchain.document_loaders import TextLoader
+
+    yield from TextLoader(os.path.join(project["project_dir"], "README.md")).load()
+    if os.path.exists(final_report_path(project)):
+        # Pages are extracted by worker threads and streamed, so even a very
+        # large report is never held in memory at once.
+        yield from iter_pdf_pages(final_report_path(project))
+
+def project_corpus_key(project):
+    h = hashlib.sha256()
+    paths = [os.path.join(project["project_dir"], "README.md"), final_report_path(project)]
+    for path in paths:
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(1 << 20), b""):
+                    h.update(block)
+        h.update(b"\x00")
+    return h.digest()
+
+def project_context(project, query):
+    """Context for ``query``: the whole corpus if small, else top report passages."""
+    context, _ = context_planner.build(
+        iter_project_corpus(project),
+        query,
+        lambda: resources.local_embedder(EMBED_MODEL),
+        EMBED_MODEL,
+        key_data=project_corpus_key(project),
+    )
+    return context
+
+# === TIMELINE ===
+def check_timeline(data, duration_weeks):
+    """Domain checks the schema can't express: week ranges inside the project."""
+    for i, phase in enumerate(data["phases"]):
+        if phase["start_week"] > phase["end_week"]:
+            yield f"phase {i + 1} ends (week {phase['end_week']}) before it starts (week {phase['start_week']})"
+        if phase["end_week"] > duration_weeks:
+            yield f"phase {i + 1} ends after the project's {duration_weeks} weeks"
+
+def format_timeline(phases):
+    """Readable timeline, as written to timeline_detailed.txt."""
+    return "\n".join(
+        f"Phase {i}: {p.name} (weeks {p.start_week}-{p.end_week})\n  Goal: {p.goal}"
+        for i, p in enumerate(phases, start=1)
+    )
+
+def compact_timeline(phases):
+    """One-line timeline for downstream prompts."""
+    return "; ".join(f"W{p.start_week}-{p.end_week} {p.name}" for p in phases)
+
+# === AGENTS ===
+# Each agent writes its output file and returns its result; time to first
+# token is in ``agent.last_ttft``. The timeline agent's result is a list of
+# Phase; the others return text.
+
+class TimelineAgent(Agent):
+    name = "timeline"
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    @tracing.traced("timeline_agent")
+    def run(self, project, on_token=None):
+        prompt = TIMELINE_PROMPT.format(
+            title=project["title"],
+            domain=project["domain"],
+            duration_weeks=project["duration_weeks"],
+            format_instructions=format_instructions(TIMELINE_SCHEMA),
+        )
+        context = project_context(project, TIMELINE_CONTEXT_QUERY.format(
+            title=project["title"], domain=project["domain"], duration_weeks=project["duration_weeks"],
+        ))
+        data, self.last_ttft = generate_structured(
+            self.llm,
+            qa_prompt().format_messages(context=context, question=prompt),
+            TIMELINE_SCHEMA,
+            check=lambda data: check_timeline(data, project["duration_weeks"]),
+            on_token=on_token,
+        )
+        phases = [Phase(p["name"], p["goal"], p["start_week"], p["end_week"]) for p in data["phases"]]
+        with open(os.path.join(project["project_dir"], "timeline_detailed.txt"), "w") as f:
+            f.write(format_timeline(phases))
+        return phases
+
+class BrandingAgent(Agent):
+    name = "branding"
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    @tracing.traced("branding_agent")
+    def run(self, project, timeline, on_token=None):
+        timeline_summary = compact_timeline(timeline)
+        branding_output, self.last_ttft = stream_text(
+            self.llm,
+            BRANDING_TEMPLATE.format(
+                title=project["title"],
+                domain=project["domain"],
+                team=", ".join(project["team"]),
+                timeline=timeline_summary
+            ),
+            on_token=on_token,
+        )
+
+        with open(os.path.join(project["project_dir"], "branding_output.txt"), "w", encoding="utf-8") as f:
+            f.write(branding_output)
+        return branding_output
+
+class TaskAgent(Agent):
+    name = "tasks"
+
+    def __init__(self, llm):
+        self.llm = llm
+
+    @tracing.traced("task_agent")
+    def run(self, project, on_token=None):
+        task_output, self.last_ttft = stream_text(
+            self.llm,
+            TASK_TEMPLATE.format(
+                title=project["title"],
+                domain=project["domain"],
+                team_roles=project["team_roles"],
+                feedback=project["feedback"],
+                context=project_context(project, TASK_CONTEXT_QUERY),
+            ),
+            on_token=on_token,
+        )
+
+        with open(os.path.join(project["project_dir"], "task_plan.txt"), "w", encoding="utf-8") as f:
+            f.write(task_output)
+        return task_output
+
+def build_agents(llm):
+    """Timeline, branding and task agents over one shared LLM client."""
+    agents = AgentRuntime("project_pipeline")
+    for cls in (TimelineAgent, BrandingAgent, TaskAgent):
+        agents.register(cls.name, lambda cls=cls: cls(llm))
+    return agents
+
+def load_agents(api_key, **client_kwargs):
+    """Process-wide agents for ``api_key``.
+
+    ``client_kwargs`` (e.g. ``rpm``, ``burst``) go to ``resources.llm_client``;
+    rate limits only apply when the key's bucket is first created.
+    """
+    return runtime.shared(
+        "project_pipeline", api_key,
+        lambda: build_agents(resources.llm_client(api_key, model=CHAT_MODEL, **client_kwargs)),
+    )
+
+def build_pipeline(project, agents, on_token=None, ttfts=None):
+    """Agent DAG for ``agentkit.dag.run_dag``: timeline -> branding, tasks alongside.
+
+    ``agents`` is a runtime from ``build_agents`` / ``load_agents``.
+    ``on_token`` optionally maps node name -> token callback; time to first
+    token per node is recorded into ``ttfts`` if given.
+    """
+    on_token = on_token or {}
+    ttfts = ttfts if ttfts is not None else {}
+
+    def run(name, *args):
+        # Nodes run on worker threads; last_ttft is per thread.
+        agent = agents[name]
+        result = agent.run(project, *args, on_token=on_token.get(name))
+        ttfts[name] = agent.last_ttft
+        return result
+
+    return {
+        "timeline": Node(lambda: run("timeline")),
+        "branding": Node(lambda timeline: run("branding", timeline), deps=["timeline"]),
+        "tasks": Node(lambda: run("tasks")),
+    }
+
+# === REPORT ===
+# Rendered in one format call; the same text goes to the .txt and the PDF
+REPORT_TEMPLATE = (
+    "\n📋 Student Project Submission Report\n"
+    "Generated at: {generated_at}\n"
+    "\n✔️ Completed:\n{completed}"
+    "\n❌ Missing:\n{missing}"
+)
+
+def build_checklist(project, has_final_report):
+    return {
+        "README.md created": True,
+        "Project folders organized": True,
+        "metadata.json present": True,
+        "timeline_detailed.txt generated": True,
+        "branding_output.txt available": True,
+        "Final report added in /report": has_final_report,
+        "Assets uploaded in /assets": True
+    }
+
+@tracing.traced("report")
+def write_submission_report(project, checklist):
+    """Write submission_report.txt/.pdf; return (summary_text, pdf_bytes)."""
+    summary_text = REPORT_TEMPLATE.format(
+        generated_at=datetime.now().isoformat(),
+        completed="".join(f"- {item}\n" for item, done in checklist.items() if done),
+        missing="".join(f"- {item}\n" for item, done in checklist.items() if not done),
+    )
+    pdf_data = write_report(os.path.join(project["project_dir"], "submission_report"), summary_text)
+    return summary_text, pdf_data
+
+# === HEADLESS RUN ===
+def run_project(project, agents, final_report=None, wrap_node=None):
+    """Scaffold, run all ``agents`` and write the report; return per-stage timings.
+
+    ``final_report`` is the PDF bytes to store under /report (optional).
+    ``wrap_node`` can decorate every agent callable, e.g. with retries.
+    """
+    create_scaffold(project)
+    if final_report is not None:
+        save_final_report(project, final_report)
+    pipeline = build_pipeline(project, agents)
+    if wrap_node is not None:
+        pipeline = {name: Node(wrap_node(node.fn), node.deps) for name, node in pipeline.items()}
+    _, timings = run_dag(pipeline)
+    start = time.perf_counter()
+    write_submission_report(project, build_checklist(project, final_report is not None))
+    timings["report"] = time.perf_counter() - start
+    return timings
@@ -0,0 +1,243 @@
+# hr_copilot.py  –  HR Copilot for Daily Ops, minus the UI
+#
+# Policies, prompts, intent routing and query processing, registered in an
+# agent runtime (agentkit.runtime). The Streamlit app (main.py) gets one
+# runtime per API key and process from load_agents(); headless runs such as
+# the benchmark suite (python -m agentkit.bench) call build_agents() with
+# their own LLM and embedder.
+
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import NamedTuple, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agentkit import resources, runtime, tracing
+from agentkit.intent_router import CentroidClassifier, IntentRouter, KeywordMatcher
+from agentkit.policy_store import PolicyStore
+from agentkit.runtime import Agent, AgentRuntime
+from agentkit.streaming import stream_text
+from agentkit.structured import JsonFieldStream, StructuredOutputError, format_instructions, generate_structured
+
+# Local sentence embedder shared by the intent router and the answer cache.
+EMBED_MODEL = "all-MiniLM-L6-v2"
+CHAT_MODEL = "gemini-2.0-flash"
+
+# HR policies live in policies/ (one Markdown file per policy, the file name
+# is the intent it answers). They are split into sections and indexed once at
+# startup; prompts get only the sections relevant to the query.
+POLICY_DIR = os.environ.get("HR_POLICY_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "policies"))
+POLICY_TOKEN_BUDGET = 400
+
+# Sensitive topics for escalation (used for double-checking in code)
+SENSITIVE_TOPICS = ["mental health", "harassment", "discrimination"]
+
+# Local intent routing: keywords first, then nearest example centroid.
+# Only queries neither tier is sure about go to Gemini for classification.
+INTENT_KEYWORDS = {
+    "leave": ["leave", "vacation", "holiday", "day off", "days off", "sick day", "time off", "maternity", "paternity"],
+    "appraisal": ["appraisal", "performance review", "self-assessment", "self assessment"],
+    "payslip": ["payslip", "pay slip", "salary", "payroll", "paycheck"],
+    "interview": ["interview", "candidate", "hiring slot"],
+}
+INTENT_EXAMPLES = {
+    "leave": ["How many sick days do I get?", "Can I take next Friday off?", "What is the annual leave policy?"],
+    "appraisal": ["When is my review?", "How does the yearly evaluation work?", "I haven't received my assessment form"],
+    "payslip": ["When do we get paid?", "My pay this month looks wrong", "Where can I download my pay statement?"],
+    "interview": ["Set up a meeting with a job applicant", "Book a slot to meet a new hire candidate", "Arrange a hiring call"],
+}
+
+# Structured reply of the classification prompt, validated before use
+HR_INTENTS = ["leave", "appraisal", "payslip", "interview", "escalate", "unknown"]
+HR_REPLY_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent": {"type": "string", "enum": HR_INTENTS},
+        "response": {"type": "string"},
+        "action": {"type": ["string", "null"]},
+    },
+    "required": ["intent", "response", "action"],
+}
+FALLBACK_RESPONSE = "I'm sorry, I couldn't process your query."
+
+class HRReply(NamedTuple):
+    intent: str
+    response: str
+    action: Optional[str]
+
+PROMPT_VERSION = "hr-prompt-v5"  # bump whenever hr_prompt/answer_prompt change
+
+# Prompt for Intent Classification and Response Generation (sent as one
+# human message; plain strings keep LangChain out of the import)
+hr_prompt = """
+You are an HR Copilot designed to assist employees with common HR queries and tasks. Based on the user's query, perform the following:
+
+1. *Classify Intent*: Identify the intent of the query. Possible intents include:
+   - leave (queries about leave policies)
+   - appraisal (queries about appraisals or performance reviews)
+   - payslip (queries about salary or payslips)
+   - interview (queries about scheduling interviews)
+   - escalate (queries containing sensitive topics like 'mental health', 'harassment', or 'discrimination')
+   - unknown (if the intent is unclear)
+
+2. *Fetch Answer*: If the intent is 'leave', 'appraisal', or 'payslip', use the following HR policy data to generate a response:
+   *HR Policies*:
+   {policy_data}
+
+3. *Trigger Action*: If applicable, suggest a mock action based on the intent:
+   - For 'appraisal', suggest sending a reminder for form submission (e.g., due tomorrow).
+   - For 'interview', suggest scheduling an interview slot (e.g., in 3 days at 10:00 AM).
+
+4. *Escalation Check*: If the intent is 'escalate', return a message indicating the query will be escalated to HR. Do not provide a policy answer or action.
+
+*User Query*: {query}
+
+*Output Format*: {format_instructions}
+Use null for "action" when no action applies.
+"""
+
+# Prompt used once the intent is known locally: only the matching policy section
+answer_prompt = """
+You are an HR Copilot. Answer the employee's question using only this HR policy:
+{policy_section}
+
+*User Query*: {query}
+
+Reply with the answer text only.
+"""
+
+# Replies/actions for routed intents that need no policy lookup
+LOCAL_RESPONSES = {
+    "interview": "Sure, I can set up the interview for you.",
+}
+
+def load_policies(embedder):
+    return PolicyStore.from_dir(POLICY_DIR, embedder, token_budget=POLICY_TOKEN_BUDGET)
+
+def make_intent_router(embedder):
+    return IntentRouter(KeywordMatcher(INTENT_KEYWORDS), CentroidClassifier(embedder, INTENT_EXAMPLES))
+
+def suggest_action(intent):
+    now = datetime.now()
+    if intent == "appraisal":
+        return f"Reminder sent: submit your self-assessment form by {(now + timedelta(days=1)):%b %d}."
+    if intent == "interview":
+        return f"Interview slot booked for {(now + timedelta(days=3)):%b %d} at 10:00 AM."
+    return None
+
+# Function to check for sensitive topics in the query (double-check)
+def check_sensitive_topics(query):
+    query = query.lower()
+    return any(topic in query for topic in SENSITIVE_TOPICS)
+
+class HRCopilot(Agent):
+    """Query processing with a shared LLM, answer cache, intent router and policy store."""
+
+    name = "copilot"
+
+    def __init__(self, llm, answer_cache, intent_router, policies):
+        self.llm = llm
+        self.answer_cache = answer_cache
+        self.intent_router = intent_router
+        self.policies = policies
+
+    def run(self, query, on_token=None):
+        return self.process_query(query, on_token)
+
+    # Function to process query using LangChain and Gemini
+    @tracing.traced("process_query")
+    def process_query(self, query, on_token=None):
+        # Sensitive topics are escalated before any model call
+        if check_sensitive_topics(query):
+            return HRReply("escalate", "", None)
+
+        # Cache scope changes whenever any policy text or the prompts change
+        scope = (self.policies.version, PROMPT_VERSION)
+        cached, query_vector = self.answer_cache.get(query, scope)
+        if cached is not None:
+            # Only (intent, response) is cached: actions carry today's dates.
+            intent, response = cached
+            return HRReply(intent, response, suggest_action(intent))
+
+        with tracing.span("route") as span:
+            route = self.intent_router.route(query)
+            intent = route.intent
+            # Routing keywords are fixed but policy files come from POLICY_DIR:
+            # an intent with neither a policy nor a local reply goes to Gemini.
+            if intent not in self.policies.names and intent not in LOCAL_RESPONSES:
+                intent = None
+            span.set(intent=intent, source=route.source if intent else "fallback")
+        if intent is not None:
+            # Intent decided locally: no classification prompt, and only the
+            # relevant sections of the matching policy (if any) go to Gemini.
+            action = suggest_action(intent)
+            if intent in self.policies.names:
+                policy_section = self.policies.context(query, policies=[intent], query_vector=query_vector)
+                prompt = answer_prompt.format(query=query, policy_section=policy_section)
+                response, _ = stream_text(self.llm, prompt, on_token)
+                response = response.strip()
+            else:
+                response = LOCAL_RESPONSES[intent]
+            reply = HRReply(intent, response, action)
+            self.answer_cache.put(query, scope, (intent, response), query_vector)
+        else:
+            # Top policy sections for the query, under a fixed token budget
+            policy_text = self.policies.context(query, query_vector=query_vector)
+            prompt = hr_prompt.format(
+                query=query, policy_data=policy_text, format_instructions=format_instructions(HR_REPLY_SCHEMA)
+            )
+
+            # Gemini replies in JSON; only the "response" text is streamed to the
+            # UI. Invalid JSON gets one repair round, then we give up cleanly.
+            streamer = JsonFieldStream("response", on_token) if on_token else None
+            try:
+                data, _ = generate_structured(self.llm, prompt, HR_REPLY_SCHEMA, on_token=streamer)
+                reply = HRReply(data["intent"], data["response"].strip(), data["action"] or None)
+            except StructuredOutputError:
+                reply = HRReply("unknown", FALLBACK_RESPONSE, None)
+
+            # Only cache answers we could actually parse
+            if reply.intent != "unknown":
+                self.answer_cache.put(query, scope, (reply.intent, reply.response), query_vector)
+
+        return reply
+
+# Function to escalate query to a human
+def escalate_query(query, conversation_history):
+    escalation_message = """
+    *Escalation to HR*  
+    This query requires human attention due to its sensitive nature.  
+    *Query*: {query}  
+    *Conversation Context*:  
+    {history}  
+    An HR representative will reach out to you soon.
+    """
+    history = "\n".join([f"- {msg}" for msg in conversation_history])
+    return escalation_message.format(query=query, history=history)
+
+# === AGENT RUNTIME ===
+def build_agents(llm, embedder):
+    """The copilot plus the answer cache, intent router and policy store it uses."""
+    from agentkit.answer_cache import SemanticAnswerCache
+
+    agents = AgentRuntime("hr_copilot")
+    # Near-identical questions ("how many sick days" / "sick leave days?") skip
+    # the Gemini round trip.
+    agents.register("answer_cache", lambda: SemanticAnswerCache(embedder))
+    agents.register("intent_router", lambda: make_intent_router(embedder))
+    # Policy files split into sections and embedded once
+    agents.register("policies", lambda: load_policies(embedder))
+    agents.register("copilot", lambda: HRCopilot(
+        llm, agents["answer_cache"], agents["intent_router"], agents["policies"]
+    ))
+    return agents
+
+def load_agents(api_key):
+    """Process-wide agents for ``api_key``, shared by every session and rerun."""
+    def build():
+        # One client per key and process; calls go through a per-key rate
+        # limiter that retries 429s and merges identical in-flight prompts
+        # (e.g. the same question re-sent by a rerun).
+        llm = resources.llm_client(api_key, model=CHAT_MODEL, temperature=0.3, max_output_tokens=1024)
+        return build_agents(llm, resources.local_embedder(EMBED_MODEL))
+    return runtime.shared("hr_copilot", api_key, build)
@@ -1,40 +1,26 @@
 import streamlit as st
-import re
 import os
-from datetime import datetime, timedelta
-from langchain_google_genai import ChatGoogleGenerativeAI
-from langchain_core.prompts import ChatPromptTemplate
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agentkit import resources, tracing
+from agentkit.debug_panel import render_debug_panel
+from agentkit.memory import ConversationMemory, HistoryStore, llm_summarizer
+from agentkit.streaming import MarkdownStream
+from hr_copilot import EMBED_MODEL, escalate_query, load_agents
 
 # === Set Page Config (Must be the first Streamlit command) ===
 st.set_page_config(page_title="HR Copilot", layout="wide")
 
-# Simulated HR Policy Data (since we can't access real PDFs/Google Docs)
-HR_POLICIES = {
-    "leave": """
-    *Leave Policy*  
-    - Annual Leave: 20 days per year, accrued monthly.  
-    - Sick Leave: 10 days per year, fully paid.  
-    - Maternity/Paternity Leave: 12 weeks, fully paid.  
-    - Unpaid Leave: Available upon approval for up to 30 days.  
-    To apply, submit a request via the HR portal at least 5 days in advance.
-    """,
-    "appraisal": """
-    *Appraisal Policy*  
-    - Appraisals occur bi-annually: June and December.  
-    - Employees must submit a self-assessment form 2 weeks prior.  
-    - Managers will schedule a 1:1 review meeting post-submission.  
-    Contact HR if you haven't received your appraisal form.
-    """,
-    "payslip": """
-    *Payslip Information*  
-    - Payslips are issued on the last working day of each month.  
-    - Access your payslip via the HR portal under 'Payroll'.  
-    - For discrepancies, email hr@company.com with your employee ID.
-    """
-}
-
-# Sensitive topics for escalation (used for double-checking in code)
-SENSITIVE_TOPICS = ["mental health", "harassment", "discrimination"]
+# Local sentence embedder shared by the intent router and the answer cache.
+# Loaded once per process, in the background while the user enters a key
+# (cached, so reruns don't start another warm-up thread).
+@st.cache_resource
+def warm_up_embedder():
+    return resources.warm_up(lambda: resources.local_embedder(EMBED_MODEL))
+
+warm_up_embedder()
 
 # === API Key Input Section ===
 st.subheader("API Key Configuration")
@@ -49,139 +35,115 @@ if not os.environ.get("GOOGLE_API_KEY"):
     st.error("❌ Please provide a Google API Key to proceed.")
     st.stop()
 
-# Initialize Gemini API with LangChain
-llm = ChatGoogleGenerativeAI(
-    model="gemini-2.0-flash",
-    temperature=0.3,
-    max_output_tokens=1024
+# Gemini client, answer cache, intent router and policy store (see
+# hr_copilot.py): built once per key for the whole process and looked up on
+# every rerun, so a rerun only redraws the page.
+with st.spinner("Loading the HR copilot…"):
+    agents = load_agents(os.environ["GOOGLE_API_KEY"]).warm_up()
+copilot = agents["copilot"]
+answer_cache = agents["answer_cache"]
+policy_store = agents["policies"]
+
+@st.cache_resource
+def load_history_store():
+    return HistoryStore()
+
+st.sidebar.caption(f"📚 {len(policy_store.names)} policies · {len(policy_store.sections)} sections indexed")
+
+# Conversation memory: the last messages verbatim plus a rolling summary of
+# older ones, so session RAM, rendering and the escalation context stay
+# bounded. Persistence is opt-in: with it on, history survives restarts in a
+# local SQLite file and the conversation id goes in the URL to find it again,
+# so anyone with that link can read the conversation. With it off the id
+# never leaves the session and a ?conversation= link is ignored.
+keep_history = st.sidebar.checkbox(
+    "💾 Keep chat history on this machine", value=False,
+    help="Puts the conversation id in the page URL: don't share that link.",
 )
-
-# LangChain Prompt for Intent Classification and Response Generation
-hr_prompt = ChatPromptTemplate.from_template("""
-You are an HR Copilot designed to assist employees with common HR queries and tasks. Based on the user's query, perform the following:
-
-1. *Classify Intent*: Identify the intent of the query. Possible intents include:
-   - leave (queries about leave policies)
-   - appraisal (queries about appraisals or performance reviews)
-   - payslip (queries about salary or payslips)
-   - interview (queries about scheduling interviews)
-   - escalate (queries containing sensitive topics like 'mental health', 'harassment', or 'discrimination')
-   - unknown (if the intent is unclear)
-
-2. *Fetch Answer*: If the intent is 'leave', 'appraisal', or 'payslip', use the following HR policy data to generate a response:
-   *HR Policies*:
-   {policy_data}
-
-3. *Trigger Action*: If applicable, suggest a mock action based on the intent:
-   - For 'appraisal', suggest sending a reminder for form submission (e.g., due tomorrow).
-   - For 'interview', suggest scheduling an interview slot (e.g., in 3 days at 10:00 AM).
-
-4. *Escalation Check*: If the intent is 'escalate', return a message indicating the query will be escalated to HR. Do not provide a policy answer or action.
-
-*User Query*: {query}
-
-*Output Format*:
-- *Intent*: [intent]
-- *Response*: [response text]
-- *Action* (if applicable): [action text]
-""")
-
-# Function to check for sensitive topics in the query (double-check)
-def check_sensitive_topics(query):
-    query = query.lower()
-    return any(topic in query for topic in SENSITIVE_TOPICS)
-
-# Function to process query using LangChain and Gemini
-def process_query(query, policy_data):
-    # Format the prompt with the query and policy data
-    policy_text = "\n".join([f"{key}: {value}" for key, value in policy_data.items()])
-    prompt_messages = hr_prompt.format_messages(query=query, policy_data=policy_text)
-
-    # Invoke Gemini via LangChain
-    result = llm.invoke(prompt_messages)
-    response_text = result.content
-
-    # Parse the response
-    intent_match = re.search(r"\\*Intent\\: (.?)\n", response_text)
-    response_match = re.search(r"\\*Response\\: (.?)(?:\n\\*Action\\*:|$)", response_text, re.DOTALL)
-    action_match = re.search(r"\\*Action\\: (.)", response_text)
-
-    intent = intent_match.group(1) if intent_match else "unknown"
-    response = response_match.group(1).strip() if response_match else "I'm sorry, I couldn't process your query."
-    action = action_match.group(1).strip() if action_match else None
-
-    # Double-check for sensitive topics in the query
-    if check_sensitive_topics(query):
-        intent = "escalate"
-
-    return intent, response, action
-
-# Function to escalate query to a human
-def escalate_query(query, conversation_history):
-    escalation_message = """
-    *Escalation to HR*  
-    This query requires human attention due to its sensitive nature.  
-    *Query*: {query}  
-    *Conversation Context*:  
-    {history}  
-    An HR representative will reach out to you soon.
-    """
-    history = "\n".join([f"- {msg}" for msg in conversation_history])
-    return escalation_message.format(query=query, history=history)
+conversation_id = st.session_state.get("conversation_id") or uuid.uuid4().hex
+if keep_history:
+    conversation_id = st.query_params.get("conversation") or conversation_id
+    st.query_params["conversation"] = conversation_id
+elif "conversation" in st.query_params:
+    del st.query_params["conversation"]
+st.session_state.conversation_id = conversation_id
+memory = st.session_state.get("memory")
+if memory is None or (memory.store is not None) != keep_history or memory.conversation_id != conversation_id:
+    memory = st.session_state.memory = ConversationMemory(
+        conversation_id,
+        store=load_history_store() if keep_history else None,
+        summarizer=llm_summarizer(copilot.llm),
+    )
 
 # === Streamlit UI ===
 st.title("🤝 HR Copilot for Daily Ops")
 
-# Initialize conversation history in session state
-if "conversation_history" not in st.session_state:
-    st.session_state.conversation_history = []
-
-# Display conversation history
+# Display conversation history: summary of older turns, then the window
 st.subheader("Chat History")
 chat_container = st.container()
 with chat_container:
-    for message in st.session_state.conversation_history:
-        if message.startswith("*User*:"):
-            st.markdown(f"{message}", unsafe_allow_html=True)
-        else:
-            st.markdown(message, unsafe_allow_html=True)
-
-# Input box for user query
+    if memory.summary:
+        with st.expander(f"🗂️ Summary of {memory.folded} earlier messages"):
+            st.markdown(memory.summary)
+    for message in memory.messages:
+        st.markdown(message["text"], unsafe_allow_html=True)
+
+# Input box for user query. A form submits exactly once per click (the box
+# is cleared), so other widgets' reruns don't re-send the query and the same
+# question can be asked twice in a row.
 st.subheader("Ask a Question")
-user_query = st.text_input("Type your query here (e.g., 'What's our leave policy?')", key="user_query")
+with st.form("ask", clear_on_submit=True):
+    user_query = st.text_input("Type your query here (e.g., 'What's our leave policy?')", key="user_query")
+    submitted = st.form_submit_button("Ask")
+
+def record(role, text, slot=None):
+    # New messages are drawn in place, so no st.rerun() re-renders the history
+    # (later reruns redraw only the bounded window above)
+    (slot or chat_container).markdown(text, unsafe_allow_html=True)
+    memory.add(role, text)
 
 # Process the query when submitted
-if user_query:
-    # Add user query to conversation history
-    st.session_state.conversation_history.append(f"*User*: {user_query}")
+user_query = user_query.strip()
+if submitted and user_query:
+    record("user", f"*User*: {user_query}")
 
-    # Process query using LangChain and Gemini
+    # Process query using LangChain and Gemini, showing tokens as they arrive
+    response_stream = MarkdownStream(chat_container.empty())
     try:
-        intent, response, action = process_query(user_query, HR_POLICIES)
+        with tracing.trace("hr_query") as request_trace:
+            intent, response, action = copilot.process_query(user_query, on_token=response_stream)
+        st.session_state.last_ttft = response_stream.ttft
+        st.session_state.last_trace = request_trace
 
         # Handle escalation for sensitive topics
         if intent == "escalate":
-            escalation_response = escalate_query(user_query, st.session_state.conversation_history)
-            st.session_state.conversation_history.append(escalation_response)
+            record("assistant", escalate_query(user_query, memory.context()), response_stream.placeholder)
         else:
-            # Add the response to conversation history
-            st.session_state.conversation_history.append(response)
+            # Replace the streamed raw text with the parsed response
+            record("assistant", response, response_stream.placeholder)
 
             # Add action if applicable
             if action:
-                st.session_state.conversation_history.append(f"*Action*: {action}")
+                record("action", f"*Action*: {action}")
 
             # If intent is unknown, provide a fallback response
             if intent == "unknown":
-                st.session_state.conversation_history.append("I’m not sure how to handle that. Would you like to escalate this to HR? (Type 'escalate' to proceed)")
+                record("assistant", "I’m not sure how to handle that. Would you like to escalate this to HR? (Type 'escalate' to proceed)")
 
     except Exception as e:
-        st.session_state.conversation_history.append(f"Error processing query: {str(e)}")
-
-    # Refresh the page to display updated chat history
-    st.rerun()
+        record("assistant", f"Error processing query: {str(e)}", response_stream.placeholder)
+
+# Answer cache counters and time to first token of the last streamed reply
+cache_stats = answer_cache.stats
+last_ttft = st.session_state.get("last_ttft")
+st.caption(
+    f"⚡ Answer cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+    f"({cache_stats['hit_rate']:.0%})"
+    + (f" · first token after {last_ttft * 1000:.0f} ms" if last_ttft is not None else "")
+)
+render_debug_panel(st.sidebar, st.session_state.get("last_trace"))
 
 # Add a button to clear chat history
 if st.button("Clear Chat History"):
-    st.session_state.conversation_history = []
+    memory.clear()
     st.rerun()
\ No newline at end of file
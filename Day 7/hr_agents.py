@@ -0,0 +1,204 @@
+# hr_agents.py  –  HR Copilot (4-Agent) pipeline, minus the UI
+#
+# Document ingestion into the shared corpus plus the four agents, registered
+# in an agent runtime (agentkit.runtime). The Streamlit app (app.py) gets one
+# runtime per API key and process from load_agents(), all of them sharing one
+# corpus per directory (load_corpus()); headless runs such as
+# the benchmark suite (python -m agentkit.bench) call build_agents() with
+# their own LLM and embedder. FAISS, loaders and splitters load on first use.
+
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from agentkit import resources, runtime, tracing
+from agentkit.hybrid import CrossEncoderReranker
+from agentkit.ingest import iter_chunks, iter_pdf_pages
+from agentkit.runtime import Agent, AgentRuntime
+from agentkit.streaming import stream_retrieval_qa
+
+CHAT_MODEL = "models/gemini-2.0-flash"
+EMBED_MODEL = "models/embedding-001"
+CHUNK_SIZE = 600
+CHUNK_OVERLAP = 100
+# Hybrid (BM25 + vector) retrieval ranks well enough to send 3 chunks to the
+# prompt instead of 4: a smaller prompt is a faster, cheaper answer.
+TOP_K = 3
+RERANK_BUDGET_MS = 150
+SUPPORTED_TYPES = ["pdf", "txt", "docx"]
+
+# ------------------------------------------------------------------
+# 1️⃣  RAG BACKEND
+# ------------------------------------------------------------------
+def make_retrieval_service(root=None):
+    """Corpus + retrieval service; the cross-encoder only loads on first rerank."""
+    from agentkit.index_manager import IndexManager
+    from agentkit.retrieval_service import RetrievalService
+
+    corpus = IndexManager() if root is None else IndexManager(root=root)
+    return RetrievalService(corpus, reranker=CrossEncoderReranker(budget_ms=RERANK_BUDGET_MS))
+
+def load_corpus(root=None):
+    """``(retrieval service, answer cache)`` for the corpus at ``root``, once per process.
+
+    Keyed by directory, not by API key: two IndexManagers over the same files
+    would each hold the corpus in RAM and overwrite each other's manifest and
+    vector ids on save. Neither holds an embedder: every caller embeds its
+    uploads and questions with its own key's embedder (all EMBED_MODEL, so
+    the vectors share one space).
+    """
+    from agentkit.answer_cache import SemanticAnswerCache
+    from agentkit.index_manager import DEFAULT_ROOT
+
+    root = os.path.abspath(root or DEFAULT_ROOT)
+    # Near-identical questions ("how many sick days" / "sick leave days?") against
+    # the same document versions are answered without an LLM round trip.
+    return resources.get_or_create(
+        ("hr_corpus", root), lambda: (make_retrieval_service(root), SemanticAnswerCache())
+    )
+
+def split_upload(suffix, data):
+    """Chunks of an uploaded file's bytes; ``ValueError`` for unsupported types."""
+    from langchain.document_loaders import TextLoader, UnstructuredWordDocumentLoader
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    if suffix not in {"." + t for t in SUPPORTED_TYPES}:
+        raise ValueError(f"Unsupported file type: {suffix}")
+
+    # Save to temp file
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as tmp:
+        tmp.write(data)
+        tmp_path = tmp.name
+
+    try:
+        # PDFs: pages extracted by worker threads and chunked as they stream in
+        if suffix == ".pdf":
+            return list(iter_chunks(iter_pdf_pages(tmp_path), CHUNK_SIZE, CHUNK_OVERLAP))
+
+        # Pick loader
+        loader = TextLoader(tmp_path) if suffix == ".txt" else UnstructuredWordDocumentLoader(tmp_path)
+        docs = loader.load()
+    finally:
+        os.remove(tmp_path)
+    splitter = RecursiveCharacterTextSplitter(chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP)
+    return splitter.split_documents(docs)
+
+@tracing.traced("ingest")
+def ingest_document(corpus, tenant, name, data, model_name=EMBED_MODEL, embedder=None):
+    """Upsert ``name`` into ``tenant``'s corpus; ``None`` if it's unchanged.
+
+    Otherwise returns ``(added, removed)`` chunk counts. New chunks are
+    embedded with ``embedder``, the uploader's.
+    """
+    from agentkit.index_store import index_key
+
+    doc_id = f"{tenant}/{name}"
+    # Version hash covers the bytes and everything that shapes the vectors,
+    # so re-uploading an unchanged file (or restarting) skips indexing.
+    version = index_key(data, CHUNK_SIZE, CHUNK_OVERLAP, model_name)
+    if corpus.is_current(doc_id, version):
+        return None
+    suffix = "." + name.split(".")[-1].lower()
+    return corpus.upsert(doc_id, split_upload(suffix, data), version, metadata={"tenant": tenant},
+                         embedder=embedder)
+
+# ------------------------------------------------------------------
+# 2️⃣  AGENT CLASSES
+# ------------------------------------------------------------------
+class IntentClassifierAgent(Agent):
+    name = "intent"
+    MAP = {
+        "leave": ["leave", "vacation", "holiday", "day off"],
+        "payslip": ["payslip", "salary", "payment", "compensation"],
+        "appraisal": ["appraisal", "review", "performance"],
+        "mental_health": ["mental", "stress", "burnout", "depression"],
+    }
+    @tracing.traced("intent_agent")
+    def run(self, text: str) -> str:
+        low = text.lower()
+        for label, words in self.MAP.items():
+            if any(w in low for w in words):
+                return label
+        return "general"
+
+class RetrieverAgent(Agent):
+    name = "retrieval"
+    # Bump whenever the QA prompt/chain changes so cached answers are dropped.
+    PROMPT_VERSION = "retrievalqa-stuff-hybrid-v2"
+
+    def __init__(self, service, llm, cache, embedder=None):
+        self.service = service
+        self.llm = llm
+        self.cache = cache
+        self.embedder = embedder  # this key's; the service and cache are shared
+
+    def scope(self, tenant: str, doc_ids, rerank: bool = False) -> tuple:
+        docs = self.service.scope(tenant, doc_ids)
+        # A document removed since scope() was listed simply drops out.
+        entries = ((d, self.service.corpus.version(d)) for d in docs)
+        versions = tuple(sorted((d, e["sha256"]) for d, e in entries if e is not None))
+        return (tenant, versions, self.PROMPT_VERSION, rerank)
+
+    @tracing.traced("retriever_agent")
+    def run(self, q: str, tenant: str, doc_ids=None, on_token=None, intent: str = "general", rerank: bool = False) -> str:
+        self.last_ttft = None  # stays None on a cache hit
+        def answer():
+            # The intent's domain keywords steer the BM25 half of the search.
+            retriever = self.service.as_retriever(
+                k=TOP_K, tenant=tenant, doc_ids=doc_ids, hybrid=True,
+                keywords=IntentClassifierAgent.MAP.get(intent, []), rerank=rerank,
+                embedder=self.embedder,
+            )
+            text, self.last_ttft = stream_retrieval_qa(self.llm, retriever, q, on_token)
+            return text
+        return self.cache.get_or_compute(q, self.scope(tenant, doc_ids, rerank), answer, self.embedder)
+
+class ActionAgent(Agent):
+    name = "action"
+    ACTIONS = {
+        "leave": "📨 Leave form emailed. Fill it out and chill.",
+        "payslip": "📨 Latest payslip dropped in your inbox.",
+        "appraisal": "🔔 Appraisal reminder pinged to you and the boss.",
+    }
+    @tracing.traced("action_agent")
+    def run(self, intent: str) -> str:
+        return self.ACTIONS.get(intent, " No automated action for that request.")
+
+class EscalationAgent(Agent):
+    name = "escalation"
+    @tracing.traced("escalation_agent")
+    def run(self, intent: str) -> bool:
+        return intent == "mental_health"
+
+# ------------------------------------------------------------------
+# 3️⃣  AGENT RUNTIME
+# ------------------------------------------------------------------
+def build_agents(llm, embedder, root=None):
+    """The four agents plus the process-wide retrieval service and answer cache.
+
+    ``embedder`` is this runtime's own: uploads and questions going through
+    it are embedded (and billed) with it, not with whoever built the corpus.
+    """
+    agents = AgentRuntime("hr_agents")
+    agents.register("embedder", lambda: embedder)
+    agents.register("retrieval_service", lambda: load_corpus(root)[0])
+    agents.register("answer_cache", lambda: load_corpus(root)[1])
+    agents.register("intent", IntentClassifierAgent)
+    agents.register("retrieval", lambda: RetrieverAgent(
+        agents["retrieval_service"], llm, agents["answer_cache"], agents["embedder"]))
+    agents.register("action", ActionAgent)
+    agents.register("escalation", EscalationAgent)
+    return agents
+
+def load_agents(api_key):
+    """Process-wide agents for ``api_key``, shared by every session and rerun."""
+    def build():
+        # Only the LLM client and embedder are per key (kept-alive connections,
+        # rate-limited per key, 429 retries, identical in-flight prompts merged
+        # into one call); the corpus and answer cache are shared by every key.
+        llm = resources.llm_client(
+            api_key, model=CHAT_MODEL, temperature=0.2, convert_system_message_to_human=True
+        )
+        return build_agents(llm, resources.google_embedder(api_key, model=EMBED_MODEL))
+    return runtime.shared("hr_agents", api_key, build)
@@ -0,0 +1,8 @@
+"""Shared building blocks for the workshop agent apps (Day 6, Day 7, Day 10).
+
+The Streamlit scripts put the repository root on ``sys.path`` and import the
+pieces they need, e.g. ``from agentkit.index_store import IndexStore``.
+Submodules are imported on demand so that ``import agentkit`` stays cheap.
+Each app's agents are served by an ``agentkit.runtime.AgentRuntime`` built
+once per process, so Streamlit reruns only redraw the page.
+"""
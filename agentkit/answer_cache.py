@@ -0,0 +1,124 @@
+"""Semantic cache for LLM answers.
+
+Answers are stored under a *scope* (e.g. the versions of the documents that
+were searched plus the prompt template version) so an edited policy or prompt
+never serves stale text.  Lookups first try the exact normalized question and
+then the nearest cached question embedding in the same scope; anything above
+``threshold`` cosine similarity is a hit.  Entries expire after ``ttl``
+seconds and the least recently used ones are evicted beyond ``max_entries``.
+Questions are embedded with the caller's ``embedder`` when one is passed, so
+a cache shared across API keys bills each lookup to the asker's key.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from agentkit import tracing
+from agentkit.embedding_cache import normalize_text
+
+# === CONFIG ===
+DEFAULT_THRESHOLD = 0.92
+DEFAULT_TTL = 60 * 60
+DEFAULT_MAX_ENTRIES = 2000
+
+
+def _unit(vector):
+    v = np.asarray(vector, dtype="float32")
+    norm = np.linalg.norm(v)
+    return v / norm if norm else v
+
+
+class SemanticAnswerCache:
+    """Thread-safe, TTL + LRU bounded question -> answer cache."""
+
+    def __init__(self, embedder=None, threshold=DEFAULT_THRESHOLD, ttl=DEFAULT_TTL,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        self.embedder = embedder
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        # (scope, normalized question) -> (unit vector, answer, expires_at)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        for key in [k for k, (_, _, exp) in self._entries.items() if exp <= now]:
+            del self._entries[key]
+
+    def get(self, question, scope, embedder=None):
+        """Cached answer for a question similar enough to ``question``, else ``None``.
+
+        Returns ``(answer, vector)``; pass ``vector`` back to ``put`` on a
+        miss to avoid embedding the question twice.
+        """
+        with tracing.span("answer_cache") as span:
+            answer, vector, outcome = self._lookup(question, scope, embedder or self.embedder)
+            span.set(outcome=outcome)
+            tracing.metrics.inc("agentkit_cache_lookups_total", cache="answer",
+                                outcome="miss" if answer is None else "hit")
+            return answer, vector
+
+    def _lookup(self, question, scope, embedder):
+        now = time.time()
+        exact = (scope, normalize_text(question).lower())
+        with self._lock:
+            self._expire(now)
+            if exact in self._entries:
+                self._entries.move_to_end(exact)
+                self.hits += 1
+                return self._entries[exact][1], None, "exact"
+
+        vector = _unit(embedder.embed_query(question))
+        with self._lock:
+            keys = [k for k in self._entries if k[0] == scope]
+            if keys:
+                matrix = np.stack([self._entries[k][0] for k in keys])
+                scores = matrix @ vector
+                best = int(np.argmax(scores))
+                if scores[best] >= self.threshold:
+                    self._entries.move_to_end(keys[best])
+                    self.hits += 1
+                    return self._entries[keys[best]][1], vector, "semantic"
+            self.misses += 1
+        return None, vector, "miss"
+
+    def put(self, question, scope, answer, vector=None, embedder=None):
+        if vector is None:
+            vector = _unit((embedder or self.embedder).embed_query(question))
+        key = (scope, normalize_text(question).lower())
+        with self._lock:
+            self._entries[key] = (vector, answer, time.time() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, question, scope, compute, embedder=None):
+        """Return a cached answer or ``compute()`` and cache it."""
+        answer, vector = self.get(question, scope, embedder)
+        if answer is None:
+            answer = compute()
+            self.put(question, scope, answer, vector, embedder)
+        return answer
+
+    def clear(self, scope=None):
+        with self._lock:
+            if scope is None:
+                self._entries.clear()
+            else:
+                for key in [k for k in self._entries if k[0] == scope]:
+                    del self._entries[key]
+
+    @property
+    def stats(self):
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+            "size": len(self._entries),
+        }
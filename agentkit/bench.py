@@ -0,0 +1,521 @@
+"""Benchmark and load test for the Day 6, Day 7 and Day 10 agent apps.
+
+The apps' pipeline modules (``Day 6/hr_copilot.py``, ``Day 7/hr_agents.py``,
+``Day 10/project_pipeline.py``) are driven headlessly with the deterministic
+``FakeChatModel`` / ``FakeEmbeddings`` from ``agentkit.fakes``, so runs are
+repeatable and cost nothing.  For each app it reports:
+
+* per-stage latency (load, split, embed, index, route, intent, retrieve,
+  answer cache hit/miss, memory, agents, render/PDF), including ``rerun``: the non-UI work a Streamlit rerun
+  does (looking up the process-wide agent runtime);
+* cold start: a fresh interpreter importing the app's pipeline module and
+  building its agents, with the heaviest imports (``python -X importtime``);
+* throughput and latency under N concurrent sessions;
+* memory peaks (Python heap via ``tracemalloc`` with ``--trace-memory``, and
+  the process's peak RSS).
+
+Every run is appended to a JSONL history; ``--compare`` diffs it against the
+previous run with the same configuration and flags regressions.
+
+    python -m agentkit.bench --sessions 1,4,16
+    python -m agentkit.bench --apps day7 --llm-first-token 0.5 --compare
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime
+
+import numpy as np
+
+from agentkit import resources, runtime, tracing
+from agentkit.embedding_cache import CachedEmbeddings, EmbeddingCache
+from agentkit.fakes import VOCABULARY, FakeChatModel, FakeEmbeddings
+from agentkit.llm_client import AsyncLLMClient, AsyncTokenBucket
+from agentkit.memory import ConversationMemory, HistoryStore
+
+# === CONFIG ===
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HISTORY = os.path.join(".cache", "bench", "history.jsonl")
+DEFAULT_TOLERANCE = 0.15
+APPS = ("day6", "day7", "day10")
+RERUNS = 200
+HEAVIEST_IMPORTS = 5
+
+HR_QUESTIONS = [
+    "How many sick days do I get?",
+    "When are payslips issued?",
+    "How do I apply for annual leave?",
+    "When is the next appraisal?",
+    "Can I take unpaid leave next month?",
+    "My salary this month looks wrong",
+    "Where do I submit my self-assessment form?",
+    "Schedule an interview with the new candidate",
+    "How long is maternity leave?",
+    "What happens after I submit my appraisal form?",
+    "Is sick leave fully paid?",
+    "Who do I contact about payroll discrepancies?",
+]
+
+
+class Stages:
+    """Thread-safe collection of per-stage durations."""
+
+    def __init__(self):
+        self._samples = defaultdict(list)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def time(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def add(self, name, seconds):
+        with self._lock:
+            self._samples[name].append(seconds)
+
+    def summary(self):
+        return {name: summarize(samples) for name, samples in self._samples.items()}
+
+
+def summarize(samples):
+    ms = np.array(samples) * 1000
+    return {
+        "n": len(samples),
+        "mean_ms": round(float(ms.mean()), 2),
+        "p50_ms": round(float(np.percentile(ms, 50)), 2),
+        "p95_ms": round(float(np.percentile(ms, 95)), 2),
+    }
+
+
+def synthetic_handbook(pages, seed=0):
+    """Deterministic HR-ish pages of text."""
+    rng = random.Random(seed)
+    topics = ["leave", "payslip", "appraisal", "travel", "security", "benefits"]
+    out = []
+    for page in range(pages):
+        topic = topics[page % len(topics)]
+        lines = []
+        for _ in range(30):
+            words = [rng.choice(VOCABULARY) for _ in range(12)]
+            words.insert(rng.randrange(len(words)), topic)
+            lines.append(" ".join(words).capitalize() + ".")
+        out.append(f"Section {page + 1}: {topic} policy\n" + "\n".join(lines))
+    return out
+
+
+def write_pdf(pages, path):
+    from fpdf import FPDF
+
+    pdf = FPDF()
+    pdf.set_font("Arial", size=10)
+    for text in pages:
+        pdf.add_page()
+        pdf.multi_cell(0, 5, txt=text)
+    pdf.output(path)
+
+
+# === APPS ===
+# Each app has a ``setup`` (shared state, timed stage by stage), a ``session``
+# workload run by every simulated concurrent user, and ``build_agents`` for
+# its agent runtime over the stand-in models (also used by the cold-start probe).
+
+class App:
+    folder = module = None
+
+    def __init__(self, cfg, workdir):
+        self.cfg = cfg
+        self.workdir = workdir
+        self.app = runtime.timed_import(self.module, self.folder)
+
+    @staticmethod
+    def build_agents(app, llm, embedder, workdir):
+        raise NotImplementedError
+
+    def rerun(self):
+        # What the Streamlit script does besides drawing: fetch the runtime.
+        return runtime.shared(self.module, "bench", lambda: self.agents).warm_up()
+
+    def extra(self):
+        return {}
+
+
+class Day6App(App):
+    name = "day6"
+    folder, module = "Day 6", "hr_copilot"
+
+    @staticmethod
+    def build_agents(app, llm, embedder, workdir):
+        return app.build_agents(llm, embedder)
+
+    def setup(self, stages):
+        with stages.time("load"):
+            self.agents = self.build_agents(self.app, self.cfg["llm"], self.cfg["embedder"], self.workdir)
+            self.copilot = self.agents.warm_up()["copilot"]
+            self.history = HistoryStore(os.path.join(self.workdir, "conversations.sqlite3"))
+
+    def session(self, index, stages, latencies):
+        memory = ConversationMemory(f"bench-{index}", store=self.history)
+        for i in range(self.cfg["questions"]):
+            question = HR_QUESTIONS[(index + i) % len(HR_QUESTIONS)]
+            with stages.time("route"):
+                self.copilot.intent_router.route(question)
+            start = time.perf_counter()
+            _, response, _ = self.copilot.run(question)
+            latencies.append(time.perf_counter() - start)
+            stages.add("query", latencies[-1])
+            with stages.time("memory"):
+                memory.add("user", f"*User*: {question}")
+                memory.add("assistant", response)
+
+    def extra(self):
+        return {"answer_cache": self.copilot.answer_cache.stats}
+
+
+class Day7App(App):
+    name = "day7"
+    folder, module = "Day 7", "hr_agents"
+
+    @staticmethod
+    def build_agents(app, llm, embedder, workdir):
+        return app.build_agents(llm, embedder, root=os.path.join(workdir, "corpus"))
+
+    def setup(self, stages):
+        from agentkit.index_store import index_key
+        from agentkit.ingest import iter_chunks, iter_pdf_pages
+
+        app = self.app
+        pdf_path = os.path.join(self.workdir, "handbook.pdf")
+        write_pdf(synthetic_handbook(self.cfg["pages"]), pdf_path)
+        # Same wrapping as the app: embeddings go through the on-disk cache.
+        embedder = CachedEmbeddings(
+            self.cfg["embedder"], "fake", cache=EmbeddingCache(os.path.join(self.workdir, "embeddings.sqlite"))
+        )
+        self.agents = self.build_agents(app, self.cfg["llm"], embedder, self.workdir)
+        self.service = self.agents["retrieval_service"]
+
+        with stages.time("load"):
+            pages = list(iter_pdf_pages(pdf_path))
+        with stages.time("split"):
+            chunks = list(iter_chunks(pages, app.CHUNK_SIZE, app.CHUNK_OVERLAP))
+        with stages.time("embed"):
+            embedder.embed_documents([c.page_content for c in chunks])
+        with stages.time("index"):
+            with open(pdf_path, "rb") as f:
+                version = index_key(f.read(), app.CHUNK_SIZE, app.CHUNK_OVERLAP, "fake")
+            self.service.corpus.upsert("bench/handbook.pdf", chunks, version, metadata={"tenant": "bench"},
+                                       embedder=embedder)
+        self.chunks = len(chunks)
+
+    def session(self, index, stages, latencies):
+        # Through the app's own RetrieverAgent, answer cache included; each
+        # question's trace tells whether it was a cache hit.
+        for i in range(self.cfg["questions"]):
+            question = HR_QUESTIONS[(index + i) % len(HR_QUESTIONS)]
+            start = time.perf_counter()
+            with tracing.trace("bench_query") as request_trace:
+                with stages.time("intent"):
+                    intent = self.agents.run("intent", question)
+                answer_start = time.perf_counter()
+                self.agents.run("retrieval", question, "bench", intent=intent)
+            latencies.append(time.perf_counter() - start)
+            spans = {span.name: span for span in request_trace.spans}
+            hit = spans["answer_cache"].attrs.get("outcome") != "miss"
+            stages.add("answer_hit" if hit else "answer_miss", time.perf_counter() - answer_start)
+            if not hit:
+                stages.add("retrieve", spans["retrieve"].duration)
+
+    def extra(self):
+        return {"chunks": self.chunks, "answer_cache": self.agents["answer_cache"].stats}
+
+
+class Day10App(App):
+    name = "day10"
+    folder, module = "Day 10", "project_pipeline"
+
+    @staticmethod
+    def build_agents(app, llm, embedder, workdir):
+        return app.build_agents(llm)
+
+    def setup(self, stages):
+        self.agents = self.build_agents(self.app, self.cfg["llm"], self.cfg["embedder"], self.workdir)
+
+    def session(self, index, stages, latencies):
+        app = self.app
+        project = app.make_project(
+            os.path.join(self.workdir, f"project_{index}_{time.perf_counter_ns()}"),
+            f"Bench Project {index}", "Asha, Ravi, Meena", 8, "CSE", "AI",
+        )
+        start = time.perf_counter()
+        timings = app.run_project(project, self.agents)
+        latencies.append(time.perf_counter() - start)
+        for stage in ("timeline", "branding", "tasks"):
+            stages.add(stage, timings[stage])
+        stages.add("render_pdf", timings["report"])
+
+
+APP_CLASSES = {"day6": Day6App, "day7": Day7App, "day10": Day10App}
+
+
+# === STARTUP ===
+# Runs in a fresh interpreter: time the pipeline module's import, then build
+# its agents over zero-latency stand-ins (imported after the timed import, so
+# they don't pre-load LangChain for it).
+STARTUP_PROBE = """\
+import json, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from agentkit import runtime
+app = runtime.timed_import({module!r}, {folder!r})
+imported = time.perf_counter()
+from agentkit.bench import APP_CLASSES
+from agentkit.fakes import FakeChatModel, FakeEmbeddings
+llm = FakeChatModel(first_token_latency=0, token_latency=0)
+models = time.perf_counter()
+APP_CLASSES[{name!r}].build_agents(app, llm, FakeEmbeddings(), {workdir!r}).warm_up()
+print(json.dumps({{"import_s": imported - start, "build_s": time.perf_counter() - models}}))
+"""
+
+
+def heaviest_imports(importtime_log, module, top=HEAVIEST_IMPORTS):
+    """``{name: cumulative ms}`` of ``module``'s direct imports, from ``-X importtime`` output."""
+    rows = []
+    for line in importtime_log.splitlines():
+        parts = line.split("|")
+        if line.startswith("import time:") and len(parts) == 3 and parts[1].strip().isdigit():
+            rows.append((len(parts[2]) - len(parts[2].lstrip()), parts[2].strip(), int(parts[1])))
+    # Output is post-order: a module's imports are listed just before it, one level deeper.
+    for i, (indent, name, _) in enumerate(rows):
+        if name != module:
+            continue
+        children = []
+        for child_indent, child, cumulative_us in reversed(rows[:i]):
+            if child_indent <= indent:
+                break
+            if child_indent == indent + 2:
+                children.append((child, round(cumulative_us / 1000, 1)))
+        return dict(sorted(children, key=lambda c: -c[1])[:top])
+    return {}
+
+
+def measure_cold_start(app_cls, workdir):
+    """Module import and agent build times in a fresh interpreter."""
+    code = STARTUP_PROBE.format(root=REPO_ROOT, module=app_cls.module, folder=app_cls.folder,
+                                name=app_cls.name, workdir=workdir)
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code],
+                          cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    probe = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {
+        "total_ms": round((probe["import_s"] + probe["build_s"]) * 1000, 1),
+        "import_ms": round(probe["import_s"] * 1000, 1),
+        "build_ms": round(probe["build_s"] * 1000, 1),
+        "heaviest_imports": heaviest_imports(proc.stderr, app_cls.module),
+    }
+
+
+# === RUN ===
+def run_app(app_cls, cfg, sessions, trace_memory, cold_start=True):
+    with tempfile.TemporaryDirectory() as workdir:
+        app = app_cls(cfg, workdir)
+        stages = Stages()
+        if trace_memory:
+            tracemalloc.start()
+        app.setup(stages)
+        for _ in range(RERUNS):
+            with stages.time("rerun"):
+                app.rerun()
+
+        concurrency = {}
+        for n in sessions:
+            latencies = []
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=n) as pool:
+                for future in [pool.submit(app.session, i, stages, latencies) for i in range(n)]:
+                    future.result()
+            wall = time.perf_counter() - start
+            concurrency[str(n)] = dict(
+                summarize(latencies), wall_s=round(wall, 3), ops_per_s=round(len(latencies) / wall, 2)
+            )
+
+        result = {"stages": stages.summary(), "concurrency": concurrency, **app.extra()}
+        if trace_memory:
+            result["heap_peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+            tracemalloc.stop()
+        result["rss_peak_mb"] = rss_peak_mb()
+        if cold_start:
+            result["cold_start"] = measure_cold_start(app_cls, os.path.join(workdir, "cold_start"))
+        return result
+
+
+def rss_peak_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1e6 if sys.platform == "darwin" else 1e3), 1)
+
+
+def git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# === HISTORY ===
+def load_history(path):
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_history(path, record):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def compare(previous, current, tolerance=DEFAULT_TOLERANCE):
+    """``(metric, before, after, change)`` for every regression beyond ``tolerance``."""
+    regressions = []
+    for app, result in current["results"].items():
+        before = previous["results"].get(app)
+        if before is None:
+            continue
+        for stage, stats in result["stages"].items():
+            old = before["stages"].get(stage)
+            if old and old["p95_ms"] and stats["p95_ms"] > old["p95_ms"] * (1 + tolerance):
+                regressions.append((f"{app}.{stage}.p95_ms", old["p95_ms"], stats["p95_ms"],
+                                    stats["p95_ms"] / old["p95_ms"] - 1))
+        for n, stats in result["concurrency"].items():
+            old = before["concurrency"].get(n)
+            if old and stats["ops_per_s"] < old["ops_per_s"] * (1 - tolerance):
+                regressions.append((f"{app}.sessions={n}.ops_per_s", old["ops_per_s"], stats["ops_per_s"],
+                                    stats["ops_per_s"] / old["ops_per_s"] - 1))
+        for metric in ("total_ms", "import_ms"):
+            old = before.get("cold_start", {}).get(metric)
+            new = result.get("cold_start", {}).get(metric)
+            if old and new and new > old * (1 + tolerance):
+                regressions.append((f"{app}.cold_start.{metric}", old, new, new / old - 1))
+    return regressions
+
+
+def print_report(record):
+    for app, result in record["results"].items():
+        print(f"\n== {app} ==")
+        for stage, s in result["stages"].items():
+            print(f"  {stage:<12} n={s['n']:<5} mean={s['mean_ms']:>9.2f} ms  "
+                  f"p50={s['p50_ms']:>9.2f} ms  p95={s['p95_ms']:>9.2f} ms")
+        for n, s in result["concurrency"].items():
+            print(f"  sessions={n:<4} {s['ops_per_s']:>8.2f} ops/s  p50={s['p50_ms']:>9.2f} ms  "
+                  f"p95={s['p95_ms']:>9.2f} ms  wall={s['wall_s']:.2f}s")
+        cold = result.get("cold_start")
+        if cold:
+            print(f"  cold start   total={cold['total_ms']:.0f} ms  import={cold['import_ms']:.0f} ms  "
+                  f"build={cold['build_ms']:.0f} ms")
+            print("  heaviest imports: " + ", ".join(f"{k} {v:.0f} ms" for k, v in cold["heaviest_imports"].items()))
+        memory = [f"{k}={result[k]} MB" for k in ("heap_peak_mb", "rss_peak_mb") if result.get(k) is not None]
+        extras = {k: v for k, v in result.items()
+                  if k not in ("stages", "concurrency", "heap_peak_mb", "rss_peak_mb", "cold_start")}
+        print("  " + "  ".join(memory + [f"{k}={v}" for k, v in extras.items()]))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the agent apps with local model stand-ins.")
+    parser.add_argument("--apps", default=",".join(APPS), help="comma-separated: " + ", ".join(APPS))
+    parser.add_argument("--sessions", default="1,4,16", help="concurrent session counts to test")
+    parser.add_argument("--questions", type=int, default=5, help="questions per chat session")
+    parser.add_argument("--pages", type=int, default=40, help="pages in the synthetic Day 7 handbook")
+    parser.add_argument("--llm-first-token", type=float, default=0.3, help="fake LLM seconds to first token")
+    parser.add_argument("--llm-token", type=float, default=0.01, help="fake LLM seconds per further token")
+    parser.add_argument("--llm-tokens", type=int, default=40, help="fake LLM reply length in tokens")
+    parser.add_argument("--llm-rpm", type=float, default=0,
+                        help="rate limit for the fake LLM client in requests/minute (0 = none)")
+    parser.add_argument("--embed-call", type=float, default=0.01, help="fake embedder seconds per call")
+    parser.add_argument("--embed-text", type=float, default=0.0005, help="fake embedder seconds per text")
+    parser.add_argument("--trace-memory", action="store_true", help="track Python heap peaks (slower)")
+    parser.add_argument("--no-cold-start", action="store_true", help="skip the fresh-interpreter start-up probe")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSONL file results are appended to")
+    parser.add_argument("--label", default="", help="free-form note stored with the run")
+    parser.add_argument("--compare", action="store_true", help="diff against the last run with the same config")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--fail-on-regression", action="store_true", help="exit 1 if --compare finds regressions")
+    args = parser.parse_args(argv)
+
+    config = {
+        "apps": args.apps.split(","),
+        "sessions": [int(n) for n in args.sessions.split(",")],
+        "questions": args.questions,
+        "pages": args.pages,
+        "llm": [args.llm_first_token, args.llm_token, args.llm_tokens],
+        "embed": [args.embed_call, args.embed_text],
+        "trace_memory": args.trace_memory,
+    }
+    unknown = set(config["apps"]) - set(APPS)
+    if unknown:
+        parser.error(f"unknown apps: {', '.join(sorted(unknown))}")
+
+    if args.llm_rpm:
+        config["llm_rpm"] = args.llm_rpm
+    # Same client wrapper as the apps: shared loop, coalescing, optional quota.
+    bucket = AsyncTokenBucket.per_minute(args.llm_rpm, burst=max(config["sessions"])) if args.llm_rpm else None
+    llm = AsyncLLMClient(FakeChatModel(first_token_latency=args.llm_first_token, token_latency=args.llm_token,
+                                       reply_tokens=args.llm_tokens), bucket)
+    embedder = FakeEmbeddings(call_latency=args.embed_call, text_latency=args.embed_text)
+    # Anything the pipelines fetch from the registry gets the stand-in too.
+    resources.register(("local_embedder", resources.DEFAULT_LOCAL_EMBED_MODEL), embedder)
+    cfg = {"llm": llm, "embedder": embedder, "questions": args.questions, "pages": args.pages}
+
+    results = {}
+    for app in config["apps"]:
+        print(f"⏱️  {app}…", file=sys.stderr)
+        results[app] = run_app(APP_CLASSES[app], cfg, config["sessions"], args.trace_memory,
+                               cold_start=not args.no_cold_start)
+
+    record = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "revision": git_revision(),
+        "label": args.label,
+        "config": config,
+        "results": results,
+    }
+    print_report(record)
+
+    status = 0
+    if args.compare:
+        previous = [r for r in load_history(args.history) if r["config"] == config]
+        if not previous:
+            print("\nNo earlier run with this configuration to compare against.")
+        else:
+            base = previous[-1]
+            regressions = compare(base, record, args.tolerance)
+            print(f"\nCompared with {base['timestamp']} ({base.get('revision')}):")
+            for metric, before, after, change in regressions:
+                print(f"  ❌ {metric}: {before} -> {after} ({change:+.0%})")
+            if not regressions:
+                print(f"  ✅ no regressions beyond {args.tolerance:.0%}")
+            elif args.fail_on_regression:
+                status = 1
+    append_history(args.history, record)
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
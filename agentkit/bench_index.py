@@ -0,0 +1,145 @@
+"""Recall vs latency benchmark for the index kinds in ``index_factory``.
+
+Every kind is built over the same vectors and queried with a held-out
+question set; recall@k is measured against exact flat search and latency is
+per single query, as the apps issue them.
+
+    # synthetic clustered vectors
+    python -m agentkit.bench_index --n 200000 --dim 384
+
+    # a real corpus (IndexManager root) and one question per line; questions
+    # are embedded with the corpus's model (GOOGLE_API_KEY for Gemini models)
+    python -m agentkit.bench_index --corpus .cache/corpus --questions questions.txt
+
+Results can be written as JSON (``--out``) to compare runs over time.
+"""
+
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from agentkit import index_factory
+
+# === CONFIG ===
+DEFAULT_KINDS = ["flat", "flat_fp16", "ivf_flat", "ivf_fp16", "ivf_sq8", "ivf_pq", "hnsw", "hnsw_fp16"]
+DEFAULT_K = 10
+# The Day 7 corpus's embedding model (hr_agents.EMBED_MODEL).
+DEFAULT_CORPUS_MODEL = "models/embedding-001"
+
+
+def synthetic(n, dim, n_queries, clusters=256, seed=0):
+    """Clustered unit vectors plus held-out queries drawn near (not at) them."""
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim)).astype("float32")
+    assign = rng.integers(0, clusters, n + n_queries)
+    data = centers[assign] + 0.5 * rng.normal(size=(n + n_queries, dim)).astype("float32")
+    data /= np.linalg.norm(data, axis=1, keepdims=True)
+    return data[:n], data[n:]
+
+
+def from_corpus(root, questions_path, model_name=DEFAULT_CORPUS_MODEL):
+    """Stored chunk vectors of an ``IndexManager`` root and embedded held-out questions.
+
+    ``model_name`` must be the model the corpus was embedded with, or the
+    questions land in a different vector space.
+    """
+    from agentkit import resources
+    from agentkit.index_manager import IndexManager
+
+    _, vectors = IndexManager(root=root).vectors()
+    if model_name.startswith("models/"):
+        embedder = resources.google_embedder(os.environ["GOOGLE_API_KEY"], model=model_name)
+    else:
+        embedder = resources.local_embedder(model_name)
+    with open(questions_path, "r", encoding="utf-8") as f:
+        questions = [line.strip() for line in f if line.strip()]
+    queries = np.array([embedder.embed_query(q) for q in questions], dtype="float32")
+    if queries.shape[1] != vectors.shape[1]:
+        raise ValueError(f"{model_name} embeds to {queries.shape[1]} dims, the corpus has {vectors.shape[1]}")
+    return vectors, queries
+
+
+def _percentile_ms(samples, q):
+    return float(np.percentile(samples, q) * 1000)
+
+
+def benchmark(vectors, queries, kinds=DEFAULT_KINDS, k=DEFAULT_K, nprobes=(index_factory.DEFAULT_NPROBE,)):
+    """One result dict per (kind, nprobe/efSearch) setting."""
+    exact, _ = index_factory.build_index(vectors, kind="flat")
+    _, truth = exact.search(queries, k)
+
+    results = []
+    for kind in kinds:
+        start = time.perf_counter()
+        index, built = index_factory.build_index(vectors, kind=kind, mutable=False)
+        build_s = time.perf_counter() - start
+        for nprobe in nprobes:
+            index_factory.tune(index, nprobe=nprobe, ef_search=max(k, 4 * nprobe))
+            latencies, hits = [], 0
+            for i, query in enumerate(queries):
+                t0 = time.perf_counter()
+                _, labels = index.search(query[None, :], k)
+                latencies.append(time.perf_counter() - t0)
+                hits += len(set(labels[0].tolist()) & set(truth[i].tolist()))
+            results.append({
+                "kind": built,
+                "nprobe": nprobe,
+                "vectors": len(vectors),
+                "build_s": round(build_s, 3),
+                "mbytes": round(index_factory.index_bytes(index) / 1e6, 2),
+                f"recall@{k}": round(hits / (len(queries) * k), 4),
+                "p50_ms": round(_percentile_ms(latencies, 50), 3),
+                "p95_ms": round(_percentile_ms(latencies, 95), 3),
+                "p99_ms": round(_percentile_ms(latencies, 99), 3),
+            })
+    return results
+
+
+def print_table(results):
+    columns = list(results[0])
+    widths = [max(len(c), *(len(str(r[c])) for r in results)) for c in columns]
+    print("  ".join(c.ljust(w) for c, w in zip(columns, widths)))
+    for r in results:
+        print("  ".join(str(r[c]).ljust(w) for c, w in zip(columns, widths)))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark FAISS index kinds: recall vs latency vs RAM.")
+    parser.add_argument("--n", type=int, default=100_000, help="synthetic corpus size")
+    parser.add_argument("--dim", type=int, default=384, help="synthetic vector dimension")
+    parser.add_argument("--queries", type=int, default=500, help="synthetic held-out queries")
+    parser.add_argument("--corpus", help="IndexManager root to benchmark instead of synthetic data")
+    parser.add_argument("--questions", help="held-out questions, one per line (with --corpus)")
+    parser.add_argument("--model", default=DEFAULT_CORPUS_MODEL,
+                        help="the corpus's embedding model, used for the questions (with --corpus)")
+    parser.add_argument("--kinds", default=",".join(DEFAULT_KINDS))
+    parser.add_argument("--nprobe", default=str(index_factory.DEFAULT_NPROBE),
+                        help="comma-separated nprobe values (efSearch = 4 × nprobe)")
+    parser.add_argument("-k", type=int, default=DEFAULT_K)
+    parser.add_argument("--out", help="write results as JSON")
+    args = parser.parse_args(argv)
+
+    if args.corpus:
+        if not args.questions:
+            parser.error("--corpus needs --questions")
+        vectors, queries = from_corpus(args.corpus, args.questions, args.model)
+    else:
+        vectors, queries = synthetic(args.n, args.dim, args.queries)
+
+    results = benchmark(
+        vectors, queries,
+        kinds=args.kinds.split(","),
+        k=args.k,
+        nprobes=[int(p) for p in args.nprobe.split(",")],
+    )
+    print_table(results)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""Pick a context strategy by corpus size.
+
+Small corpora (a generated README, a short brief) are inlined straight into
+the prompt: no embedding model, no index, no retrieval round trip.  Only when
+the corpus exceeds a token budget is it chunked and indexed, streaming, and
+that index is served from the content-addressed ``IndexStore`` so it is built
+once per distinct corpus.
+"""
+
+import hashlib
+import threading
+from contextlib import nullcontext
+from itertools import chain
+
+from agentkit.tracing import estimate_tokens, span
+
+# === CONFIG ===
+DEFAULT_TOKEN_BUDGET = 3000
+DEFAULT_TOP_K = 6
+CHUNK_SIZE = 800
+CHUNK_OVERLAP = 80
+
+INLINE = "inline"
+INDEX = "index"
+
+
+class ContextPlanner:
+    """Build prompt context from ``Document``s, inlining it when it fits."""
+
+    def __init__(self, token_budget=DEFAULT_TOKEN_BUDGET, top_k=DEFAULT_TOP_K, store=None):
+        self.token_budget = token_budget
+        self.top_k = top_k
+        self._store = store
+        self._locks = {}
+        self._locks_lock = threading.Lock()
+
+    @property
+    def store(self):
+        # Only touch the disk cache when an index is actually needed.
+        if self._store is None:
+            from agentkit.index_store import IndexStore
+            self._store = IndexStore()
+        return self._store
+
+    def _lock_for(self, key):
+        if key is None:
+            return nullcontext()
+        with self._locks_lock:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _search(self, vectordb, query):
+        hits = vectordb.similarity_search(query, k=self.top_k)
+        return "\n\n".join(doc.page_content for doc in hits)
+
+    def build(self, docs, query, embedder_factory, model_name, key_data=None):
+        """Return ``(context_text, strategy)`` for ``query`` over ``docs``.
+
+        ``docs`` may be a lazy iterable (e.g. ``ingest.iter_pdf_pages``); it is
+        read only until the budget is exceeded to decide the strategy, then
+        streamed into the index.  ``key_data`` identifies the corpus (e.g. the
+        raw file bytes or their hash): with it, a previously built index is
+        reused without reading ``docs`` at all.  ``embedder_factory`` is only
+        called on the index path, so small corpora never load a model.
+        """
+        with span("context") as s:
+            context, strategy = self._build(docs, query, embedder_factory, model_name, key_data)
+            s.set(strategy=strategy, context_tokens=estimate_tokens(context))
+            return context, strategy
+
+    def _build(self, docs, query, embedder_factory, model_name, key_data):
+        # FAISS and LangChain load on the first build, not when apps import this.
+        from agentkit.index_store import index_key
+        from agentkit.ingest import index_chunks, iter_chunks
+
+        key = index_key(key_data, CHUNK_SIZE, CHUNK_OVERLAP, model_name) if key_data is not None else None
+        # Concurrent agents asking about the same corpus build its index once.
+        with self._lock_for(key):
+            if key is not None and key in self.store:
+                vectordb = self.store.load(key, embedder_factory())
+                if vectordb is not None:
+                    return self._search(vectordb, query), INDEX
+
+            docs = iter(docs)
+            head, tokens = [], 0
+            for doc in docs:
+                head.append(doc)
+                tokens += estimate_tokens(doc.page_content)
+                if tokens > self.token_budget:
+                    break
+            else:
+                return "\n\n".join(doc.page_content for doc in head), INLINE
+
+            hasher = hashlib.sha256()
+
+            def hashed(stream):
+                for doc in stream:
+                    hasher.update(doc.page_content.encode("utf-8") + b"\x00")
+                    yield doc
+
+            embedder = embedder_factory()
+            chunks = iter_chunks(hashed(chain(head, docs)), CHUNK_SIZE, CHUNK_OVERLAP)
+            vectordb = index_chunks(chunks, embedder)
+            if key is None:
+                key = index_key(hasher.digest(), CHUNK_SIZE, CHUNK_OVERLAP, model_name)
+            self.store.save(key, vectordb)
+            return self._search(vectordb, query), INDEX
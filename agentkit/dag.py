@@ -0,0 +1,76 @@
+"""Tiny thread-pool DAG executor for agent pipelines.
+
+Each node is a callable plus the names of the nodes it depends on; it is
+called with its dependencies' results as keyword arguments as soon as they
+are all available, so independent agents run concurrently and end-to-end
+latency approaches the critical path.  ``on_done`` is invoked on the calling
+thread as each node finishes, which keeps Streamlit writes on the script
+thread.  ``on_tick`` is likewise called on the calling thread every ``tick``
+seconds while nodes run, e.g. to render tokens they are streaming.  Nodes run
+in a copy of the caller's context, so tracing spans nest under its trace.
+"""
+
+import contextvars
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, NamedTuple, Sequence
+
+
+class Node(NamedTuple):
+    fn: Callable
+    deps: Sequence[str] = ()
+
+
+def run_dag(nodes, on_done=None, on_tick=None, tick=0.1, max_workers=None):
+    """Run ``{name: Node}`` and return ``(results, timings)``.
+
+    ``timings`` maps node name to wall seconds, plus ``"total"``.  The first
+    node error is re-raised once running nodes have finished; nodes that
+    were not started yet are skipped.
+    """
+    for name, node in nodes.items():
+        missing = [d for d in node.deps if d not in nodes]
+        if missing:
+            raise ValueError(f"Node {name!r} depends on unknown nodes {missing}")
+
+    results, timings = {}, {}
+    started_at = {}
+    pending = dict(nodes)
+    running = {}
+    start = time.perf_counter()
+
+    def timed(name, fn, kwargs):
+        started_at[name] = time.perf_counter()
+        return fn(**kwargs)
+
+    with ThreadPoolExecutor(max_workers=max_workers or len(nodes) or 1) as pool:
+        error = None
+        while pending or running:
+            if error is None:
+                for name in [n for n, node in pending.items() if all(d in results for d in node.deps)]:
+                    node = pending.pop(name)
+                    kwargs = {d: results[d] for d in node.deps}
+                    ctx = contextvars.copy_context()
+                    running[pool.submit(ctx.run, timed, name, node.fn, kwargs)] = name
+            if not running:
+                if error is not None:
+                    break
+                raise ValueError(f"Dependency cycle among nodes {sorted(pending)}")
+
+            done, _ = wait(running, timeout=tick if on_tick else None, return_when=FIRST_COMPLETED)
+            if on_tick is not None:
+                on_tick()
+            for future in done:
+                name = running.pop(future)
+                timings[name] = time.perf_counter() - started_at.get(name, start)
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                results[name] = future.result()
+                if on_done is not None:
+                    on_done(name, results[name], timings[name])
+
+    timings["total"] = time.perf_counter() - start
+    if error is not None:
+        raise error
+    return results, timings
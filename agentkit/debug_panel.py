@@ -0,0 +1,83 @@
+"""Streamlit debug panel: waterfall of the last request's trace.
+
+Takes the Streamlit container to draw into (``st``, ``st.sidebar``, a
+column, ...) so this module doesn't import Streamlit itself.
+"""
+
+import html
+import json
+
+from agentkit import tracing
+
+# === CONFIG ===
+BAR_COLORS = {
+    "llm": "#f28e2b",
+    "retrieve": "#4e79a7",
+    "answer_cache": "#59a14f",
+    "context": "#76b7b2",
+    "rerank": "#b07aa1",
+}
+DEFAULT_BAR_COLOR = "#9c9c9c"
+SHOWN_ATTRS = ("model", "outcome", "strategy", "mode", "candidates", "ttft_ms", "coalesced",
+               "prompt_tokens", "completion_tokens", "retries.", "ratelimit_wait_ms")
+
+
+def _attrs_text(attrs):
+    shown = [f"{k}={v}" for k, v in attrs.items() if any(k.startswith(a) for a in SHOWN_ATTRS)]
+    return ", ".join(shown)
+
+
+def _gauge_total(name):
+    gauges = tracing.metrics.snapshot()["gauges"]
+    return sum(v for k, v in gauges.items() if k == name or k.startswith(name + "{"))
+
+
+def waterfall_html(trace):
+    """HTML rows: indented span name, offset bar, duration and key attributes."""
+    total = max(trace.duration, 1e-9)
+    origin = trace.root.start
+    rows = []
+    for span in sorted(trace.spans, key=lambda s: s.start):
+        left = (span.start - origin) / total * 100
+        width = max(span.duration / total * 100, 0.5)
+        color = "#e15759" if span.error else BAR_COLORS.get(span.name, DEFAULT_BAR_COLOR)
+        indent = trace.depth(span) * 12
+        rows.append(
+            '<div style="display:flex;align-items:center;font-size:12px;margin:2px 0">'
+            f'<div style="width:38%;padding-left:{indent}px;white-space:nowrap;overflow:hidden;'
+            f'text-overflow:ellipsis" title="{html.escape(_attrs_text(span.attrs))}">'
+            f'{html.escape(span.name)}</div>'
+            '<div style="width:47%;position:relative;height:12px;background:#f3f3f3">'
+            f'<div style="position:absolute;left:{left:.2f}%;width:{width:.2f}%;height:12px;'
+            f'background:{color}"></div></div>'
+            f'<div style="width:15%;text-align:right">{span.duration * 1000:.0f} ms</div></div>'
+        )
+    return "".join(rows)
+
+
+def render_debug_panel(container, trace, title="🔍 Debug: last request"):
+    """Expander with the waterfall, totals and trace/metrics downloads."""
+    panel = container.expander(title)
+    if trace is None:
+        panel.caption("No request traced yet.")
+        return
+    panel.markdown(waterfall_html(trace), unsafe_allow_html=True)
+    totals = trace.totals()
+    panel.caption(
+        f"⏱️ {trace.duration * 1000:.0f} ms · "
+        f"🧮 {totals.get('prompt_tokens', 0)} prompt / {totals.get('completion_tokens', 0)} completion tokens · "
+        f"↻ {sum(v for k, v in totals.items() if k.startswith('retries'))} retries · "
+        f"🚦 LLM queue {_gauge_total('agentkit_llm_queue_depth')}, "
+        f"in flight {_gauge_total('agentkit_llm_in_flight')}"
+    )
+    details = [f"**{s.name}** — {_attrs_text(s.attrs)}" for s in trace.spans if _attrs_text(s.attrs)]
+    if details:
+        panel.markdown("  \n".join(details))
+    panel.download_button(
+        "⬇️ Trace (JSON)", json.dumps(trace.to_dict(), indent=2),
+        file_name=f"trace_{trace.trace_id}.json", mime="application/json",
+    )
+    panel.download_button(
+        "⬇️ Metrics (Prometheus)", tracing.metrics.prometheus_text(),
+        file_name="metrics.prom", mime="text/plain",
+    )
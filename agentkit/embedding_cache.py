@@ -0,0 +1,141 @@
+"""Chunk-level embedding cache and a batching, concurrent embedder wrapper.
+
+Vectors are stored in SQLite as raw float32 blobs keyed by
+``(model, sha256(normalized text))``.  ``CachedEmbeddings`` wraps any
+LangChain embedder and only sends cache misses to it, de-duplicated, in
+fixed-size batches with a bounded number of batches in flight.  Re-indexing a
+revised document therefore only pays for the chunks whose text changed.
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain.embeddings.base import Embeddings
+
+from agentkit import tracing
+
+# === CONFIG ===
+DEFAULT_PATH = os.environ.get("AGENTKIT_EMBED_CACHE", os.path.join(".cache", "embeddings.sqlite3"))
+DEFAULT_BATCH_SIZE = 64
+DEFAULT_MAX_CONCURRENCY = 4
+
+_WS = re.compile(r"\s+")
+
+
+def normalize_text(text):
+    """Whitespace-insensitive form of ``text`` used for cache keys."""
+    return _WS.sub(" ", text).strip()
+
+
+def text_key(text):
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Persistent ``(model, text hash) -> float32 vector`` map backed by SQLite."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings ("
+            " model TEXT NOT NULL, key TEXT NOT NULL, vec BLOB NOT NULL,"
+            " PRIMARY KEY (model, key))"
+        )
+        self._lock = threading.Lock()
+
+    def get_many(self, model, keys):
+        """Return ``{key: vector}`` for the keys that are cached."""
+        found = {}
+        keys = list(keys)
+        # Stay under SQLite's bound-parameter limit.
+        for i in range(0, len(keys), 500):
+            part = keys[i:i + 500]
+            marks = ",".join("?" * len(part))
+            with self._lock:
+                rows = self._conn.execute(
+                    f"SELECT key, vec FROM embeddings WHERE model = ? AND key IN ({marks})",
+                    [model, *part],
+                ).fetchall()
+            for key, blob in rows:
+                vec = array("f")
+                vec.frombytes(blob)
+                found[key] = vec.tolist()
+        return found
+
+    def put_many(self, model, items):
+        """Store ``(key, vector)`` pairs."""
+        rows = [(model, key, array("f", vec).tobytes()) for key, vec in items]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain ``Embeddings`` that consults an ``EmbeddingCache`` first.
+
+    ``model`` namespaces the cache and must change whenever the wrapped
+    embedder would produce different vectors.
+    """
+
+    def __init__(self, embedder, model, cache=None,
+                 batch_size=DEFAULT_BATCH_SIZE, max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        self.embedder = embedder
+        self.model = model
+        self.cache = cache if cache is not None else EmbeddingCache()
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.hits = 0
+        self.misses = 0
+
+    def _embed_misses(self, texts):
+        batches = [texts[i:i + self.batch_size] for i in range(0, len(texts), self.batch_size)]
+        if len(batches) == 1 or self.max_concurrency <= 1:
+            return [vec for batch in batches for vec in self.embedder.embed_documents(batch)]
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+            results = pool.map(self.embedder.embed_documents, batches)
+            return [vec for batch in results for vec in batch]
+
+    def embed_documents(self, texts):
+        keys = [text_key(t) for t in texts]
+        cached = self.cache.get_many(self.model, set(keys))
+
+        # One request per distinct missing text, even if it repeats in ``texts``.
+        missing = {}
+        for key, text in zip(keys, texts):
+            if key not in cached and key not in missing:
+                missing[key] = text
+        self.hits += len(texts) - len(missing)
+        self.misses += len(missing)
+        tracing.count("agentkit_embedding_cache_total", len(texts) - len(missing), outcome="hit")
+        tracing.count("agentkit_embedding_cache_total", len(missing), outcome="miss")
+
+        if missing:
+            vectors = self._embed_misses(list(missing.values()))
+            fresh = list(zip(missing.keys(), vectors))
+            self.cache.put_many(self.model, fresh)
+            cached.update(fresh)
+        return [list(cached[key]) for key in keys]
+
+    def embed_query(self, text):
+        # Query and document embeddings can differ (task types), so queries
+        # live in their own namespace.
+        model = self.model + "#query"
+        key = text_key(text)
+        cached = self.cache.get_many(model, [key])
+        if key in cached:
+            return cached[key]
+        vec = self.embedder.embed_query(text)
+        self.cache.put_many(model, [(key, vec)])
+        return list(vec)
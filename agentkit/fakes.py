@@ -0,0 +1,140 @@
+"""Deterministic local stand-ins for the chat model and the embedder.
+
+Used by the benchmark suite (``agentkit.bench``) and headless runs without an
+API key.  Both have configurable latency so the apps' own overhead can be
+measured against a realistic, repeatable model cost:
+
+* ``FakeChatModel`` is a LangChain chat model that streams a reply derived
+  from a hash of the prompt, after a first-token delay and a per-token delay.
+  Prompts carrying ``structured.format_instructions`` get a JSON reply that
+  matches the schema.
+* ``FakeEmbeddings`` sums hashed per-word vectors, so texts sharing words are
+  close and retrieval, routing and caching behave sensibly.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Any, AsyncIterator, Iterator, List
+
+import numpy as np
+from langchain.embeddings.base import Embeddings
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from agentkit.hybrid import tokenize
+from agentkit.structured import SCHEMA_MARKER
+
+# === CONFIG ===
+DEFAULT_DIM = 384
+VOCABULARY = (
+    "policy leave annual sick days employee manager request portal approval payroll "
+    "payslip month salary review appraisal form submit team project phase week goal "
+    "deliverable report milestone plan schedule meeting update please note the a to "
+    "of and for with within your our is are will be by on"
+).split()
+
+
+def _seed(text):
+    return int.from_bytes(hashlib.md5(text.encode("utf-8")).digest()[:8], "little")
+
+
+def example_for(schema, rng):
+    """Smallest value matching a JSON-schema subset, with random words as strings."""
+    if "enum" in schema:
+        return rng.choice(schema["enum"])
+    kind = schema.get("type")
+    kind = kind[0] if isinstance(kind, list) else kind
+    if kind == "object":
+        return {key: example_for(sub, rng) for key, sub in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [example_for(schema.get("items", {}), rng) for _ in range(max(1, schema.get("minItems", 1)))]
+    if kind in ("integer", "number"):
+        return schema.get("minimum", 1)
+    if kind == "boolean":
+        return False
+    if kind == "null":
+        return None
+    return " ".join(rng.choice(VOCABULARY) for _ in range(8))
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model with a fixed first-token and per-token latency."""
+
+    first_token_latency: float = 0.3
+    token_latency: float = 0.01
+    reply_tokens: int = 40
+    calls: int = 0
+
+    @property
+    def _llm_type(self) -> str:
+        return "agentkit-fake-chat"
+
+    def _tokens(self, messages):
+        prompt = "\n".join(str(m.content) for m in messages)
+        rng = random.Random(_seed(prompt))
+        at = prompt.rfind(SCHEMA_MARKER)
+        if at < 0:
+            return [rng.choice(VOCABULARY) + " " for _ in range(self.reply_tokens)]
+        schema, _ = json.JSONDecoder().raw_decode(prompt, prompt.index("{", at))
+        text = json.dumps(example_for(schema, rng))
+        size = -(-len(text) // self.reply_tokens)
+        return [text[i:i + size] for i in range(0, len(text), size)]
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        self.calls += 1
+        time.sleep(self.first_token_latency)
+        for i, token in enumerate(self._tokens(messages)):
+            if i:
+                time.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def _astream(self, messages, stop=None, run_manager=None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        self.calls += 1
+        await asyncio.sleep(self.first_token_latency)
+        for i, token in enumerate(self._tokens(messages)):
+            if i:
+                await asyncio.sleep(self.token_latency)
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs: Any) -> ChatResult:
+        text = "".join(chunk.message.content for chunk in self._stream(messages))
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=text))])
+
+
+class FakeEmbeddings(Embeddings):
+    """Hashed bag-of-words embeddings with per-call and per-text latency."""
+
+    def __init__(self, dim=DEFAULT_DIM, call_latency=0.0, text_latency=0.0):
+        self.dim = dim
+        self.call_latency = call_latency
+        self.text_latency = text_latency
+        self.texts_embedded = 0
+        self._words = {}
+        self._lock = threading.Lock()
+
+    def _word(self, word):
+        vec = self._words.get(word)
+        if vec is None:
+            vec = np.random.default_rng(_seed(word)).standard_normal(self.dim).astype("float32")
+            self._words[word] = vec
+        return vec
+
+    def _embed(self, text):
+        words = tokenize(text) or [text]
+        vec = np.sum([self._word(w) for w in words], axis=0)
+        return (vec / (np.linalg.norm(vec) or 1.0)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        time.sleep(self.call_latency + self.text_latency * len(texts))
+        with self._lock:
+            self.texts_embedded += len(texts)
+        return [self._embed(t) for t in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
@@ -0,0 +1,148 @@
+"""Hybrid lexical + vector retrieval helpers.
+
+``BM25Index`` is an incrementally maintained inverted index (Okapi BM25),
+``reciprocal_rank_fusion`` merges ranked lists from different retrievers,
+and ``CrossEncoderReranker`` optionally re-scores the fused candidates with a
+local cross-encoder, stopping when its latency budget runs out.
+"""
+
+import math
+import re
+import threading
+import time
+from collections import Counter, defaultdict
+
+from agentkit import resources, tracing
+
+# === CONFIG ===
+BM25_K1 = 1.5
+BM25_B = 0.75
+RRF_K = 60
+DEFAULT_RERANK_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+DEFAULT_RERANK_BUDGET_MS = 150
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it my of on or our "
+    "the this to was we what when where which who why will with you your".split()
+)
+
+
+def tokenize(text):
+    return [t for t in _TOKEN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over documents addressed by arbitrary hashable keys."""
+
+    def __init__(self, k1=BM25_K1, b=BM25_B):
+        self.k1 = k1
+        self.b = b
+        self._postings = defaultdict(dict)  # term -> {key: term frequency}
+        self._lengths = {}
+        self._terms = {}  # key -> its terms, so removal touches only their postings
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._lengths)
+
+    def add(self, key, text):
+        terms = Counter(tokenize(text))
+        with self._lock:
+            if key in self._lengths:
+                self._remove(key)
+            for term, tf in terms.items():
+                self._postings[term][key] = tf
+            length = sum(terms.values())
+            self._lengths[key] = length
+            self._terms[key] = tuple(terms)
+            self._total_length += length
+
+    def remove(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key):
+        length = self._lengths.pop(key, None)
+        if length is None:
+            return
+        self._total_length -= length
+        for term in self._terms.pop(key):
+            del self._postings[term][key]
+            if not self._postings[term]:
+                del self._postings[term]
+
+    def search(self, query, k=10, allowed=None, boost_terms=(), boost=0.5):
+        """Top ``k`` ``(key, score)`` for ``query``, limited to ``allowed`` keys.
+
+        ``boost_terms`` (e.g. the intent's domain keywords) count as extra
+        query terms with weight ``boost``.
+        """
+        weights = Counter(tokenize(query))
+        for term in tokenize(" ".join(boost_terms)):
+            weights[term] = max(weights[term], boost)
+
+        with self._lock:
+            n = len(self._lengths)
+            if not n:
+                return []
+            avgdl = self._total_length / n
+            scores = defaultdict(float)
+            for term, weight in weights.items():
+                docs = self._postings.get(term)
+                if not docs:
+                    continue
+                idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                for key, tf in docs.items():
+                    if allowed is not None and key not in allowed:
+                        continue
+                    norm = tf + self.k1 * (1 - self.b + self.b * self._lengths[key] / avgdl)
+                    scores[key] += weight * idf * tf * (self.k1 + 1) / norm
+        return sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+
+
+def reciprocal_rank_fusion(rankings, k=RRF_K):
+    """Fuse ranked key lists: ``score(key) = sum(1 / (k + rank))``."""
+    scores = defaultdict(float)
+    for ranking in rankings:
+        for rank, key in enumerate(ranking):
+            scores[key] += 1.0 / (k + rank + 1)
+    return [key for key, _ in sorted(scores.items(), key=lambda item: item[1], reverse=True)]
+
+
+class CrossEncoderReranker:
+    """Re-score candidates with a local cross-encoder under a latency budget.
+
+    Candidates are scored in small batches in their fused order; once the
+    budget is spent the remaining ones keep their fused position after the
+    scored ones.  The model is loaded once per process via
+    ``agentkit.resources``.
+    """
+
+    def __init__(self, model_name=DEFAULT_RERANK_MODEL, budget_ms=DEFAULT_RERANK_BUDGET_MS, batch_size=4):
+        self.model_name = model_name
+        self.budget_ms = budget_ms
+        self.batch_size = batch_size
+
+    def _model(self):
+        def create():
+            from sentence_transformers import CrossEncoder
+            return CrossEncoder(self.model_name)
+        return resources.get_or_create(("cross_encoder", self.model_name), create)
+
+    @tracing.traced("rerank")
+    def rerank(self, query, docs, top_n):
+        model = self._model()
+        deadline = time.perf_counter() + self.budget_ms / 1000.0
+        scored = []
+        i = 0
+        while i < len(docs) and time.perf_counter() < deadline:
+            batch = docs[i:i + self.batch_size]
+            scores = model.predict([(query, doc.page_content) for doc in batch])
+            scored.extend(zip(scores, range(i, i + len(batch))))
+            i += len(batch)
+        tracing.annotate(scored=i, candidates=len(docs))
+        order = [idx for _, idx in sorted(scored, key=lambda item: item[0], reverse=True)]
+        order += list(range(i, len(docs)))
+        return [docs[idx] for idx in order[:top_n]]
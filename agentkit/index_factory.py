@@ -0,0 +1,183 @@
+"""FAISS index types chosen by corpus size.
+
+Exact flat search over float32 is the right call for a handbook or two, but
+its latency and RAM grow linearly with the corpus.  Past a few tens of
+thousands of chunks the index is rebuilt as an inverted file (IVF) whose
+lists are stored as float32, int8 (``SQ8``) or product-quantized codes
+(``PQ``) as the corpus grows; write-once indexes may also use HNSW.
+
+Every kind supports ``add_with_ids`` so vector ids stay stable across a
+rebuild.  ``AGENTKIT_INDEX_KIND`` forces one kind for every index.
+"""
+
+import math
+import os
+
+import faiss
+import numpy as np
+
+# === CONFIG ===
+FORCED_KIND = os.environ.get("AGENTKIT_INDEX_KIND")
+
+FLAT_MAX = 50_000          # exact search stays within a few ms below this
+IVF_FLAT_MAX = 250_000
+IVF_SQ8_MAX = 2_000_000    # beyond this even int8 lists cost too much RAM
+HNSW_MAX = 1_000_000       # write-once indexes only: HNSW cannot remove ids
+
+DEFAULT_NPROBE = 16
+# Scoped IVF searches probe enough lists to expect this many times k allowed vectors.
+SCOPE_OVERSAMPLE = 4
+DEFAULT_EF_SEARCH = 64
+TRAIN_POINTS_PER_LIST = 64
+MIN_TRAIN_POINTS = 256     # PQ codebooks need 256 points; below this use flat
+SEED = 1234
+
+KINDS = {
+    "flat": "IDMap,Flat",
+    "flat_fp16": "IDMap,SQfp16",
+    "ivf_flat": "IVF{nlist},Flat",
+    "ivf_fp16": "IVF{nlist},SQfp16",
+    "ivf_sq8": "IVF{nlist},SQ8",
+    "ivf_pq": "IVF{nlist},PQ{m}",
+    "hnsw": "IDMap,HNSW32,Flat",
+    "hnsw_fp16": "IDMap,HNSW32,SQfp16",
+}
+# Kinds whose vectors can be removed in place (required by ``IndexManager``).
+MUTABLE_KINDS = ("flat", "flat_fp16", "ivf_flat", "ivf_fp16", "ivf_sq8", "ivf_pq")
+
+
+def choose_kind(n_vectors, mutable=True):
+    """Index kind for a corpus of ``n_vectors``."""
+    if FORCED_KIND and (FORCED_KIND in MUTABLE_KINDS or not mutable):
+        return FORCED_KIND
+    if n_vectors <= FLAT_MAX:
+        return "flat"
+    if not mutable and n_vectors <= HNSW_MAX:
+        return "hnsw"
+    if n_vectors <= IVF_FLAT_MAX:
+        return "ivf_flat"
+    if n_vectors <= IVF_SQ8_MAX:
+        return "ivf_sq8"
+    return "ivf_pq"
+
+
+def nlist_for(n_vectors):
+    """~4·√n inverted lists, rounded to a power of two (never more than n)."""
+    nlist = 2 ** round(math.log2(max(1.0, 4 * math.sqrt(n_vectors))))
+    return max(1, min(nlist, n_vectors))
+
+
+def _pq_subquantizers(dim):
+    # About one byte per 8 dimensions; the count has to divide ``dim``.
+    for m in range(max(1, dim // 8), 0, -1):
+        if dim % m == 0:
+            return m
+    return 1
+
+
+def factory_string(kind, n_vectors, dim):
+    return KINDS[kind].format(nlist=nlist_for(n_vectors), m=_pq_subquantizers(dim))
+
+
+def tune(index, nprobe=DEFAULT_NPROBE, ef_search=DEFAULT_EF_SEARCH):
+    """Set the recall/latency knobs used by plain ``index.search`` calls."""
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = min(nprobe, ivf.nlist)
+    elif hasattr(faiss.downcast_index(getattr(index, "index", index)), "hnsw"):
+        faiss.ParameterSpace().set_index_parameter(index, "efSearch", ef_search)
+    return index
+
+
+def search_params(index, selector=None):
+    """``SearchParameters`` carrying ``selector`` and the index's own knobs.
+
+    Explicit parameters replace the index defaults, so an IVF search with a
+    selector must repeat ``nprobe`` or it silently drops to one list.
+    """
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        return faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nprobe)
+    inner = faiss.downcast_index(getattr(index, "index", index))
+    if hasattr(inner, "hnsw"):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=inner.hnsw.efSearch)
+    return faiss.SearchParameters(sel=selector)
+
+
+def search_scoped(index, queries, k, ids):
+    """``index.search`` restricted to the vector ``ids``.
+
+    An IVF index only scans the ``nprobe`` lists nearest the query, and a
+    small scope (one tenant's handbook in a large corpus) may have no vectors
+    there at all.  ``nprobe`` is raised until the probed lists should hold
+    ``SCOPE_OVERSAMPLE × k`` allowed vectors, and if a query still comes back
+    short the search is repeated over every list.
+    """
+    ids = np.asarray(ids, dtype="int64")
+    selector = faiss.IDSelectorBatch(ids)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is None:
+        return index.search(queries, k, params=search_params(index, selector))
+    wanted = math.ceil(ivf.nlist * SCOPE_OVERSAMPLE * k / max(1, len(ids)))
+    nprobe = min(ivf.nlist, max(ivf.nprobe, wanted))
+    distances, labels = index.search(queries, k, params=faiss.SearchParametersIVF(sel=selector, nprobe=nprobe))
+    if nprobe < ivf.nlist and ((labels != -1).sum(axis=1) < min(k, len(ids))).any():
+        params = faiss.SearchParametersIVF(sel=selector, nprobe=ivf.nlist)
+        distances, labels = index.search(queries, k, params=params)
+    return distances, labels
+
+
+def build_index(vectors, ids=None, kind=None, mutable=True):
+    """Train (if needed) and fill an index of ``kind`` with ``vectors``.
+
+    ``ids`` default to ``0..n-1``.  Returns ``(index, kind)``.
+    """
+    vectors = np.ascontiguousarray(vectors, dtype="float32")
+    n, dim = vectors.shape
+    kind = kind or choose_kind(n, mutable=mutable)
+    index = faiss.index_factory(dim, factory_string(kind, n, dim))
+    if not index.is_trained and n < MIN_TRAIN_POINTS:
+        kind = "flat"
+        index = faiss.index_factory(dim, KINDS[kind])
+    if not index.is_trained:
+        nlist = nlist_for(n)
+        sample = vectors
+        if n > nlist * TRAIN_POINTS_PER_LIST:
+            rng = np.random.default_rng(SEED)
+            sample = vectors[rng.choice(n, nlist * TRAIN_POINTS_PER_LIST, replace=False)]
+        index.train(sample)
+    if ids is None:
+        ids = np.arange(n, dtype="int64")
+    index.add_with_ids(vectors, np.asarray(ids, dtype="int64"))
+    return tune(index), kind
+
+
+def optimize_vectorstore(vectordb, kind=None):
+    """Swap a LangChain ``FAISS`` store's flat index for one sized to it.
+
+    Positions are preserved, so the store's position → docstore mapping
+    stays valid.  Small stores are returned untouched.
+    """
+    index = vectordb.index
+    kind = kind or choose_kind(index.ntotal, mutable=False)
+    if kind == "flat" or index.ntotal == 0:
+        return vectordb
+    vectors = index.reconstruct_n(0, index.ntotal)
+    vectordb.index, _ = build_index(vectors, kind=kind, mutable=False)
+    return vectordb
+
+
+def index_ids(index):
+    """Every vector id stored in ``index`` (``IDMap`` or IVF)."""
+    if hasattr(index, "id_map"):
+        return faiss.vector_to_array(index.id_map)
+    ivf = faiss.extract_index_ivf(index)
+    lists = ivf.invlists
+    ids = [faiss.rev_swig_ptr(lists.get_ids(l), lists.list_size(l)).copy()
+           for l in range(ivf.nlist) if lists.list_size(l)]
+    return np.concatenate(ids) if ids else np.empty(0, dtype="int64")
+
+
+def index_bytes(index):
+    """Serialized size of ``index``, a close proxy for its resident RAM."""
+    return int(faiss.serialize_index(index).nbytes)
@@ -0,0 +1,375 @@
+"""Incrementally maintained FAISS index over a set of versioned documents.
+
+Each document is split into chunks and every chunk is addressed by the hash
+of its normalized text.  When a new version of a document arrives the chunk
+sets are diffed: vectors for chunks that disappeared are removed from the
+index and only the new chunks are embedded and added.  Diffing and
+embedding happen outside the corpus lock, so an upload never blocks
+searches; the lock is only taken to swap vectors in and out.
+
+Persistence is incremental too.  Every document has its own file with its
+chunks and their float32 vectors, rewritten only when that document
+changes, and the manifest holds one small entry per document, so
+maintenance I/O scales with the size of the change rather than the size of
+the corpus.  The FAISS index itself is a checkpoint, written once
+``INDEX_SAVE_EVERY`` vectors have changed (and by ``save()``); on load it is
+reconciled with the document files, which are the source of truth.
+
+The index starts as an exact ``IndexIDMap(IndexFlatL2)`` and is rebuilt as
+an IVF index (float32, int8 or PQ lists, see ``index_factory``) when the
+corpus outgrows it, keeping the same vector ids.  Rebuilds use the stored
+float32 vectors, never lossy index codes, and need no embedder.
+
+Unlike ``IndexStore`` (user-facing cache entries, LRU-evicted within a byte
+budget and memory-mapped on load), this is the record of uploaded
+documents: nothing is evicted behind a user's back, and the index is read
+into RAM because it is updated in place.  Use ``remove()`` to drop
+documents.
+
+Layout under ``root``::
+
+    manifest.json       {"layout", "next_id", "index": {...}, "documents": {doc_id: {...}}}
+    docs/<id>-v<n>.npz  one document version: vector ids, vectors, chunk keys/texts/metadata
+    index.faiss         FAISS index checkpoint, labels are vector ids
+"""
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+
+import faiss
+import numpy as np
+from langchain.schema import Document
+
+from agentkit import index_factory
+from agentkit.embedding_cache import text_key
+
+# === CONFIG ===
+DEFAULT_ROOT = os.environ.get("AGENTKIT_CORPUS_DIR", os.path.join(".cache", "corpus"))
+
+LAYOUT = 2
+INDEX_FILE = "index.faiss"
+MANIFEST_FILE = "manifest.json"
+DOCS_DIR = "docs"
+# Re-train an IVF index once the corpus has grown this much since it was built.
+REBUILD_GROWTH = 4
+# Vectors added or removed before the index checkpoint is rewritten.
+INDEX_SAVE_EVERY = 2000
+
+
+def _write_atomic(path, write):
+    tmp = path + ".tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_json(path, data):
+    def write(tmp):
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+    _write_atomic(path, write)
+
+
+def _doc_file(doc_id, version):
+    return f"{hashlib.sha256(doc_id.encode('utf-8')).hexdigest()[:16]}-v{version}.npz"
+
+
+class IndexManager:
+    """Versioned document corpus backed by a mutable FAISS index.
+
+    ``embedder`` is the default for ``upsert``; callers may pass their own
+    per call instead.  Reads of the index and the in-memory maps hold
+    ``self.lock``.
+    """
+
+    def __init__(self, embedder=None, root=DEFAULT_ROOT):
+        self.embedder = embedder
+        self.root = root
+        self.lock = threading.RLock()
+        os.makedirs(os.path.join(self.root, DOCS_DIR), exist_ok=True)
+
+        self.manifest = {"layout": LAYOUT, "next_id": 0, "index": {"kind": "flat", "built_at": 0}, "documents": {}}
+        self._chunks = {}  # doc_id -> {chunk key: vector id}
+        self._docs = {}    # str(vector id) -> Document
+        self.index = None
+        self._listeners = []
+        self._doc_locks = {}
+        self._unsaved = 0
+        self._generation = 0
+        self._load()
+
+    # === PERSISTENCE ===
+    def _path(self, *names):
+        return os.path.join(self.root, *names)
+
+    def _read_doc(self, entry):
+        with np.load(self._path(DOCS_DIR, entry["file"])) as data:
+            ids, vectors = data["ids"], data["vectors"]
+            chunks = json.loads(str(data["chunks"]))
+        return ids, vectors, chunks
+
+    def _write_doc(self, name, ids, vectors, chunks):
+        def write(tmp):
+            with open(tmp, "wb") as f:
+                np.savez(f, ids=np.asarray(ids, dtype="int64"), vectors=vectors,
+                         chunks=np.array(json.dumps(chunks)))
+        _write_atomic(self._path(DOCS_DIR, name), write)
+
+    def _load(self):
+        if not os.path.exists(self._path(MANIFEST_FILE)):
+            return
+        with open(self._path(MANIFEST_FILE), "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("layout") != LAYOUT:
+            # Older single-file layout: start empty; re-uploads re-index from the embedding cache.
+            for name in (INDEX_FILE, "chunks.json"):
+                if os.path.exists(self._path(name)):
+                    os.remove(self._path(name))
+            return
+        self.manifest = manifest
+        vectors = {}
+        for doc_id, entry in manifest["documents"].items():
+            ids, vecs, chunks = self._read_doc(entry)
+            self._chunks[doc_id] = {c["key"]: str(vid) for vid, c in zip(ids.tolist(), chunks)}
+            for vid, vec, c in zip(ids.tolist(), vecs, chunks):
+                self._docs[str(vid)] = Document(page_content=c["text"], metadata=c["metadata"])
+                vectors[vid] = vec
+        index = faiss.read_index(self._path(INDEX_FILE)) if os.path.exists(self._path(INDEX_FILE)) else None
+        if index is None:
+            if vectors:
+                self._attach(index_factory.build_index(
+                    np.stack(list(vectors.values())), ids=list(vectors), kind=manifest["index"]["kind"])[0])
+            return
+        # The checkpoint may predate the last changes: make it match the documents.
+        indexed = set(index_factory.index_ids(index).tolist())
+        extra = [vid for vid in indexed if vid not in vectors]
+        missing = [vid for vid in vectors if vid not in indexed]
+        if extra:
+            index.remove_ids(np.array(extra, dtype="int64"))
+        if missing:
+            index.add_with_ids(np.stack([vectors[v] for v in missing]), np.array(missing, dtype="int64"))
+        self._attach(index)
+        self._unsaved = len(extra) + len(missing)
+
+    def _save_manifest(self):
+        _write_json(self._path(MANIFEST_FILE), self.manifest)
+
+    def _save_index(self):
+        if self.index is not None:
+            _write_atomic(self._path(INDEX_FILE), lambda tmp: faiss.write_index(self.index, tmp))
+        self._unsaved = 0
+
+    def save(self):
+        """Write the manifest and an index checkpoint now."""
+        with self.lock:
+            self._save_manifest()
+            self._save_index()
+
+    def _attach(self, index):
+        self.index = index_factory.tune(index)
+
+    # === QUERIES ===
+    def version(self, doc_id):
+        """Current ``{"version", "sha256", ...}`` entry for ``doc_id`` or ``None``."""
+        return self.manifest["documents"].get(doc_id)
+
+    def is_current(self, doc_id, sha256):
+        entry = self.version(doc_id)
+        return entry is not None and entry["sha256"] == sha256
+
+    def documents(self, tenant=None):
+        """Ids of the current documents, optionally limited to one tenant."""
+        return [
+            doc_id for doc_id, entry in list(self.manifest["documents"].items())
+            if tenant is None or entry.get("metadata", {}).get("tenant") == tenant
+        ]
+
+    def vector_ids(self, doc_ids):
+        """FAISS labels of every chunk belonging to ``doc_ids``."""
+        with self.lock:
+            return [int(vid) for d in doc_ids for vid in self._chunks.get(d, {}).values()]
+
+    def chunk(self, vid):
+        return self._docs.get(str(vid))
+
+    def vectors(self, doc_ids=None):
+        """``(ids, vectors)`` stored for ``doc_ids`` (default: every document).
+
+        Read from the document files, so these are the embedder's float32
+        vectors whatever codes the index keeps.
+        """
+        with self.lock:
+            docs = self.manifest["documents"]
+            entries = [dict(docs[d]) for d in (docs if doc_ids is None else doc_ids) if d in docs]
+        ids, vectors = [], []
+        for entry in entries:
+            stored_ids, doc_vectors, _ = self._read_doc(entry)
+            ids.extend(stored_ids.tolist())
+            vectors.extend(doc_vectors)
+        return ids, np.array(vectors, dtype="float32")
+
+    def subscribe(self, listener):
+        """Call ``listener(added, removed)`` on every change to the chunk set.
+
+        ``added`` maps vector ids to ``Document``s and ``removed`` lists vector
+        ids.  The current chunks are replayed as ``added`` straight away so
+        side indexes (e.g. BM25) start in sync.
+        """
+        with self.lock:
+            self._listeners.append(listener)
+            listener({int(vid): doc for vid, doc in self._docs.items()}, [])
+
+    def _notify(self, added, removed):
+        for listener in self._listeners:
+            listener(added, removed)
+
+    # === UPDATES ===
+    def _doc_lock(self, doc_id):
+        with self.lock:
+            return self._doc_locks.setdefault(doc_id, threading.Lock())
+
+    def upsert(self, doc_id, chunks, sha256, metadata=None, embedder=None):
+        """Make ``chunks`` the current version of ``doc_id``.
+
+        Returns ``(added, removed)`` chunk counts.  A no-op if ``sha256``
+        matches the current version.  New chunks are embedded with
+        ``embedder`` (default: the manager's).
+        """
+        embedder = embedder or self.embedder
+        metadata = metadata or {}
+        # Same-document upserts queue here; other documents and searches don't.
+        with self._doc_lock(doc_id):
+            with self.lock:
+                if self.is_current(doc_id, sha256):
+                    return 0, 0
+                entry = dict(self.version(doc_id) or {"version": 0, "history": []})
+                old = dict(self._chunks.get(doc_id, {}))
+
+            new = {}
+            for chunk in chunks:
+                new.setdefault(text_key(chunk.page_content), chunk)
+            stale = [int(vid) for key, vid in old.items() if key not in new]
+            fresh = [(key, chunk) for key, chunk in new.items() if key not in old]
+            if fresh:
+                fresh_vectors = np.array(embedder.embed_documents([c.page_content for _, c in fresh]),
+                                         dtype="float32")
+            # Kept chunks reuse the vectors stored with the previous version.
+            kept = []
+            if "file" in entry:
+                ids, vectors, stored = self._read_doc(entry)
+                kept = [(vid, vec, c) for vid, vec, c in zip(ids.tolist(), vectors, stored) if c["key"] in new]
+
+            with self.lock:
+                start = self.manifest["next_id"]
+                self.manifest["next_id"] = start + len(fresh)
+            fresh_ids = list(range(start, start + len(fresh)))
+
+            # The new version's file, written before the manifest points at it.
+            records = [c for _, _, c in kept]
+            ids = [vid for vid, _, _ in kept]
+            vectors = [vec for _, vec, _ in kept]
+            fresh_docs = {}
+            for vid, (key, chunk), vec in zip(fresh_ids, fresh, fresh_vectors if fresh else ()):
+                meta = {**chunk.metadata, **metadata, "doc_id": doc_id}
+                fresh_docs[vid] = Document(page_content=chunk.page_content, metadata=meta)
+                records.append({"key": key, "text": chunk.page_content, "metadata": meta})
+                ids.append(vid)
+                vectors.append(vec)
+            now = datetime.now().isoformat()
+            version = entry["version"] + 1
+            name = _doc_file(doc_id, version)
+            dim = fresh_vectors.shape[1] if fresh else (len(vectors[0]) if vectors else 0)
+            self._write_doc(name, ids, np.array(vectors, dtype="float32").reshape(len(ids), dim), records)
+
+            with self.lock:
+                self._remove_vectors(stale)
+                if fresh:
+                    self._add_vectors(fresh_ids, fresh_vectors, fresh_docs)
+                self._chunks[doc_id] = {r["key"]: str(vid) for r, vid in zip(records, ids)}
+                self.manifest["documents"][doc_id] = {
+                    "version": version,
+                    "sha256": sha256,
+                    "updated_at": now,
+                    "file": name,
+                    "metadata": metadata,
+                    "history": entry["history"] + [{
+                        "version": version, "sha256": sha256, "updated_at": now,
+                        "added": len(fresh), "removed": len(stale),
+                    }],
+                }
+                self._changed(len(fresh) + len(stale))
+            if "file" in entry:
+                os.remove(self._path(DOCS_DIR, entry["file"]))
+        self._maybe_rebuild()
+        return len(fresh), len(stale)
+
+    def remove(self, doc_id):
+        """Drop every vector of ``doc_id`` from the corpus."""
+        with self._doc_lock(doc_id):
+            with self.lock:
+                entry = self.manifest["documents"].pop(doc_id, None)
+                if entry is None:
+                    return 0
+                vids = [int(v) for v in self._chunks.pop(doc_id).values()]
+                self._remove_vectors(vids)
+                self._changed(len(vids))
+            os.remove(self._path(DOCS_DIR, entry["file"]))
+            return len(vids)
+
+    def _changed(self, vectors):
+        # Manifest on every change (it is small); the index every so often.
+        self._generation += 1
+        self._save_manifest()
+        self._unsaved += vectors
+        if self._unsaved >= INDEX_SAVE_EVERY:
+            self._save_index()
+
+    def _maybe_rebuild(self):
+        with self.lock:
+            if self.index is None:
+                return
+            n = self.index.ntotal
+            info = self.manifest["index"]
+            kind = index_factory.choose_kind(n)
+            grown = info["kind"] != "flat" and n > REBUILD_GROWTH * max(1, info["built_at"])
+        if kind != info["kind"] or grown:
+            self.rebuild(kind)
+
+    def rebuild(self, kind=None):
+        """Re-create the index as ``kind`` (default: sized to the corpus).
+
+        Vectors come from the document files rather than the old index, which
+        may hold lossy int8/PQ codes.  The new index is trained outside the
+        lock and only swapped in if nothing changed meanwhile.
+        """
+        with self.lock:
+            generation = self._generation
+        ids, vectors = self.vectors()
+        if not ids:
+            return
+        index, kind = index_factory.build_index(vectors, ids=ids, kind=kind)
+        with self.lock:
+            if generation != self._generation:
+                return  # the next upsert tries again
+            self._attach(index)
+            self.manifest["index"] = {"kind": kind, "built_at": index.ntotal}
+            self._save_manifest()
+            self._save_index()
+
+    def _remove_vectors(self, vids):
+        if not vids or self.index is None:
+            return
+        self.index.remove_ids(np.array(vids, dtype="int64"))
+        for vid in vids:
+            self._docs.pop(str(vid), None)
+        self._notify({}, list(vids))
+
+    def _add_vectors(self, ids, vectors, docs):
+        if self.index is None:
+            self._attach(faiss.IndexIDMap(faiss.IndexFlatL2(vectors.shape[1])))
+        self.index.add_with_ids(vectors, np.array(ids, dtype="int64"))
+        for vid, doc in docs.items():
+            self._docs[str(vid)] = doc
+        self._notify(docs, [])
@@ -0,0 +1,146 @@
+"""On-disk, content-addressed cache of FAISS indexes.
+
+An entry is keyed by a hash of the source document bytes plus everything that
+influences the vectors (chunk size, chunk overlap, embedding model), so the
+same upload always maps to the same entry no matter which process or worker
+sees it.  Each entry is a directory holding the raw FAISS index and the chunk
+texts/metadata; indexes are memory-mapped on reload where FAISS supports it.
+The store is bounded in bytes and evicts least-recently-used entries.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+
+import faiss
+from langchain.docstore.in_memory import InMemoryDocstore
+from langchain.schema import Document
+from langchain.vectorstores import FAISS
+
+# === CONFIG ===
+DEFAULT_ROOT = os.environ.get("AGENTKIT_INDEX_DIR", os.path.join(".cache", "indexes"))
+DEFAULT_MAX_BYTES = int(os.environ.get("AGENTKIT_INDEX_MAX_MB", "512")) * 1024 * 1024
+
+INDEX_FILE = "index.faiss"
+CHUNKS_FILE = "chunks.json"
+
+
+def index_key(data, chunk_size, chunk_overlap, model):
+    """Content address for ``data`` indexed with the given chunking/model."""
+    h = hashlib.sha256()
+    h.update(data)
+    h.update(f"|{chunk_size}|{chunk_overlap}|{model}".encode("utf-8"))
+    return h.hexdigest()
+
+
+def _dir_size(path):
+    total = 0
+    for name in os.listdir(path):
+        try:
+            total += os.path.getsize(os.path.join(path, name))
+        except OSError:
+            pass
+    return total
+
+
+def _read_index(path):
+    # Memory-map the index so a reload is O(1) in the index size; not every
+    # index type (or FAISS build) supports it, so fall back to a plain read.
+    mmap_flag = getattr(faiss, "IO_FLAG_MMAP", 0)
+    if mmap_flag:
+        try:
+            return faiss.read_index(path, mmap_flag)
+        except RuntimeError:
+            pass
+    return faiss.read_index(path)
+
+
+class IndexStore:
+    """Size-bounded LRU directory of saved FAISS vector stores."""
+
+    def __init__(self, root=DEFAULT_ROOT, max_bytes=DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key)
+
+    def __contains__(self, key):
+        return os.path.isfile(os.path.join(self._path(key), CHUNKS_FILE))
+
+    def load(self, key, embedder):
+        """Return the cached ``FAISS`` store for ``key`` or ``None`` on a miss."""
+        path = self._path(key)
+        if key not in self:
+            return None
+        try:
+            index = _read_index(os.path.join(path, INDEX_FILE))
+            with open(os.path.join(path, CHUNKS_FILE), "r", encoding="utf-8") as f:
+                chunks = json.load(f)
+        except (OSError, RuntimeError, ValueError):
+            # Half-written or corrupted entry: drop it and rebuild.
+            shutil.rmtree(path, ignore_errors=True)
+            return None
+
+        docs = {}
+        index_to_docstore_id = {}
+        for i, chunk in enumerate(chunks):
+            doc_id = str(i)
+            docs[doc_id] = Document(page_content=chunk["text"], metadata=chunk["metadata"])
+            index_to_docstore_id[i] = doc_id
+
+        now = time.time()
+        os.utime(path, (now, now))
+        return FAISS(embedder, index, InMemoryDocstore(docs), index_to_docstore_id)
+
+    def save(self, key, vectordb):
+        """Persist ``vectordb`` under ``key`` and evict old entries if over budget."""
+        chunks = []
+        for i in range(vectordb.index.ntotal):
+            doc = vectordb.docstore.search(vectordb.index_to_docstore_id[i])
+            chunks.append({"text": doc.page_content, "metadata": doc.metadata})
+
+        # Build the entry in a scratch dir and rename it into place so readers
+        # in other processes never see a partial entry.
+        tmp = tempfile.mkdtemp(dir=self.root, prefix=".tmp-")
+        try:
+            faiss.write_index(vectordb.index, os.path.join(tmp, INDEX_FILE))
+            with open(os.path.join(tmp, CHUNKS_FILE), "w", encoding="utf-8") as f:
+                json.dump(chunks, f)
+            path = self._path(key)
+            shutil.rmtree(path, ignore_errors=True)
+            os.replace(tmp, path)
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        self.evict(keep=key)
+
+    def evict(self, keep=None):
+        """Delete least-recently-used entries until the store fits ``max_bytes``."""
+        entries = []
+        for name in os.listdir(self.root):
+            path = os.path.join(self.root, name)
+            if name.startswith(".") or not os.path.isdir(path):
+                continue
+            entries.append((os.path.getmtime(path), _dir_size(path), name))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if name == keep:
+                continue
+            shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+            total -= size
+
+    def get_or_build(self, key, embedder, build):
+        """Load ``key`` from disk, or call ``build()`` and persist its result."""
+        vectordb = self.load(key, embedder)
+        if vectordb is None:
+            vectordb = build()
+            self.save(key, vectordb)
+        return vectordb
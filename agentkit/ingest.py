@@ -0,0 +1,119 @@
+"""Streaming document ingestion with read-ahead PDF extraction.
+
+PDF pages are extracted in fixed-size page ranges on a small thread pool,
+with only a window of ranges in flight, and come back in page order as a
+generator.  Pages are split into chunks lazily and embedded/indexed batch by
+batch, so peak memory is bounded by the window and batch sizes rather than
+by the size of the PDF.
+
+Extraction is not parallel across pages: pypdf is pure Python and holds the
+GIL, so the threads only let extraction run ahead of (and overlap with) the
+embedding calls, which wait on the network.  A process pool would give real
+parallelism, but the callers (DAG worker threads, the Streamlit server) are
+multithreaded, so it could not fork safely, and spawned workers re-import
+the caller's main script.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
+# LangChain, the splitter and FAISS are imported where they're used, so
+# importing this module (and the app modules that do) stays cheap.
+
+# === CONFIG ===
+PAGES_PER_TASK = 8
+# Read-ahead threads; more would only contend for the GIL.
+DEFAULT_WORKERS = 2
+DEFAULT_BATCH_SIZE = 64
+
+
+def _page_count(path):
+    from pypdf import PdfReader
+    return len(PdfReader(path).pages)
+
+
+def _extract_pages(path, start, stop):
+    # One reader per range: PdfReader isn't safe to share between threads.
+    from pypdf import PdfReader
+    reader = PdfReader(path)
+    return [(i, reader.pages[i].extract_text() or "") for i in range(start, stop)]
+
+
+def iter_pdf_pages(path, workers=None, pages_per_task=PAGES_PER_TASK):
+    """Yield one ``Document`` per PDF page, in order.
+
+    Small PDFs are read inline; larger ones are read ahead by ``workers``
+    threads with at most ``2 * workers`` page ranges outstanding.
+    """
+    from langchain.schema import Document
+
+    total = _page_count(path)
+    ranges = [(s, min(s + pages_per_task, total)) for s in range(0, total, pages_per_task)]
+    source = os.path.basename(path)
+
+    def to_docs(pages):
+        for i, text in pages:
+            if text.strip():
+                yield Document(page_content=text, metadata={"source": source, "page": i})
+
+    if len(ranges) <= 1:
+        for start, stop in ranges:
+            yield from to_docs(_extract_pages(path, start, stop))
+        return
+
+    workers = workers or DEFAULT_WORKERS
+    window = 2 * workers
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="agentkit-pdf") as pool:
+        pending = []
+        todo = iter(ranges)
+        for start, stop in islice(todo, window):
+            pending.append(pool.submit(_extract_pages, path, start, stop))
+        while pending:
+            pages = pending.pop(0).result()
+            nxt = next(todo, None)
+            if nxt is not None:
+                pending.append(pool.submit(_extract_pages, path, *nxt))
+            yield from to_docs(pages)
+
+
+def iter_chunks(docs, chunk_size, chunk_overlap):
+    """Lazily split each incoming ``Document`` into chunk ``Document``s."""
+    from langchain.schema import Document
+    from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+    for doc in docs:
+        for text in splitter.split_text(doc.page_content):
+            yield Document(page_content=text, metadata=dict(doc.metadata))
+
+
+def batched(iterable, size):
+    it = iter(iterable)
+    while True:
+        batch = list(islice(it, size))
+        if not batch:
+            return
+        yield batch
+
+
+def index_chunks(chunks, embedder, batch_size=DEFAULT_BATCH_SIZE):
+    """Embed and index a chunk stream batch by batch; ``None`` if it was empty.
+
+    Large results are converted to an approximate index sized to the corpus.
+    """
+    from langchain.vectorstores import FAISS
+    from agentkit.index_factory import optimize_vectorstore
+
+    vectordb = None
+    for batch in batched(chunks, batch_size):
+        texts = [doc.page_content for doc in batch]
+        metadatas = [doc.metadata for doc in batch]
+        pairs = list(zip(texts, embedder.embed_documents(texts)))
+        if vectordb is None:
+            vectordb = FAISS.from_embeddings(pairs, embedder, metadatas=metadatas)
+        else:
+            vectordb.add_embeddings(pairs, metadatas=metadatas)
+    if vectordb is not None:
+        optimize_vectorstore(vectordb)
+    return vectordb
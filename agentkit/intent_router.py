@@ -0,0 +1,100 @@
+"""Tiered, in-process intent routing.
+
+Tier 1 is a single compiled keyword matcher: one alternation regex over all
+keywords, scanned once per query.  Tier 2 is a nearest-centroid classifier
+over a handful of example questions per intent, embedded once with a local
+model.  Only when both tiers are unsure does the caller need the LLM.
+"""
+
+import re
+from typing import NamedTuple, Optional
+
+import numpy as np
+
+# === CONFIG ===
+DEFAULT_MIN_SCORE = 0.45
+DEFAULT_MIN_MARGIN = 0.05
+
+
+class Route(NamedTuple):
+    intent: Optional[str]
+    confidence: float
+    source: str  # "keyword", "embedding" or "fallback"
+
+
+class KeywordMatcher:
+    """All keywords of all labels compiled into one regex.
+
+    Keywords match at a word start, so "leave" also matches "leaves" but
+    not "sleeve".
+    """
+
+    def __init__(self, keywords):
+        self._label_of = {}
+        for label, words in keywords.items():
+            for word in words:
+                self._label_of[word.lower()] = label
+        # Longest first so "day off" wins over "day".
+        alternation = "|".join(re.escape(w) for w in sorted(self._label_of, key=len, reverse=True))
+        self._pattern = re.compile(rf"\b(?:{alternation})", re.IGNORECASE)
+
+    def labels(self, text):
+        """Distinct labels whose keywords occur in ``text``, in order of appearance."""
+        found = []
+        for match in self._pattern.finditer(text):
+            label = self._label_of[match.group(0).lower()]
+            if label not in found:
+                found.append(label)
+        return found
+
+
+class CentroidClassifier:
+    """Nearest-centroid intent classifier over example question embeddings."""
+
+    def __init__(self, embedder, examples):
+        self.embedder = embedder
+        self.labels = list(examples)
+        centroids = []
+        for label in self.labels:
+            vectors = np.asarray(embedder.embed_documents(examples[label]), dtype="float32")
+            centroid = vectors.mean(axis=0)
+            centroids.append(centroid / (np.linalg.norm(centroid) or 1.0))
+        self._centroids = np.stack(centroids)
+
+    def scores(self, text):
+        vector = np.asarray(self.embedder.embed_query(text), dtype="float32")
+        vector = vector / (np.linalg.norm(vector) or 1.0)
+        return self._centroids @ vector
+
+    def classify(self, text):
+        """``(label, score, margin over the runner-up)``."""
+        scores = self.scores(text)
+        order = np.argsort(scores)[::-1]
+        best = float(scores[order[0]])
+        runner_up = float(scores[order[1]]) if len(order) > 1 else -1.0
+        return self.labels[order[0]], best, best - runner_up
+
+
+class IntentRouter:
+    """Keyword tier, then embedding tier, then "ask the LLM"."""
+
+    def __init__(self, matcher, classifier=None,
+                 min_score=DEFAULT_MIN_SCORE, min_margin=DEFAULT_MIN_MARGIN):
+        self.matcher = matcher
+        self.classifier = classifier
+        self.min_score = min_score
+        self.min_margin = min_margin
+
+    def route(self, text):
+        labels = self.matcher.labels(text)
+        if len(labels) == 1:
+            return Route(labels[0], 1.0, "keyword")
+
+        if self.classifier is not None:
+            label, score, margin = self.classifier.classify(text)
+            # Several keyword hits: let the classifier break the tie, but
+            # only among the labels the keywords pointed at.
+            if (not labels or label in labels) and score >= self.min_score and margin >= self.min_margin:
+                return Route(label, score, "embedding")
+
+        return Route(None, 0.0, "fallback")
@@ -0,0 +1,308 @@
+"""Rate-limit-aware LLM client shared by all apps, sessions and threads.
+
+``AsyncLLMClient`` wraps a LangChain chat model and runs every call on one
+background asyncio loop, so requests from any Streamlit session, rerun or
+DAG worker are scheduled together:
+
+* **Rate limiting** - each call first takes a token from an
+  ``AsyncTokenBucket`` shared per API key.  A 429 halves the bucket's rate
+  and successes raise it again step by step, so throughput settles at the
+  quota ceiling instead of bursting into rejections.
+* **Coalescing** - identical prompts (same model, settings and messages)
+  that are in flight at the same time share one call: later callers replay
+  the tokens streamed so far and then follow the live stream.  A Streamlit
+  rerun that re-asks the question attaches to the request already running.
+* **Retries** - transient errors (429, 5xx, timeouts) are retried with
+  jittered exponential backoff, but only before the first token arrives;
+  retrying mid-stream would repeat tokens the caller has already shown.
+* **Metrics** - queue depth (calls waiting for the bucket), calls in flight,
+  the current rate, coalesced calls and retries go to ``tracing.metrics``.
+
+``stream`` / ``invoke`` are blocking facades with the chat model's signature,
+so the client is a drop-in for ``streaming.stream_text`` and plain
+``invoke`` calls.  ``astream`` / ``ainvoke`` must be awaited on
+``client.loop``; from any other thread use the blocking methods.
+"""
+
+import asyncio
+import functools
+import hashlib
+import operator
+import queue
+import threading
+import time
+
+from langchain_core.messages import AIMessage
+
+from agentkit import resources, tracing
+from agentkit.ratelimit import DEFAULT_BASE_DELAY, DEFAULT_MAX_DELAY, DEFAULT_RETRIES, backoff_delay
+
+# === CONFIG ===
+RATE_LIMIT_ERRORS = {"ResourceExhausted", "TooManyRequests", "RateLimitError"}
+TRANSIENT_ERRORS = RATE_LIMIT_ERRORS | {
+    "ServiceUnavailable", "InternalServerError", "DeadlineExceeded", "GatewayTimeout",
+    "TimeoutError", "ConnectionError",
+}
+MIN_RATE_FRACTION = 0.125  # never throttle below 1/8 of the configured rate
+RECOVERY_FRACTION = 0.05   # each success gives back 5% of the configured rate
+
+
+def _error_names(exc):
+    return {cls.__name__ for cls in type(exc).__mro__}
+
+
+def is_rate_limit(exc):
+    return bool(_error_names(exc) & RATE_LIMIT_ERRORS) or "429" in str(exc)
+
+
+def is_transient(exc):
+    return bool(_error_names(exc) & TRANSIENT_ERRORS) or is_rate_limit(exc)
+
+
+def event_loop():
+    """The process-wide background loop all clients run on (started on first use)."""
+    def create():
+        loop = asyncio.new_event_loop()
+        threading.Thread(target=loop.run_forever, name="agentkit-llm-loop", daemon=True).start()
+        return loop
+    return resources.get_or_create(("llm_event_loop",), create)
+
+
+class AsyncTokenBucket:
+    """Token bucket for coroutines on one event loop, with adaptive rate.
+
+    ``throttled()`` (on a 429) halves the rate and empties the bucket;
+    ``succeeded()`` raises it back towards the configured rate.  Queue depth
+    and rate are exported as gauges labelled with ``name``.
+    """
+
+    def __init__(self, rate, capacity=None, name="default"):
+        self.name = name
+        self.max_rate = self.rate = float(rate)
+        self.min_rate = self.max_rate * MIN_RATE_FRACTION
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.waiting = 0
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+
+    @classmethod
+    def per_minute(cls, requests, burst=None, name="default"):
+        return cls(requests / 60.0, burst, name)
+
+    def _gauges(self):
+        tracing.metrics.set("agentkit_llm_queue_depth", self.waiting, bucket=self.name)
+        tracing.metrics.set("agentkit_llm_rate_per_minute", round(self.rate * 60, 2), bucket=self.name)
+
+    def _refill(self, now):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens=1.0):
+        """Wait until ``tokens`` are available; return the seconds waited."""
+        start = time.monotonic()
+        self.waiting += 1
+        self._gauges()
+        try:
+            while True:
+                self._refill(time.monotonic())
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return time.monotonic() - start
+                await asyncio.sleep((tokens - self._tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+            self._gauges()
+
+    def throttled(self):
+        self._refill(time.monotonic())
+        self.rate = max(self.min_rate, self.rate / 2)
+        self._tokens = 0.0
+        self._gauges()
+
+    def succeeded(self):
+        self._refill(time.monotonic())
+        self.rate = min(self.max_rate, self.rate + self.max_rate * RECOVERY_FRACTION)
+        self._gauges()
+
+
+class _Flight:
+    """One underlying model call, followed by every caller with the same prompt."""
+
+    def __init__(self):
+        self.chunks = []
+        self.done = False
+        self.error = None
+        self.followers = 0
+        self.queued = 0.0
+        self.retries = 0
+        self._changed = asyncio.Condition()
+
+    async def publish(self, chunk=None, done=False, error=None):
+        async with self._changed:
+            if chunk is not None:
+                self.chunks.append(chunk)
+            self.done = self.done or done
+            self.error = error or self.error
+            self._changed.notify_all()
+
+    async def follow(self):
+        """Yield every chunk from the start, then live ones until the call ends."""
+        seen = 0
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(lambda: len(self.chunks) > seen or self.done)
+                new, done = self.chunks[seen:], self.done
+            seen += len(new)
+            for chunk in new:
+                yield chunk
+            if done and seen == len(self.chunks):
+                break
+        if self.error is not None:
+            raise self.error
+
+
+class AsyncLLMClient:
+    """Chat model wrapper with per-key rate limiting, coalescing and retries."""
+
+    def __init__(self, llm, bucket=None, retries=DEFAULT_RETRIES,
+                 base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY, loop=None):
+        self.llm = llm
+        self.bucket = bucket
+        self.retries = retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.loop = loop or event_loop()
+        self.model_label = str(getattr(llm, "model", None) or type(llm).__name__)
+        self.in_flight = 0
+        self._flights = {}
+
+    # --- bookkeeping ---
+    def _key(self, prompt, kwargs):
+        if isinstance(prompt, str):
+            text = prompt
+        else:
+            text = "\n".join(f"{type(m).__name__}: {getattr(m, 'content', m)}" for m in prompt)
+        raw = f"{self.model_label}\x00{sorted(kwargs.items())!r}\x00{text}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def _set_in_flight(self, delta):
+        self.in_flight += delta
+        tracing.metrics.set("agentkit_llm_in_flight", self.in_flight, model=self.model_label)
+
+    def stats(self):
+        """Current queue depth, calls in flight and rate (requests per minute)."""
+        return {
+            "queued": self.bucket.waiting if self.bucket is not None else 0,
+            "in_flight": self.in_flight,
+            "rate_per_minute": round(self.bucket.rate * 60, 2) if self.bucket is not None else None,
+        }
+
+    # --- event-loop side ---
+    def _join(self, prompt, kwargs):
+        """Attach to the in-flight call for this prompt, or start one."""
+        key = self._key(prompt, kwargs)
+        flight = self._flights.get(key)
+        coalesced = flight is not None
+        if coalesced:
+            tracing.metrics.inc("agentkit_llm_coalesced_total", model=self.model_label)
+        else:
+            flight = self._flights[key] = _Flight()
+            self.loop.create_task(self._run(key, flight, prompt, kwargs))
+        flight.followers += 1
+        return flight, coalesced
+
+    async def _run(self, key, flight, prompt, kwargs):
+        try:
+            for attempt in range(self.retries + 1):
+                if self.bucket is not None:
+                    waited = await self.bucket.acquire()
+                    flight.queued += waited
+                    tracing.metrics.observe("agentkit_ratelimit_wait_seconds", waited)
+                self._set_in_flight(1)
+                try:
+                    async for chunk in self.llm.astream(prompt, **kwargs):
+                        await flight.publish(chunk)
+                    if self.bucket is not None:
+                        self.bucket.succeeded()
+                    return
+                except Exception as exc:
+                    if flight.chunks or attempt == self.retries or not is_transient(exc):
+                        raise
+                    if is_rate_limit(exc):
+                        tracing.metrics.inc("agentkit_llm_throttled_total", model=self.model_label)
+                        if self.bucket is not None:
+                            self.bucket.throttled()
+                    flight.retries += 1
+                    tracing.metrics.inc("agentkit_retries_total", fn="llm")
+                finally:
+                    self._set_in_flight(-1)
+                await asyncio.sleep(backoff_delay(attempt, self.base_delay, self.max_delay))
+        except Exception as exc:
+            await flight.publish(error=exc)
+        finally:
+            del self._flights[key]
+            await flight.publish(done=True)
+
+    async def astream(self, prompt, **kwargs):
+        flight, _ = self._join(prompt, kwargs)
+        async for chunk in flight.follow():
+            yield chunk
+
+    async def ainvoke(self, prompt, **kwargs):
+        return _merge([chunk async for chunk in self.astream(prompt, **kwargs)])
+
+    # --- blocking facades ---
+    def _annotate(self, flight, coalesced):
+        span = tracing.current_span()
+        if span is None:
+            return
+        span.set(coalesced=coalesced)
+        if flight.queued:
+            span.set(ratelimit_wait_ms=round(flight.queued * 1000, 1))
+        if flight.retries and not coalesced:
+            span.add("retries.llm", flight.retries)
+
+    def stream(self, prompt, **kwargs):
+        """Blocking generator over the response chunks (like ``llm.stream``)."""
+        out = queue.Queue()
+        stop = threading.Event()
+
+        async def pump():
+            try:
+                flight, coalesced = self._join(prompt, kwargs)
+                async for chunk in flight.follow():
+                    if stop.is_set():
+                        return
+                    out.put(("chunk", chunk))
+            except BaseException as exc:
+                out.put(("error", exc))
+            else:
+                out.put(("done", (flight, coalesced)))
+
+        asyncio.run_coroutine_threadsafe(pump(), self.loop)
+        try:
+            while True:
+                kind, item = out.get()
+                if kind == "chunk":
+                    yield item
+                elif kind == "error":
+                    raise item
+                else:
+                    self._annotate(*item)
+                    return
+        finally:
+            # A caller that stops early (e.g. a Streamlit rerun) just detaches;
+            # the call itself keeps going for anyone else following it.
+            stop.set()
+
+    def invoke(self, prompt, **kwargs):
+        return _merge(list(self.stream(prompt, **kwargs)))
+
+    def __getattr__(self, name):
+        return getattr(self.llm, name)
+
+
+def _merge(chunks):
+    if not chunks:
+        return AIMessage(content="")
+    return functools.reduce(operator.add, chunks)
@@ -0,0 +1,205 @@
+"""Bounded conversation memory: a window of recent messages plus a summary.
+
+A chat history that lives in ``st.session_state`` grows with every turn, is
+re-rendered in full on every rerun and ends up verbatim in prompts.
+``ConversationMemory`` keeps only the last ``window`` messages in RAM; older
+ones are folded, ``fold`` at a time, into a rolling summary.  The summary is
+extractive by default (first sentence of each folded message, trimmed to a
+token budget) or written by an LLM via ``llm_summarizer``.
+
+With a ``HistoryStore`` every message and the summary are also written to a
+local SQLite file, so a conversation can be reopened by id after a restart
+while RAM still only holds the window.
+"""
+
+import functools
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+from agentkit import tracing
+from agentkit.tracing import estimate_tokens
+
+# === CONFIG ===
+DEFAULT_PATH = os.environ.get("AGENTKIT_CHAT_HISTORY", os.path.join(".cache", "conversations.sqlite3"))
+DEFAULT_WINDOW = 20        # messages kept verbatim
+DEFAULT_FOLD = 10          # messages folded into the summary at a time
+DEFAULT_SUMMARY_TOKENS = 300
+SUMMARY_SYSTEM = (
+    "You maintain a running summary of a chat between an employee and an HR assistant. "
+    "Merge the new messages into the summary. Keep facts, open requests and decisions; "
+    "drop greetings and repetition. Use at most {max_words} words."
+)
+SUMMARY_HUMAN = "Summary so far:\n{summary}\n\nNew messages:\n{messages}"
+
+_MARKUP = re.compile(r"^\s*\*\w+\*:\s*")
+_SENTENCE = re.compile(r"(?<=[.!?])\s")
+
+
+def _first_sentence(text, max_chars=160):
+    text = " ".join(_MARKUP.sub("", text).split())
+    text = _SENTENCE.split(text, maxsplit=1)[0]
+    return text if len(text) <= max_chars else text[:max_chars - 1] + "…"
+
+
+def extractive_summary(summary, messages, max_tokens=DEFAULT_SUMMARY_TOKENS):
+    """Append one line per folded message; drop the oldest lines over budget."""
+    lines = summary.splitlines() if summary else []
+    lines += [f"- {m['role']}: {_first_sentence(m['text'])}" for m in messages if m["text"].strip()]
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > max_tokens:
+        lines.pop(0)
+    return "\n".join(lines)
+
+
+@functools.lru_cache(maxsize=None)
+def summary_prompt():
+    # Built on first fold, so the chat UI doesn't load LangChain up front.
+    from langchain_core.prompts import ChatPromptTemplate
+    return ChatPromptTemplate.from_messages([("system", SUMMARY_SYSTEM), ("human", SUMMARY_HUMAN)])
+
+
+def llm_summarizer(llm, max_tokens=DEFAULT_SUMMARY_TOKENS):
+    """Summarizer that asks ``llm`` to merge folded messages into the summary.
+
+    Falls back to ``extractive_summary`` if the call fails, so a quota error
+    never loses history.
+    """
+    def summarize(summary, messages, max_tokens=max_tokens):
+        prompt = summary_prompt().format_messages(
+            summary=summary or "(empty)",
+            messages="\n".join(f"{m['role']}: {m['text']}" for m in messages),
+            max_words=int(max_tokens * 0.75),
+        )
+        try:
+            with tracing.span("summarize", messages=len(messages)):
+                return llm.invoke(prompt).content.strip()
+        except Exception:
+            return extractive_summary(summary, messages, max_tokens)
+    return summarize
+
+
+class HistoryStore:
+    """SQLite file holding every message and the latest summary per conversation."""
+
+    def __init__(self, path=DEFAULT_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " conversation TEXT NOT NULL, seq INTEGER NOT NULL, role TEXT NOT NULL,"
+            " text TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (conversation, seq))"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS summaries ("
+            " conversation TEXT PRIMARY KEY, summary TEXT NOT NULL, folded INTEGER NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def append(self, conversation, message):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO messages VALUES (?, ?, ?, ?, ?)",
+                (conversation, message["seq"], message["role"], message["text"], time.time()),
+            )
+            self._conn.commit()
+
+    def save_summary(self, conversation, summary, folded):
+        with self._lock:
+            self._conn.execute("INSERT OR REPLACE INTO summaries VALUES (?, ?, ?)",
+                               (conversation, summary, folded))
+            self._conn.commit()
+
+    def load(self, conversation):
+        """``(summary, folded seq, messages after it)`` for ``conversation``."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT summary, folded FROM summaries WHERE conversation = ?", (conversation,)
+            ).fetchone()
+            summary, folded = row if row else ("", 0)
+            rows = self._conn.execute(
+                "SELECT seq, role, text FROM messages WHERE conversation = ? AND seq > ? ORDER BY seq",
+                (conversation, folded),
+            ).fetchall()
+        return summary, folded, [{"seq": s, "role": r, "text": t} for s, r, t in rows]
+
+    def last_seq(self, conversation):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT MAX(seq) FROM messages WHERE conversation = ?", (conversation,)
+            ).fetchone()
+        return row[0] or 0
+
+    def delete(self, conversation):
+        with self._lock:
+            self._conn.execute("DELETE FROM messages WHERE conversation = ?", (conversation,))
+            self._conn.execute("DELETE FROM summaries WHERE conversation = ?", (conversation,))
+            self._conn.commit()
+
+
+class ConversationMemory:
+    """Recent-message window + rolling summary, optionally persisted.
+
+    Messages are dicts ``{"seq", "role", "text"}``; ``seq`` increases by one
+    per message and is never reused within a conversation.
+    """
+
+    def __init__(self, conversation_id=None, store=None, window=DEFAULT_WINDOW,
+                 fold=DEFAULT_FOLD, summarizer=None, summary_tokens=DEFAULT_SUMMARY_TOKENS):
+        self.conversation_id = conversation_id or uuid.uuid4().hex
+        self.store = store
+        self.window = window
+        self.fold = fold
+        self.summarizer = summarizer or extractive_summary
+        self.summary_tokens = summary_tokens
+        self.summary = ""
+        self.folded = 0
+        self.messages = deque()
+        self.last_seq = 0
+        if store is not None:
+            self._load()
+
+    def _load(self):
+        self.summary, self.folded, messages = self.store.load(self.conversation_id)
+        self.messages.extend(messages)
+        self.last_seq = messages[-1]["seq"] if messages else max(self.folded, self.store.last_seq(self.conversation_id))
+        self._compact()
+
+    def _compact(self):
+        # Fold in batches so an LLM summarizer runs once per ``fold`` messages.
+        while len(self.messages) >= self.window + self.fold:
+            batch = [self.messages.popleft() for _ in range(self.fold)]
+            self.summary = self.summarizer(self.summary, batch, self.summary_tokens)
+            self.folded = batch[-1]["seq"]
+            if self.store is not None:
+                self.store.save_summary(self.conversation_id, self.summary, self.folded)
+
+    def add(self, role, text):
+        self.last_seq += 1
+        message = {"seq": self.last_seq, "role": role, "text": text}
+        self.messages.append(message)
+        if self.store is not None:
+            self.store.append(self.conversation_id, message)
+        self._compact()
+        return message
+
+    def context(self, summary_label="Earlier in this conversation"):
+        """Lines for a prompt or hand-off: the summary, then recent message texts."""
+        lines = [f"{summary_label}:\n{self.summary}"] if self.summary else []
+        return lines + [m["text"] for m in self.messages]
+
+    def clear(self):
+        if self.store is not None:
+            self.store.delete(self.conversation_id)
+        self.summary = ""
+        self.folded = 0
+        self.messages.clear()
+        self.last_seq = 0
+
+    def __len__(self):
+        return self.last_seq
@@ -0,0 +1,191 @@
+"""Section-indexed policy store: relevant policy text under a token budget.
+
+Stuffing every policy into every prompt makes prompts grow with the number
+of policies.  ``PolicyStore`` loads policies from files (one per policy; the
+file stem is its name) and splits them into addressable sections: every
+bullet item and paragraph, under the policy's title and nearest heading.
+At load time each section is embedded once (through the embedding cache) and
+added to a BM25 keyword index.  ``context(query)`` fuses both rankings with
+reciprocal rank fusion and packs the best sections, in document order, until
+the token budget is spent, so prompt size stays flat as policies are added.
+"""
+
+import hashlib
+import os
+import re
+
+import numpy as np
+
+from agentkit.hybrid import BM25Index, reciprocal_rank_fusion
+from agentkit.tracing import estimate_tokens, span
+
+# === CONFIG ===
+DEFAULT_TOKEN_BUDGET = 400
+DEFAULT_TOP_K = 8
+POLICY_SUFFIXES = (".md", ".txt")
+
+_HEADING = re.compile(r"^(?:#+\s*(.+?)\s*#*|\*([^*]+)\*)$")
+_BULLET = re.compile(r"^[-*•]\s+")
+
+
+class PolicySection:
+    """One addressable piece of a policy (``key`` is ``"<policy>#<n>"``)."""
+
+    def __init__(self, key, policy, title, heading, text, position):
+        self.key = key
+        self.policy = policy
+        self.title = title
+        self.heading = heading
+        self.text = text
+        self.position = position
+        self.tokens = estimate_tokens(text)
+
+    @property
+    def search_text(self):
+        # Title and heading give short bullets ("Sick Leave: 10 days") context.
+        return " ".join(p for p in (self.title, self.heading, self.text) if p)
+
+
+def split_policy(name, text):
+    """Sections of one policy: each bullet item or paragraph, under its heading."""
+    title, heading, sections, paragraph = name, None, [], []
+
+    def emit(lines):
+        if lines:
+            sections.append(PolicySection(f"{name}#{len(sections)}", name, title, heading,
+                                          "\n".join(lines), len(sections)))
+
+    for raw in text.splitlines():
+        line = raw.strip()
+        match = _HEADING.match(line)
+        if not line or match or _BULLET.match(line):
+            emit(paragraph)
+            paragraph = []
+        if match:
+            if title == name and not sections:
+                title = match.group(1) or match.group(2)
+            else:
+                heading = match.group(1) or match.group(2)
+        elif _BULLET.match(line):
+            emit([line])
+        elif line:
+            paragraph.append(line)
+    emit(paragraph)
+    return title, sections
+
+
+class PolicyStore:
+    """Policies split into sections with an embedding matrix and a BM25 index."""
+
+    def __init__(self, embedder=None, token_budget=DEFAULT_TOKEN_BUDGET, top_k=DEFAULT_TOP_K):
+        self.embedder = embedder
+        self.token_budget = token_budget
+        self.top_k = top_k
+        self.titles = {}
+        self.sections = {}
+        self.keywords = BM25Index()
+        self._texts = {}
+        self._keys = []
+        self._matrix = None
+
+    @classmethod
+    def from_dir(cls, path, embedder=None, **kwargs):
+        store = cls(embedder, **kwargs)
+        for fname in sorted(os.listdir(path)):
+            stem, suffix = os.path.splitext(fname)
+            if suffix.lower() in POLICY_SUFFIXES:
+                with open(os.path.join(path, fname), encoding="utf-8") as f:
+                    store.add(stem, f.read())
+        store.build()
+        return store
+
+    def add(self, name, text):
+        """Add (or replace) policy ``name``; call ``build()`` once done."""
+        for key in [k for k, s in self.sections.items() if s.policy == name]:
+            del self.sections[key]
+            self.keywords.remove(key)
+        title, sections = split_policy(name, text)
+        self.titles[name] = title
+        self._texts[name] = text
+        for section in sections:
+            self.sections[section.key] = section
+            self.keywords.add(section.key, section.search_text)
+        self._matrix = None
+
+    def build(self):
+        """Embed all sections in one batched call (cache hits cost nothing)."""
+        self._keys = list(self.sections)
+        if self.embedder is None or not self._keys:
+            return
+        vectors = np.asarray(self.embedder.embed_documents(
+            [self.sections[k].search_text for k in self._keys]), dtype="float32")
+        self._matrix = vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+    @property
+    def names(self):
+        return list(self.titles)
+
+    @property
+    def version(self):
+        """Content hash of all policies (changes whenever any policy text does)."""
+        blob = "\x00".join(f"{n}\x00{self._texts[n]}" for n in sorted(self._texts))
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()[:16]
+
+    def texts(self):
+        return dict(self._texts)
+
+    def search(self, query, policies=None, query_vector=None):
+        """Section keys ranked by RRF of keyword and vector similarity.
+
+        ``query_vector`` (from the same embedder, e.g. the answer cache's)
+        saves embedding the query a second time.
+        """
+        allowed = {k for k, s in self.sections.items() if s.policy in policies} if policies else None
+        rankings = [[k for k, _ in self.keywords.search(query, self.top_k, allowed=allowed)]]
+        if self._matrix is not None:
+            if query_vector is None:
+                query_vector = self.embedder.embed_query(query)
+            q = np.asarray(query_vector, dtype="float32")
+            scores = self._matrix @ (q / max(np.linalg.norm(q), 1e-12))
+            ranked = [self._keys[i] for i in np.argsort(-scores)]
+            rankings.append([k for k in ranked if allowed is None or k in allowed][:self.top_k])
+        return reciprocal_rank_fusion(rankings)[:self.top_k]
+
+    def select(self, query, token_budget=None, policies=None, query_vector=None):
+        """Best sections that fit in ``token_budget``, in document order."""
+        budget = self.token_budget if token_budget is None else token_budget
+        ranked = self.search(query, policies, query_vector)
+        if not ranked:
+            # Nothing matched: fall back to the sections in document order.
+            ranked = [k for k, s in self.sections.items() if not policies or s.policy in policies]
+        chosen, used = [], 0
+        for key in ranked:
+            section = self.sections[key]
+            if used + section.tokens <= budget:
+                chosen.append(section)
+                used += section.tokens
+        order = {name: i for i, name in enumerate(self.titles)}
+        return sorted(chosen, key=lambda s: (order[s.policy], s.position))
+
+    def render(self, sections):
+        """Sections grouped under their policy title (and heading)."""
+        lines, policy, heading = [], None, None
+        for section in sections:
+            if section.policy != policy:
+                if lines:
+                    lines.append("")
+                lines.append(f"*{self.titles[section.policy]}*")
+                policy, heading = section.policy, None
+            if section.heading and section.heading != heading:
+                lines.append(f"*{section.heading}*")
+                heading = section.heading
+            lines.append(section.text)
+        return "\n".join(lines)
+
+    def context(self, query, token_budget=None, policies=None, query_vector=None):
+        """Prompt-ready text of the most relevant sections for ``query``."""
+        with span("policy_context") as s:
+            sections = self.select(query, token_budget, policies, query_vector)
+            text = self.render(sections)
+            s.set(sections=len(sections), context_tokens=estimate_tokens(text))
+            return text
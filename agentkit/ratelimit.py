@@ -0,0 +1,50 @@
+"""Retries with jittered exponential backoff.
+
+``backoff_delay`` is the delay schedule ``AsyncLLMClient`` uses between its
+own attempts; ``retry`` re-runs a whole step (e.g. a DAG node whose stream
+broke halfway) when the provider pushes back.  Rate limiting itself lives in
+``llm_client.AsyncTokenBucket``.
+"""
+
+import functools
+import random
+import time
+
+from agentkit import tracing
+
+# === CONFIG ===
+DEFAULT_RETRIES = 4
+DEFAULT_BASE_DELAY = 2.0
+DEFAULT_MAX_DELAY = 60.0
+
+
+def backoff_delay(attempt, base_delay=DEFAULT_BASE_DELAY, max_delay=DEFAULT_MAX_DELAY):
+    """Full-jitter exponential backoff for the 0-based ``attempt``."""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+
+
+def retry(fn=None, *, retries=DEFAULT_RETRIES, base_delay=DEFAULT_BASE_DELAY,
+          max_delay=DEFAULT_MAX_DELAY, retry_on=(Exception,), retry_if=None, on_retry=None):
+    """Decorator: call ``fn`` up to ``retries + 1`` times with backoff.
+
+    Only exceptions of a ``retry_on`` type for which ``retry_if(exc)`` (if
+    given) is true are retried; anything else is raised straight away.
+    """
+    if fn is None:
+        return functools.partial(retry, retries=retries, base_delay=base_delay, max_delay=max_delay,
+                                 retry_on=retry_on, retry_if=retry_if, on_retry=on_retry)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        for attempt in range(retries + 1):
+            try:
+                return fn(*args, **kwargs)
+            except retry_on as exc:
+                if attempt == retries or (retry_if is not None and not retry_if(exc)):
+                    raise
+                delay = backoff_delay(attempt, base_delay, max_delay)
+                tracing.count("agentkit_retries_total", fn=fn.__name__)
+                if on_retry is not None:
+                    on_retry(attempt + 1, exc, delay)
+                time.sleep(delay)
+    return wrapper
@@ -0,0 +1,118 @@
+"""Report output: one render to text and PDF, bundles written as streams.
+
+``write_report`` takes text that has already been rendered once from a
+template. It writes ``<base>.txt`` and ``<base>.pdf`` from that same text
+and returns the PDF bytes, so a download button serves them from memory
+instead of re-opening the file.  For batches, ``consolidated_pdf`` puts one
+page per report into a single PDF. ``iter_zip`` yields a ZIP archive chunk
+by chunk as its entries are read, so hundreds of reports go to disk or the
+network without building the archive in memory.
+"""
+
+import io
+import re
+import zipfile
+
+# === CONFIG ===
+PDF_FONT = ("Arial", "", 12)
+CELL_WIDTH = 200
+LINE_HEIGHT = 10
+ZIP_CHUNK = 64 * 1024
+
+# Core PDF fonts are Latin-1 only; emojis and other symbols are dropped.
+_NON_ASCII = re.compile(r"[^\x00-\x7F]+")
+
+
+def pdf_safe(text):
+    return _NON_ASCII.sub("", text)
+
+
+def new_pdf():
+    from fpdf import FPDF  # only loaded once a report is actually written
+    pdf = FPDF()
+    pdf.set_font(*PDF_FONT)
+    return pdf
+
+
+def add_page(pdf, text):
+    """Append ``text`` as one page, one cell per line."""
+    pdf.add_page()
+    for line in pdf_safe(text).split("\n"):
+        pdf.cell(CELL_WIDTH, LINE_HEIGHT, txt=line, ln=True)
+
+
+def pdf_bytes(pdf):
+    # PyFPDF returns a Latin-1 str for dest="S", fpdf2 a bytearray.
+    out = pdf.output(dest="S")
+    return out.encode("latin-1") if isinstance(out, str) else bytes(out)
+
+
+def write_report(base_path, text):
+    """Write ``text`` to ``<base_path>.txt`` and ``.pdf``; return the PDF bytes."""
+    pdf = new_pdf()
+    add_page(pdf, text)
+    data = pdf_bytes(pdf)
+    with open(base_path + ".txt", "w", encoding="utf-8") as f:
+        f.write(text)
+    with open(base_path + ".pdf", "wb") as f:
+        f.write(data)
+    return data
+
+
+def consolidated_pdf(texts):
+    """One PDF with a page per report text."""
+    pdf = new_pdf()
+    for text in texts:
+        add_page(pdf, text)
+    return pdf_bytes(pdf)
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file that collects what ``zipfile`` writes."""
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self):
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def iter_zip(entries, chunk_size=ZIP_CHUNK):
+    """Yield a ZIP archive of ``(arcname, bytes or file path)`` entries in chunks.
+
+    Entries are read lazily and compressed as they stream, so memory use is
+    bounded by ``chunk_size`` rather than by the archive size.
+    """
+    sink = _ChunkSink()
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, source in entries:
+            if isinstance(source, (bytes, bytearray)):
+                archive.writestr(name, bytes(source))
+            else:
+                with open(source, "rb") as src, archive.open(name, "w") as dst:
+                    while True:
+                        block = src.read(chunk_size)
+                        if not block:
+                            break
+                        dst.write(block)
+                        data = sink.drain()
+                        if data:
+                            yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
@@ -0,0 +1,125 @@
+"""Process-wide registry of expensive, reusable resources.
+
+Models and API clients are created lazily, exactly once per process, and
+shared by every Streamlit session, rerun and worker thread.  Reusing one
+client per API key keeps its underlying HTTP/gRPC connection alive instead of
+paying a fresh handshake on every button click.  Unlike ``st.cache_resource``
+this also works outside Streamlit (batch runs, benchmarks).
+"""
+
+import hashlib
+import os
+import threading
+
+# === CONFIG ===
+DEFAULT_CHAT_MODEL = "gemini-2.0-flash"
+DEFAULT_LOCAL_EMBED_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_GOOGLE_EMBED_MODEL = "models/embedding-001"
+# Requests per minute per API key (Gemini free tier: 15) and burst size.
+DEFAULT_LLM_RPM = float(os.environ.get("AGENTKIT_LLM_RPM", "15"))
+DEFAULT_LLM_BURST = 4
+
+_registry = {}
+_locks = {}
+_registry_lock = threading.Lock()
+
+
+def _key_id(api_key):
+    # Never keep raw keys in registry keys (they end up in logs/debuggers).
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+def get_or_create(key, factory):
+    """Return the resource registered under ``key``, creating it on first use.
+
+    Creation holds a per-key lock, so a slow model load doesn't block other
+    resources and concurrent first callers don't load it twice.
+    """
+    try:
+        return _registry[key]
+    except KeyError:
+        pass
+    with _registry_lock:
+        lock = _locks.setdefault(key, threading.Lock())
+    with lock:
+        if key not in _registry:
+            _registry[key] = factory()
+        return _registry[key]
+
+
+def register(key, resource):
+    """Install ``resource`` under ``key`` (e.g. a local stand-in for benchmarks)."""
+    with _registry_lock:
+        _registry[key] = resource
+    return resource
+
+
+def loaded():
+    """Keys of the resources created so far."""
+    return list(_registry)
+
+
+def chat_llm(api_key, model=DEFAULT_CHAT_MODEL, **kwargs):
+    """Shared ``ChatGoogleGenerativeAI`` client per (API key, model, settings)."""
+    def create():
+        from langchain_google_genai import ChatGoogleGenerativeAI
+        return ChatGoogleGenerativeAI(model=model, google_api_key=api_key, **kwargs)
+    key = ("chat_llm", _key_id(api_key), model, tuple(sorted(kwargs.items())))
+    return get_or_create(key, create)
+
+
+def llm_client(api_key, model=DEFAULT_CHAT_MODEL, rpm=None, burst=None, **kwargs):
+    """Shared ``AsyncLLMClient`` over ``chat_llm``, with one rate-limit bucket per API key.
+
+    ``rpm`` / ``burst`` only apply when the key's bucket is first created.
+    """
+    from agentkit.llm_client import AsyncLLMClient, AsyncTokenBucket
+    bucket = get_or_create(
+        ("llm_bucket", _key_id(api_key)),
+        lambda: AsyncTokenBucket.per_minute(rpm or DEFAULT_LLM_RPM, burst or DEFAULT_LLM_BURST,
+                                            name=_key_id(api_key)[:8]),
+    )
+    key = ("llm_client", _key_id(api_key), model, tuple(sorted(kwargs.items())))
+    return get_or_create(key, lambda: AsyncLLMClient(chat_llm(api_key, model, **kwargs), bucket))
+
+
+def local_embedder(model_name=DEFAULT_LOCAL_EMBED_MODEL):
+    """Cached sentence-transformer embedder, loaded once per process."""
+    def create():
+        from langchain.embeddings import HuggingFaceEmbeddings
+        from agentkit.embedding_cache import CachedEmbeddings
+        # Local model: one big batch at a time, no point in parallel calls.
+        return CachedEmbeddings(
+            HuggingFaceEmbeddings(model_name=model_name),
+            model=model_name,
+            batch_size=256,
+            max_concurrency=1,
+        )
+    return get_or_create(("local_embedder", model_name), create)
+
+
+def google_embedder(api_key, model=DEFAULT_GOOGLE_EMBED_MODEL):
+    """Cached Gemini embedding client per API key."""
+    def create():
+        from langchain_google_genai import GoogleGenerativeAIEmbeddings
+        from agentkit.embedding_cache import CachedEmbeddings
+        return CachedEmbeddings(GoogleGenerativeAIEmbeddings(model=model, google_api_key=api_key), model=model)
+    return get_or_create(("google_embedder", _key_id(api_key), model), create)
+
+
+def warm_up(*loaders, background=True):
+    """Call each loader (e.g. ``local_embedder``) so first requests don't pay for it.
+
+    Runs in a daemon thread by default so app start-up isn't blocked; the
+    registry's per-key locks make a request that arrives mid-load wait for it
+    instead of loading a second copy.
+    """
+    def run():
+        for loader in loaders:
+            loader()
+    if not background:
+        run()
+        return None
+    thread = threading.Thread(target=run, name="agentkit-warm-up", daemon=True)
+    thread.start()
+    return thread
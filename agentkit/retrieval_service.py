@@ -0,0 +1,133 @@
+"""Process-wide retrieval layer over one shared ``IndexManager`` corpus.
+
+Every Streamlit session talks to the same service, so each document's
+vectors live in memory once per process no matter how many employees are
+asking about it.  Searches are scoped per tenant and/or per document with a
+FAISS ``IDSelector``, which restricts the scan to the allowed vector ids
+instead of over-fetching and filtering afterwards (on IVF indexes small
+scopes probe more lists, see ``index_factory.search_scoped``).
+
+Queries are embedded with the caller's ``embedder`` (default: the corpus's
+own), so callers billed to different API keys share one corpus as long as
+they embed with the same model.
+
+``hybrid_search`` adds a BM25 keyword index kept in sync with the corpus,
+fuses both rankings with reciprocal-rank fusion and can rerank the fused
+candidates with a cross-encoder, so fewer (and better) chunks reach the
+prompt.
+"""
+
+from typing import Any, List, Optional
+
+import numpy as np
+from langchain.schema import BaseRetriever, Document
+
+from agentkit import tracing
+from agentkit.hybrid import BM25Index, reciprocal_rank_fusion
+from agentkit.index_factory import search_scoped
+
+# === CONFIG ===
+DEFAULT_FETCH_K = 20
+
+
+class RetrievalService:
+    """Filtered similarity and hybrid search over an ``IndexManager``."""
+
+    def __init__(self, corpus, reranker=None):
+        self.corpus = corpus
+        self.reranker = reranker
+        self.keywords = BM25Index()
+        corpus.subscribe(self._on_corpus_change)
+
+    def _on_corpus_change(self, added, removed):
+        for vid in removed:
+            self.keywords.remove(vid)
+        for vid, doc in added.items():
+            self.keywords.add(vid, doc.page_content)
+
+    def scope(self, tenant=None, doc_ids=None):
+        """Document ids visible to ``tenant``, narrowed to ``doc_ids`` if given."""
+        visible = self.corpus.documents(tenant)
+        if doc_ids is not None:
+            wanted = set(doc_ids)
+            visible = [d for d in visible if d in wanted]
+        return visible
+
+    def _allowed(self, tenant, doc_ids):
+        # ``None`` means unscoped; an empty list means nothing is visible.
+        if tenant is None and doc_ids is None:
+            return None
+        return self.corpus.vector_ids(self.scope(tenant, doc_ids))
+
+    def _vector_search(self, query, k, allowed, embedder=None):
+        vector = np.array([(embedder or self.corpus.embedder).embed_query(query)], dtype="float32")
+        with self.corpus.lock:
+            if self.corpus.index is None:
+                return []
+            if allowed is None:
+                _, labels = self.corpus.index.search(vector, k)
+            else:
+                _, labels = search_scoped(self.corpus.index, vector, k, allowed)
+        return [int(label) for label in labels[0] if label != -1]
+
+    @tracing.traced("retrieve")
+    def search(self, query, k=4, tenant=None, doc_ids=None, embedder=None):
+        """Top-``k`` chunks for ``query`` within the tenant/document scope."""
+        allowed = self._allowed(tenant, doc_ids)
+        if allowed is not None and not allowed:
+            return []
+        return [self.corpus.chunk(vid) for vid in self._vector_search(query, k, allowed, embedder)]
+
+    def hybrid_search(self, query, k=3, tenant=None, doc_ids=None, keywords=(),
+                      fetch_k=DEFAULT_FETCH_K, rerank=False, embedder=None):
+        """Top-``k`` chunks by fused vector + BM25 rank, optionally reranked.
+
+        ``keywords`` (e.g. the classified intent's domain terms) are added to
+        the BM25 query with a lower weight than the question's own terms.
+        """
+        with tracing.span("retrieve", mode="hybrid", k=k) as span:
+            allowed = self._allowed(tenant, doc_ids)
+            if allowed is not None and not allowed:
+                return []
+            with tracing.span("vector_search"):
+                dense = self._vector_search(query, fetch_k, allowed, embedder)
+            with tracing.span("bm25_search"):
+                sparse = [vid for vid, _ in self.keywords.search(
+                    query, fetch_k, allowed=set(allowed) if allowed is not None else None,
+                    boost_terms=keywords,
+                )]
+            fused = reciprocal_rank_fusion([dense, sparse])
+            docs = [doc for doc in (self.corpus.chunk(vid) for vid in fused) if doc is not None]
+            span.set(candidates=len(docs))
+            if rerank and self.reranker is not None and len(docs) > k:
+                return self.reranker.rerank(query, docs, k)
+            return docs[:k]
+
+    def as_retriever(self, k=4, tenant=None, doc_ids=None, hybrid=False, keywords=(), rerank=False,
+                     embedder=None):
+        return ServiceRetriever(service=self, k=k, tenant=tenant, doc_ids=doc_ids, hybrid=hybrid,
+                                keywords=list(keywords), rerank=rerank, embedder=embedder)
+
+
+class ServiceRetriever(BaseRetriever):
+    """LangChain retriever view of a ``RetrievalService`` with a fixed scope."""
+
+    service: Any
+    k: int = 4
+    tenant: Optional[str] = None
+    doc_ids: Optional[List[str]] = None
+    hybrid: bool = False
+    keywords: List[str] = []
+    rerank: bool = False
+    embedder: Any = None
+
+    class Config:
+        arbitrary_types_allowed = True
+
+    def _get_relevant_documents(self, query, *, run_manager=None) -> List[Document]:
+        if self.hybrid:
+            return self.service.hybrid_search(query, k=self.k, tenant=self.tenant, doc_ids=self.doc_ids,
+                                              keywords=self.keywords, rerank=self.rerank,
+                                              embedder=self.embedder)
+        return self.service.search(query, k=self.k, tenant=self.tenant, doc_ids=self.doc_ids,
+                                   embedder=self.embedder)
@@ -0,0 +1,134 @@
+"""Agent runtime shared by the Streamlit front-ends, batch runs and the bench.
+
+Each app's pipeline module (``hr_copilot``, ``hr_agents``,
+``project_pipeline``) exposes its agents as ``Agent`` subclasses - a ``name``
+and a ``run`` method - registered in an ``AgentRuntime`` together with the
+shared state they need (indexes, caches).  Agents are constructed on first
+use, and ``shared`` keeps one runtime per app and API key for the whole
+process, so a Streamlit rerun only looks things up: the script is left with
+UI work.
+
+Heavy dependencies (FAISS, LangChain loaders and splitters, fpdf, model
+clients) are imported inside the functions that need them, so importing a
+pipeline module or this one stays cheap.  First imports done through
+``timed_import`` and the time spent building runtimes and agents are kept in
+``startup_times()`` and exported as ``agentkit_startup_seconds`` gauges;
+``python -m agentkit.bench`` reports cold start and rerun times per app.
+"""
+
+import os
+import sys
+import threading
+import time
+
+from agentkit import resources, tracing
+
+# === CONFIG ===
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_startup = {}
+_startup_lock = threading.Lock()
+_thread = threading.local()
+
+
+def _record(step, name, seconds):
+    with _startup_lock:
+        _startup[f"{step}:{name}"] = seconds
+    tracing.metrics.set("agentkit_startup_seconds", round(seconds, 4), step=step, component=name)
+
+
+def startup_times():
+    """Seconds per ``"import:<module>"``, ``"build:<runtime>"`` and ``"agent:<runtime>.<name>"``."""
+    with _startup_lock:
+        return dict(_startup)
+
+
+def timed_import(module, folder=None):
+    """Import ``module`` (from a ``Day N`` folder if given), timing its first import."""
+    if folder is not None:
+        path = os.path.join(REPO_ROOT, folder)
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    if module in sys.modules:
+        return sys.modules[module]
+    start = time.perf_counter()
+    # __import__ rather than importlib, so ``python -X importtime`` lists it.
+    __import__(module)
+    _record("import", module, time.perf_counter() - start)
+    return sys.modules[module]
+
+
+class Agent:
+    """One agent: a ``name`` and ``run(...)``.
+
+    Agents only hold shared, thread-safe dependencies (LLM client, indexes,
+    caches), so one instance serves every session and worker thread.  Agents
+    that stream set ``last_ttft`` (seconds to first token, ``None`` without a
+    model call); it is kept per thread, so concurrent sessions don't mix up
+    each other's values.
+    """
+
+    name = None
+
+    def run(self, *args, **kwargs):
+        raise NotImplementedError
+
+    @property
+    def last_ttft(self):
+        return getattr(_thread, "ttfts", {}).get(id(self))
+
+    @last_ttft.setter
+    def last_ttft(self, seconds):
+        if not hasattr(_thread, "ttfts"):
+            _thread.ttfts = {}
+        _thread.ttfts[id(self)] = seconds
+
+
+class AgentRuntime:
+    """Named agents and shared components, each built once on first use."""
+
+    def __init__(self, name):
+        self.name = name
+        self._factories = {}
+        self._built = {}
+        # Reentrant: a factory may look up the components it depends on.
+        self._lock = threading.RLock()
+
+    def register(self, name, factory):
+        self._factories[name] = factory
+        return self
+
+    @property
+    def names(self):
+        return list(self._factories)
+
+    def __getitem__(self, name):
+        try:
+            return self._built[name]
+        except KeyError:
+            pass
+        with self._lock:
+            if name not in self._built:
+                start = time.perf_counter()
+                self._built[name] = self._factories[name]()
+                _record("agent", f"{self.name}.{name}", time.perf_counter() - start)
+        return self._built[name]
+
+    def run(self, name, *args, **kwargs):
+        return self[name].run(*args, **kwargs)
+
+    def warm_up(self):
+        """Build everything now instead of on the first request."""
+        for name in self._factories:
+            self[name]
+        return self
+
+
+def shared(name, api_key, build):
+    """The process-wide runtime ``name`` for ``api_key``, made by ``build()`` once."""
+    def create():
+        start = time.perf_counter()
+        runtime = build()
+        _record("build", name, time.perf_counter() - start)
+        return runtime
+    return resources.get_or_create(("agent_runtime", name, resources._key_id(api_key)), create)
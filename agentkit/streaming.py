@@ -0,0 +1,143 @@
+"""Token streaming helpers for the Streamlit agent apps.
+
+``stream_text`` drives ``llm.stream`` and reports every token to a callback
+while measuring time-to-first-token.  ``stream_retrieval_qa`` is the
+streaming equivalent of a "stuff" ``RetrievalQA`` chain, and
+``stream_with_context`` the same prompt over context the caller already has.  ``TokenBuffer``
+lets worker threads (see ``agentkit.dag``) stream into a buffer that the
+Streamlit script thread polls and renders.
+"""
+
+import functools
+import threading
+import time
+
+from agentkit import tracing
+
+
+@functools.lru_cache(maxsize=None)
+def qa_prompt():
+    """Same wording as LangChain's default chat prompt for RetrievalQA ("stuff").
+
+    Built on first use, so importing this module doesn't load LangChain.
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+    return ChatPromptTemplate.from_messages([
+        ("system",
+         "Use the following pieces of context to answer the user's question. \n"
+         "If you don't know the answer, just say that you don't know, "
+         "don't try to make up an answer.\n----------------\n{context}"),
+        ("human", "{question}"),
+    ])
+
+
+def _prompt_text(prompt):
+    if isinstance(prompt, str):
+        return prompt
+    return "\n".join(str(getattr(m, "content", m)) for m in prompt)
+
+
+def _model_name(llm):
+    llm = getattr(llm, "llm", llm)  # unwrap AsyncLLMClient
+    return str(getattr(llm, "model", None) or getattr(llm, "model_name", None) or type(llm).__name__)
+
+
+def stream_text(llm, prompt, on_token=None):
+    """Stream ``llm`` on ``prompt``; return ``(full_text, seconds_to_first_token)``.
+
+    Runs inside an ``llm`` tracing span that records time to first token and
+    prompt/completion tokens (provider usage if reported, else estimated).
+    """
+    model = _model_name(llm)
+    with tracing.span("llm", model=model) as span:
+        start = time.perf_counter()
+        ttft = None
+        parts = []
+        usage = None
+        for chunk in llm.stream(prompt):
+            usage = getattr(chunk, "usage_metadata", None) or usage
+            token = chunk.content if hasattr(chunk, "content") else str(chunk)
+            if not token:
+                continue
+            if ttft is None:
+                ttft = time.perf_counter() - start
+            parts.append(token)
+            if on_token is not None:
+                on_token(token)
+        text = "".join(parts)
+        if usage:
+            prompt_tokens, completion_tokens = usage.get("input_tokens", 0), usage.get("output_tokens", 0)
+        else:
+            prompt_tokens = tracing.estimate_tokens(_prompt_text(prompt))
+            completion_tokens = tracing.estimate_tokens(text)
+        tracing.record_tokens(model, prompt_tokens, completion_tokens)
+        if ttft is not None:
+            span.set(ttft_ms=round(ttft * 1000, 1))
+    return text, ttft
+
+
+def stream_with_context(llm, context, question, on_token=None, prompt=None):
+    """Stream the answer to ``question`` given ready-made ``context`` text."""
+    prompt = prompt or qa_prompt()
+    return stream_text(llm, prompt.format_messages(context=context, question=question), on_token)
+
+
+def stream_retrieval_qa(llm, retriever, question, on_token=None, prompt=None):
+    """Retrieve context for ``question`` and stream the answer."""
+    docs = retriever.get_relevant_documents(question)
+    context = "\n\n".join(doc.page_content for doc in docs)
+    return stream_with_context(llm, context, question, on_token, prompt)
+
+
+class MarkdownStream:
+    """``on_token`` callback that re-renders a Streamlit placeholder.
+
+    Redraws are throttled to ``interval`` seconds, so tokens after the last
+    redraw only show once the caller writes the final text into
+    ``placeholder``.  ``ttft`` is the time from construction to the first
+    token (``None`` if none arrived).
+    """
+
+    def __init__(self, placeholder, interval=0.05, cursor=" ▌"):
+        self.placeholder = placeholder
+        self.interval = interval
+        self.cursor = cursor
+        self.text = ""
+        self.ttft = None
+        self._started = time.perf_counter()
+        self._last = 0.0
+
+    def __call__(self, token):
+        if self.ttft is None:
+            self.ttft = time.perf_counter() - self._started
+        self.text += token
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self.placeholder.markdown(self.text + self.cursor)
+            self._last = now
+
+
+class TokenBuffer:
+    """Thread-safe token accumulator: workers ``push``, the UI thread polls."""
+
+    def __init__(self):
+        self._parts = []
+        self._lock = threading.Lock()
+        self._seen = 0
+
+    def push(self, token):
+        with self._lock:
+            self._parts.append(token)
+
+    def text(self):
+        with self._lock:
+            return "".join(self._parts)
+
+    def changed(self):
+        """True once per batch of new tokens since the previous call."""
+        with self._lock:
+            count = len(self._parts)
+        if count != self._seen:
+            self._seen = count
+            return True
+        return False
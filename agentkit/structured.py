@@ -0,0 +1,199 @@
+"""Structured (JSON) model outputs with validation and one repair round.
+
+Scraping fields out of free text with regexes fails silently and turns into
+extra turns.  ``generate_structured`` instead asks for JSON matching a
+schema (``format_instructions``), validates the reply with a small
+JSON-schema subset validator, and on failure sends the errors back to the
+model once for a corrected reply.  If that also fails it raises
+``StructuredOutputError`` instead of guessing.
+
+``JsonFieldStream`` forwards just one string field's text while the JSON
+streams in, so a UI can still show the answer token by token.
+"""
+
+import json
+import re
+
+from agentkit import tracing
+from agentkit.streaming import stream_text
+
+# === CONFIG ===
+SCHEMA_MARKER = "JSON schema:"
+REPAIR_PROMPT = (
+    "Your reply could not be used: {errors}\n"
+    "Reply again with only the corrected JSON object, no prose and no code fences."
+)
+
+_FENCE = re.compile(r"```(?:json)?\s*(.*?)```", re.DOTALL)
+_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None,
+}
+
+
+class StructuredOutputError(ValueError):
+    """The model's reply was not valid JSON for the schema, even after repair."""
+
+    def __init__(self, errors, text):
+        super().__init__("; ".join(errors))
+        self.errors = errors
+        self.text = text
+
+
+def format_instructions(schema):
+    """Prompt text asking for a JSON object matching ``schema``."""
+    return ("Reply with only a JSON object, no prose and no code fences, with the keys "
+            f"in the order given by this {SCHEMA_MARKER}\n{json.dumps(schema)}")
+
+
+def validate(value, schema, path="$"):
+    """Errors for ``value`` against a JSON-schema subset (empty list = valid).
+
+    Supports ``type`` (one or a list), ``enum``, ``properties``,
+    ``required``, ``items``, ``minItems`` / ``maxItems``, ``minimum`` /
+    ``maximum`` and ``minLength``.
+    """
+    types = schema.get("type")
+    if types is not None:
+        names = types if isinstance(types, list) else [types]
+        if not any(_TYPES[name](value) for name in names):
+            return [f"{path}: expected {' or '.join(names)}, got {type(value).__name__}"]
+    errors = []
+    if "enum" in schema and value not in schema["enum"]:
+        errors.append(f"{path}: {value!r} is not one of {schema['enum']}")
+    if isinstance(value, dict):
+        for key in schema.get("required", ()):
+            if key not in value:
+                errors.append(f"{path}: missing '{key}'")
+        for key, sub in schema.get("properties", {}).items():
+            if key in value:
+                errors += validate(value[key], sub, f"{path}.{key}")
+    elif isinstance(value, list):
+        if len(value) < schema.get("minItems", 0):
+            errors.append(f"{path}: needs at least {schema['minItems']} items")
+        if "maxItems" in schema and len(value) > schema["maxItems"]:
+            errors.append(f"{path}: at most {schema['maxItems']} items")
+        if "items" in schema:
+            for i, item in enumerate(value):
+                errors += validate(item, schema["items"], f"{path}[{i}]")
+    elif isinstance(value, (int, float)) and not isinstance(value, bool):
+        if "minimum" in schema and value < schema["minimum"]:
+            errors.append(f"{path}: below minimum {schema['minimum']}")
+        if "maximum" in schema and value > schema["maximum"]:
+            errors.append(f"{path}: above maximum {schema['maximum']}")
+    elif isinstance(value, str) and len(value) < schema.get("minLength", 0):
+        errors.append(f"{path}: shorter than {schema['minLength']} characters")
+    return errors
+
+
+def extract_json(text):
+    """First JSON object/array in ``text`` (code fences and surrounding prose allowed)."""
+    fenced = _FENCE.search(text)
+    if fenced:
+        text = fenced.group(1)
+    starts = [i for i in (text.find("{"), text.find("[")) if i >= 0]
+    if not starts:
+        raise ValueError("no JSON object in the reply")
+    value, _ = json.JSONDecoder().raw_decode(text, min(starts))
+    return value
+
+
+def parse(text, schema, check=None):
+    """``(value, errors)``: extract, validate, then run the ``check(value)`` hook."""
+    try:
+        value = extract_json(text)
+    except ValueError as exc:
+        return None, [f"invalid JSON ({exc})"]
+    errors = validate(value, schema)
+    if not errors and check is not None:
+        errors = list(check(value))
+    return value, errors
+
+
+def _as_messages(prompt):
+    from langchain_core.messages import HumanMessage
+    return [HumanMessage(content=prompt)] if isinstance(prompt, str) else list(prompt)
+
+
+def generate_structured(llm, prompt, schema, check=None, on_token=None):
+    """Stream ``prompt``; return ``(validated JSON value, seconds to first token)``.
+
+    ``check(value)`` may return extra, domain-level errors (e.g. a phase
+    ending before it starts).  One repair round is tried; after that
+    ``StructuredOutputError`` is raised.
+    """
+    from langchain_core.messages import AIMessage, HumanMessage
+
+    with tracing.span("structured") as span:
+        text, ttft = stream_text(llm, prompt, on_token)
+        value, errors = parse(text, schema, check)
+        if not errors:
+            tracing.count("agentkit_structured_total", outcome="ok")
+            return value, ttft
+        span.set(first_errors=errors[:3])
+        repair = _as_messages(prompt) + [
+            AIMessage(content=text),
+            HumanMessage(content=REPAIR_PROMPT.format(errors="; ".join(errors[:5]))),
+        ]
+        text, _ = stream_text(llm, repair)
+        value, errors = parse(text, schema, check)
+        if errors:
+            tracing.count("agentkit_structured_total", outcome="failed")
+            raise StructuredOutputError(errors, text)
+        tracing.count("agentkit_structured_total", outcome="repaired")
+        return value, ttft
+
+
+class JsonFieldStream:
+    """``on_token`` adapter forwarding only one string field of streaming JSON."""
+
+    _ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+    def __init__(self, field, on_token):
+        self.on_token = on_token
+        self._start = re.compile(r'"%s"\s*:\s*"' % re.escape(field))
+        self._buffer = ""
+        self._pos = None
+        self._done = False
+
+    def __call__(self, token):
+        if self._done:
+            return
+        self._buffer += token
+        if self._pos is None:
+            match = self._start.search(self._buffer)
+            if match is None:
+                return
+            self._pos = match.end()
+        buf, i, out = self._buffer, self._pos, []
+        while i < len(buf):
+            char = buf[i]
+            if char == '"':
+                self._done = True
+                break
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+            # Escape sequence: wait for the rest of it if it is split across tokens.
+            if i + 1 >= len(buf):
+                break
+            if buf[i + 1] == "u":
+                if i + 6 > len(buf):
+                    break
+                try:
+                    out.append(chr(int(buf[i + 2:i + 6], 16)))
+                except ValueError:
+                    pass
+                i += 6
+            else:
+                out.append(self._ESCAPES.get(buf[i + 1], buf[i + 1]))
+                i += 2
+        self._pos = i
+        if out:
+            self.on_token("".join(out))
@@ -0,0 +1,338 @@
+"""Lightweight tracing and metrics for the agent pipelines.
+
+``trace`` opens a request-level trace and ``span`` / ``traced`` time the
+stages inside it; spans nest through a ``ContextVar``, so they also follow
+work handed to ``agentkit.dag`` worker threads.  Every span feeds a latency
+histogram, and ``count`` / ``record_tokens`` keep counters for cache
+outcomes, retries and prompt/completion tokens.
+
+Finished traces are kept in memory (``last_trace``, for the Streamlit debug
+panel) and appended as JSON lines to ``AGENTKIT_TRACE_FILE`` when it is set.
+``metrics.prometheus_text()`` renders all metrics in the Prometheus text
+format; ``start_metrics_server`` serves it on ``/metrics``.
+"""
+
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+# === CONFIG ===
+TRACE_FILE = os.environ.get("AGENTKIT_TRACE_FILE")
+MAX_TRACES = 50
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_current = contextvars.ContextVar("agentkit_span", default=None)
+_recent = deque(maxlen=MAX_TRACES)
+_file_lock = threading.Lock()
+
+
+def estimate_tokens(text):
+    """Cheap token estimate (~4 characters per token for English prose)."""
+    return (len(text) + 3) // 4
+
+
+class Span:
+    """One timed stage; ``attrs`` carry tokens, cache outcomes, sizes, ..."""
+
+    def __init__(self, name, trace=None, parent=None, attrs=None):
+        self.name = name
+        self.trace = trace
+        self.parent_id = parent.span_id if parent is not None else None
+        self.span_id = uuid.uuid4().hex[:16]
+        self.start = time.perf_counter()
+        self.end = None
+        self.attrs = dict(attrs or {})
+        self.events = []
+        self.error = None
+        self.counters = set()  # attrs accumulated with ``add`` (tokens, retries, ...)
+
+    @property
+    def duration(self):
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def add(self, key, amount=1):
+        self.attrs[key] = self.attrs.get(key, 0) + amount
+        self.counters.add(key)
+
+    def event(self, name, **attrs):
+        self.events.append({"name": name, "at": time.perf_counter() - self.start, **attrs})
+
+    def to_dict(self, origin):
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ms": round((self.start - origin) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3),
+            "attrs": self.attrs,
+            "events": self.events,
+            "error": self.error,
+        }
+
+
+class Trace:
+    """All spans of one request, in start order."""
+
+    def __init__(self, name, attrs=None):
+        self.trace_id = uuid.uuid4().hex
+        self.name = name
+        self.timestamp = time.time()
+        self.spans = []
+        self._lock = threading.Lock()
+        self.root = Span(name, self, None, attrs)
+        self._add(self.root)
+
+    def _add(self, span):
+        with self._lock:
+            self.spans.append(span)
+
+    @property
+    def duration(self):
+        return self.root.duration
+
+    def depth(self, span):
+        by_id = {s.span_id: s for s in self.spans}
+        depth = 0
+        while span.parent_id in by_id:
+            span = by_id[span.parent_id]
+            depth += 1
+        return depth
+
+    def totals(self):
+        """Per-trace sums of the span counters (tokens, retries, cache outcomes)."""
+        out = {}
+        for span in self.spans:
+            for key in span.counters:
+                out[key] = out.get(key, 0) + span.attrs[key]
+        return out
+
+    def to_dict(self):
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            "trace_id": self.trace_id,
+            "name": self.name,
+            "timestamp": self.timestamp,
+            "duration_ms": round(self.duration * 1000, 3),
+            "totals": self.totals(),
+            "spans": [s.to_dict(self.root.start) for s in spans],
+        }
+
+
+class Metrics:
+    """Thread-safe counters, gauges and latency histograms with labels."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._counters = {}
+        self._gauges = {}
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, amount=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set(self, name, value, **labels):
+        """Set gauge ``name`` (queue depth, in-flight calls, ...)."""
+        key = self._key(name, labels)
+        with self._lock:
+            self._gauges[key] = value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            hist = self._histograms.get(key)
+            if hist is None:
+                hist = self._histograms[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    hist["buckets"][i] += 1
+            hist["sum"] += value
+            hist["count"] += 1
+
+    def value(self, name, **labels):
+        key = self._key(name, labels)
+        return self._counters.get(key, self._gauges.get(key, 0))
+
+    def snapshot(self):
+        with self._lock:
+            counters = {f"{n}{_labels(l)}": v for (n, l), v in self._counters.items()}
+            gauges = {f"{n}{_labels(l)}": v for (n, l), v in self._gauges.items()}
+            histograms = {f"{n}{_labels(l)}": {"sum": h["sum"], "count": h["count"]}
+                          for (n, l), h in self._histograms.items()}
+        return {"counters": counters, "gauges": gauges, "histograms": histograms}
+
+    def prometheus_text(self):
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted((k, dict(v, buckets=list(v["buckets"]))) for k, v in self._histograms.items())
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), value in gauges:
+            if name not in typed:
+                lines.append(f"# TYPE {name} gauge")
+                typed.add(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+        for (name, labels), hist in histograms:
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            for bound, count in zip(self.buckets, hist["buckets"]):
+                lines.append(f"{name}_bucket{_labels(labels + (('le', repr(bound)),))} {count}")
+            lines.append(f"{name}_bucket{_labels(labels + (('le', '+Inf'),))} {hist['count']}")
+            lines.append(f"{name}_sum{_labels(labels)} {hist['sum']}")
+            lines.append(f"{name}_count{_labels(labels)} {hist['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+metrics = Metrics()
+
+
+# === SPANS ===
+@contextmanager
+def trace(name, **attrs):
+    """Start a request-level trace; yields the ``Trace``."""
+    t = Trace(name, attrs)
+    token = _current.set(t.root)
+    try:
+        yield t
+    except BaseException as exc:
+        t.root.error = repr(exc)
+        raise
+    finally:
+        _current.reset(token)
+        t.root.end = time.perf_counter()
+        metrics.observe("agentkit_span_seconds", t.root.duration, span=name)
+        _recent.append(t)
+        if TRACE_FILE:
+            write_jsonl(t, TRACE_FILE)
+
+
+@contextmanager
+def span(name, **attrs):
+    """Time a stage inside the current trace (standalone if there is none)."""
+    parent = _current.get()
+    s = Span(name, parent.trace if parent is not None else None, parent, attrs)
+    if s.trace is not None:
+        s.trace._add(s)
+    token = _current.set(s)
+    try:
+        yield s
+    except BaseException as exc:
+        s.error = repr(exc)
+        metrics.inc("agentkit_span_errors_total", span=name)
+        raise
+    finally:
+        _current.reset(token)
+        s.end = time.perf_counter()
+        metrics.observe("agentkit_span_seconds", s.duration, span=name)
+
+
+def traced(name=None):
+    """Decorator form of ``span``; the span name defaults to the function's."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name or fn.__qualname__):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def current_span():
+    return _current.get()
+
+
+def annotate(**attrs):
+    """Set attributes on the current span, if any."""
+    s = _current.get()
+    if s is not None:
+        s.set(**attrs)
+
+
+def count(name, amount=1, **labels):
+    """Increment counter ``name`` and add ``amount`` to the current span."""
+    metrics.inc(name, amount, **labels)
+    s = _current.get()
+    if s is not None:
+        key = name.replace("agentkit_", "").replace("_total", "")
+        if labels:
+            key += "." + ".".join(str(v) for _, v in sorted(labels.items()))
+        s.add(key, amount)
+
+
+def record_tokens(model, prompt_tokens, completion_tokens):
+    metrics.inc("agentkit_llm_prompt_tokens_total", prompt_tokens, model=model)
+    metrics.inc("agentkit_llm_completion_tokens_total", completion_tokens, model=model)
+    metrics.inc("agentkit_llm_calls_total", model=model)
+    s = _current.get()
+    if s is not None:
+        s.add("prompt_tokens", prompt_tokens)
+        s.add("completion_tokens", completion_tokens)
+
+
+# === EXPORT ===
+def last_trace(name=None):
+    """Most recent finished trace (optionally with this name)."""
+    for t in reversed(_recent):
+        if name is None or t.name == name:
+            return t
+    return None
+
+
+def write_jsonl(t, path):
+    with _file_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(t.to_dict()) + "\n")
+
+
+def start_metrics_server(port, host="127.0.0.1"):
+    """Serve ``metrics.prometheus_text()`` at ``http://host:port/metrics``."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = metrics.prometheus_text().encode("utf-8")
+            self.send_response(200 if self.path == "/metrics" else 404)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.end_headers()
+            if self.path == "/metrics":
+                self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name="agentkit-metrics", daemon=True).start()
+    return server
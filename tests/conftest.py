@@ -0,0 +1,28 @@
+import os
+import sys
+
+import pytest
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+@pytest.fixture
+def day_module():
+    """Import a Day N script's module (e.g. ``day_module("Day 6", "hr_copilot")``)."""
+    def load(folder, module):
+        from agentkit.runtime import timed_import
+        return timed_import(module, folder)
+    return load
+
+
+@pytest.fixture
+def fake_llm():
+    from agentkit.fakes import FakeChatModel
+    return FakeChatModel(first_token_latency=0, token_latency=0)
+
+
+@pytest.fixture
+def fake_embedder():
+    from agentkit.fakes import FakeEmbeddings
+    return FakeEmbeddings(dim=64)
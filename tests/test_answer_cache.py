@@ -0,0 +1,32 @@
+import time
+
+from agentkit.answer_cache import SemanticAnswerCache
+
+
+def test_answer_cache_exact_semantic_and_scoped(fake_embedder):
+    cache = SemanticAnswerCache(fake_embedder, threshold=0.8)
+    cache.put("How many sick leave days do I get?", "v1", "10 days")
+
+    assert cache.get("how many  sick leave days do I get?", "v1")[0] == "10 days"
+    assert cache.get("How many sick leave days do we get?", "v1")[0] == "10 days"
+    assert cache.get("How many sick leave days do I get?", "v2")[0] is None
+    assert cache.get("When is payroll?", "v1")[0] is None
+    assert cache.stats["hits"] == 2 and cache.stats["misses"] == 2
+
+
+def test_answer_cache_ttl_and_lru_bounds(fake_embedder):
+    cache = SemanticAnswerCache(fake_embedder, ttl=0.05, max_entries=2)
+    for q in ("leave", "payroll", "appraisal"):
+        cache.put(q, "s", q.upper())
+    assert cache.stats["size"] == 2
+    assert cache.get("leave", "s")[0] is None
+    time.sleep(0.06)
+    assert cache.get("payroll", "s")[0] is None
+
+
+def test_get_or_compute_computes_once(fake_embedder):
+    cache = SemanticAnswerCache(fake_embedder)
+    calls = []
+    for _ in range(3):
+        cache.get_or_compute("sick days?", "s", lambda: calls.append(1) or "10")
+    assert calls == [1]
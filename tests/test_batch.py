@@ -0,0 +1,65 @@
+import pytest
+
+
+@pytest.fixture
+def batch(day_module):
+    return day_module("Day 10", "batch")
+
+
+def row(title, **extra):
+    return {"title": title, "students": "Asha, Ravi", "department": "CSE", "domain": "AI", **extra}
+
+
+def test_project_dir_may_not_escape_out_dir(batch, tmp_path):
+    out = str(tmp_path / "cohort")
+    project, _ = batch.to_project(row("Chat Bot", project_dir="team1/bot"), out)
+    assert project["project_dir"] == str(tmp_path / "cohort" / "team1" / "bot")
+    for bad in ("../elsewhere", "team1/../../elsewhere", str(tmp_path / "abs"), "."):
+        with pytest.raises(ValueError):
+            batch.to_project(row("Chat Bot", project_dir=bad), out)
+
+
+def test_rows_sharing_a_folder_stop_the_batch(batch, tmp_path, capsys):
+    projects = tmp_path / "projects.jsonl"
+    projects.write_text("\n".join([
+        '{"title": "AI Chatbot", "students": "A", "department": "CSE", "domain": "AI"}',
+        '{"title": "Smart Farm", "students": "B", "department": "ECE", "domain": "IoT"}',
+        '{"title": "AI chatbot!", "students": "C", "department": "CSE", "domain": "AI"}',
+    ]), encoding="utf-8")
+    code = batch.main([str(projects), "--out-dir", str(tmp_path / "out"), "--api-key", "unused"])
+    assert code == 2
+    assert "rows 1, 3 all write to" in capsys.readouterr().err
+    assert not any((tmp_path / "out").iterdir())
+
+
+def test_checkpoint_remembers_only_finished_projects(batch, tmp_path):
+    path = str(tmp_path / "batch_checkpoint.jsonl")
+    checkpoint = batch.Checkpoint(path)
+    checkpoint.record(project_dir="out/a", status="done", timings={"total": 1.0})
+    checkpoint.record(project_dir="out/b", status="failed", error="boom")
+    assert checkpoint.done == {"out/a"}
+
+    resumed = batch.Checkpoint(path)
+    assert resumed.done == {"out/a"}
+    resumed.record(project_dir="out/b", status="done", timings={"total": 2.0})
+    assert batch.Checkpoint(path).done == {"out/a", "out/b"}
+
+
+def test_rerun_skips_projects_already_done(batch, tmp_path, monkeypatch, capsys):
+    out = tmp_path / "out"
+    projects = tmp_path / "projects.csv"
+    projects.write_text("title,students,department,domain\n"
+                        "AI Chatbot,A,CSE,AI\n"
+                        "Smart Farm,B,ECE,IoT\n", encoding="utf-8")
+    out.mkdir()
+    batch.Checkpoint(str(out / batch.CHECKPOINT_FILE)).record(
+        project_dir=str(out / "ai_chatbot"), status="done", timings={"total": 1.0})
+    ran = []
+    monkeypatch.setattr(batch, "load_agents", lambda *args, **kwargs: None)
+    monkeypatch.setattr(batch, "run_project",
+                        lambda project, agents, **kwargs: ran.append(project["title"]) or {"total": 0.0})
+
+    assert batch.main([str(projects), "--out-dir", str(out), "--api-key", "unused"]) == 0
+    assert ran == ["Smart Farm"]
+    assert "1 projects to run (1 already done)" in capsys.readouterr().out
+    assert batch.Checkpoint(str(out / batch.CHECKPOINT_FILE)).done == {str(out / "ai_chatbot"), str(out / "smart_farm")}
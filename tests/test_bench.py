@@ -0,0 +1,47 @@
+from agentkit import bench
+
+
+def test_day7_session_goes_through_the_retriever_agent(fake_llm, fake_embedder, tmp_path):
+    cfg = {"llm": fake_llm, "embedder": fake_embedder, "questions": 2, "pages": 2}
+    app = bench.Day7App(cfg, str(tmp_path))
+    stages = bench.Stages()
+    app.setup(stages)
+
+    latencies = []
+    app.session(0, stages, latencies)
+    app.session(0, stages, latencies)  # same questions again: answered from the cache
+    summary = stages.summary()
+    assert len(latencies) == 4
+    assert summary["answer_miss"]["n"] == 2 and summary["retrieve"]["n"] == 2
+    assert summary["answer_hit"]["n"] == 2
+    assert app.extra()["answer_cache"]["hits"] == 2
+
+
+def test_summarize_reports_milliseconds():
+    assert bench.summarize([0.001, 0.002, 0.003]) == {"n": 3, "mean_ms": 2.0, "p50_ms": 2.0, "p95_ms": 2.9}
+
+
+def test_compare_flags_only_regressions_beyond_tolerance():
+    def record(p95, ops, cold):
+        return {"results": {"day7": {
+            "stages": {"retrieve": {"p95_ms": p95}},
+            "concurrency": {"4": {"ops_per_s": ops}},
+            "cold_start": {"total_ms": cold, "import_ms": 10},
+        }}}
+
+    assert bench.compare(record(10, 100, 200), record(11, 90, 220), tolerance=0.15) == []
+    regressions = bench.compare(record(10, 100, 200), record(20, 50, 400), tolerance=0.15)
+    assert [metric for metric, *_ in regressions] == [
+        "day7.retrieve.p95_ms", "day7.sessions=4.ops_per_s", "day7.cold_start.total_ms",
+    ]
+
+
+def test_heaviest_imports_reads_direct_children_only():
+    log = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       100 |        100 |     numpy.core",
+        "import time:       900 |       1000 |   numpy",
+        "import time:       300 |        300 |   json",
+        "import time:        50 |       1400 | app_module",
+    ])
+    assert bench.heaviest_imports(log, "app_module") == {"numpy": 1.0, "json": 0.3}
@@ -0,0 +1,48 @@
+from langchain.schema import Document
+
+from agentkit.context import INDEX, INLINE, ContextPlanner
+from agentkit.index_store import IndexStore
+
+
+def pages(*texts):
+    return [Document(page_content=t, metadata={"page": i}) for i, t in enumerate(texts)]
+
+
+def long_report(n=40):
+    return pages(*[f"Section {i}: the sensor network logged {i} readings of soil moisture. " * 6
+                   for i in range(n)])
+
+
+def test_small_corpus_is_inlined_without_loading_a_model(tmp_path):
+    planner = ContextPlanner(token_budget=1000, store=IndexStore(str(tmp_path)))
+
+    def no_model():
+        raise AssertionError("the embedder should not load for a small corpus")
+
+    context, strategy = planner.build(pages("Brief: build a chatbot.", "Team: Asha"), "goal?", no_model, "m")
+    assert strategy == INLINE
+    assert context == "Brief: build a chatbot.\n\nTeam: Asha"
+    assert not any(tmp_path.iterdir())
+
+
+def test_large_corpus_is_indexed_and_searched(fake_embedder, tmp_path):
+    planner = ContextPlanner(token_budget=200, top_k=2, store=IndexStore(str(tmp_path)))
+    report = long_report()
+    context, strategy = planner.build(report, "soil moisture readings", lambda: fake_embedder, "m")
+    assert strategy == INDEX
+    assert "soil moisture" in context
+    assert len(context) < sum(len(doc.page_content) for doc in report) / 4  # top 2 chunks only
+
+
+def test_index_is_reused_by_key_without_reading_the_corpus(fake_embedder, tmp_path):
+    planner = ContextPlanner(token_budget=200, store=IndexStore(str(tmp_path)))
+    planner.build(long_report(), "moisture", lambda: fake_embedder, "m", key_data=b"report-v1")
+    embedded = fake_embedder.texts_embedded
+
+    def unread():
+        raise AssertionError("a cached corpus should not be read again")
+        yield
+
+    context, strategy = planner.build(unread(), "moisture", lambda: fake_embedder, "m", key_data=b"report-v1")
+    assert strategy == INDEX and context
+    assert fake_embedder.texts_embedded == embedded + 1  # just the query
@@ -0,0 +1,61 @@
+import time
+
+import pytest
+
+from agentkit.dag import Node, run_dag
+
+
+def sleeper(seconds, value):
+    def fn(**deps):
+        time.sleep(seconds)
+        return (value, deps)
+    return fn
+
+
+def test_dependencies_get_upstream_results():
+    results, timings = run_dag({
+        "a": Node(lambda: 1),
+        "b": Node(lambda a: a + 1, ["a"]),
+        "c": Node(lambda a, b: a + b, ["a", "b"]),
+    })
+    assert results == {"a": 1, "b": 2, "c": 3}
+    assert set(timings) == {"a", "b", "c", "total"}
+
+
+def test_independent_nodes_run_concurrently():
+    _, timings = run_dag({
+        "x": Node(sleeper(0.2, "x")),
+        "y": Node(sleeper(0.2, "y")),
+        "z": Node(sleeper(0.2, "z")),
+    })
+    assert timings["total"] < 0.4
+
+
+def test_on_done_runs_on_calling_thread_in_completion_order():
+    import threading
+
+    seen = []
+    caller = threading.get_ident()
+    run_dag(
+        {"slow": Node(sleeper(0.15, "slow")), "fast": Node(sleeper(0.0, "fast"))},
+        on_done=lambda name, result, seconds: seen.append((name, threading.get_ident())),
+    )
+    assert seen == [("fast", caller), ("slow", caller)]
+
+
+def test_first_error_is_raised_and_dependents_are_skipped():
+    ran = []
+
+    def boom():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        run_dag({"a": Node(boom), "b": Node(lambda a: ran.append(a), ["a"])})
+    assert ran == []
+
+
+def test_unknown_dependency_and_cycle_are_rejected():
+    with pytest.raises(ValueError, match="unknown"):
+        run_dag({"a": Node(lambda missing: None, ["missing"])})
+    with pytest.raises(ValueError, match="cycle"):
+        run_dag({"a": Node(lambda b: None, ["b"]), "b": Node(lambda a: None, ["a"])})
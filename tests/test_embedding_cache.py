@@ -0,0 +1,25 @@
+from agentkit.embedding_cache import CachedEmbeddings, EmbeddingCache, text_key
+
+
+def test_embedding_cache_only_embeds_unseen_normalized_texts(fake_embedder, tmp_path):
+    cache = EmbeddingCache(str(tmp_path / "emb.sqlite3"))
+    embedder = CachedEmbeddings(fake_embedder, "fake", cache=cache, batch_size=2)
+
+    first = embedder.embed_documents(["sick leave", "annual leave", "sick leave"])
+    assert fake_embedder.texts_embedded == 2
+    assert first[0] == first[2]
+
+    again = embedder.embed_documents(["sick  leave ", "payroll"])
+    assert fake_embedder.texts_embedded == 3
+    assert again[0] == first[0]
+    assert text_key("sick  leave ") == text_key("sick leave")
+
+
+def test_embedding_cache_survives_reopening(fake_embedder, tmp_path):
+    path = str(tmp_path / "emb.sqlite3")
+    CachedEmbeddings(fake_embedder, "fake", cache=EmbeddingCache(path)).embed_documents(["payroll"])
+    CachedEmbeddings(fake_embedder, "fake", cache=EmbeddingCache(path)).embed_documents(["payroll"])
+    assert fake_embedder.texts_embedded == 1
+
+    CachedEmbeddings(fake_embedder, "other-model", cache=EmbeddingCache(path)).embed_documents(["payroll"])
+    assert fake_embedder.texts_embedded == 2
@@ -0,0 +1,23 @@
+class StubCorpus:
+    def __init__(self, versions):
+        self.versions = versions
+
+    def version(self, doc_id):
+        return self.versions.get(doc_id)
+
+
+class StubService:
+    """Lists a document the corpus no longer has (removed in between)."""
+
+    def __init__(self):
+        self.corpus = StubCorpus({"t/a.pdf": {"sha256": "aaa"}})
+
+    def scope(self, tenant, doc_ids):
+        return ["t/a.pdf", "t/gone.pdf"]
+
+
+def test_scope_skips_documents_removed_mid_lookup(day_module):
+    hr_agents = day_module("Day 7", "hr_agents")
+    agent = hr_agents.RetrieverAgent(StubService(), llm=None, cache=None)
+    tenant, versions, _, rerank = agent.scope("t", None)
+    assert (tenant, versions, rerank) == ("t", (("t/a.pdf", "aaa"),), False)
@@ -0,0 +1,41 @@
+from agentkit.answer_cache import SemanticAnswerCache
+from agentkit.intent_router import IntentRouter, KeywordMatcher
+from agentkit.policy_store import PolicyStore
+
+
+def make_copilot(hr_copilot, llm, embedder, policy_dir):
+    router = IntentRouter(KeywordMatcher(hr_copilot.INTENT_KEYWORDS))
+    policies = PolicyStore.from_dir(str(policy_dir), embedder)
+    return hr_copilot.HRCopilot(llm, SemanticAnswerCache(embedder), router, policies)
+
+
+def test_routed_intent_without_policy_file_falls_back_to_llm(day_module, fake_llm, fake_embedder, tmp_path):
+    hr_copilot = day_module("Day 6", "hr_copilot")
+    (tmp_path / "payslip.md").write_text("# Payslips\n- Salaries are paid on the last working day.\n")
+    copilot = make_copilot(hr_copilot, fake_llm, fake_embedder, tmp_path)
+
+    reply = copilot.run("How many vacation days do I get?")  # routed to "leave", no leave.md
+
+    assert reply.intent in hr_copilot.HR_INTENTS
+    assert fake_llm.calls == 1
+
+
+def test_routed_intent_with_policy_answers_from_it(day_module, fake_llm, fake_embedder, tmp_path):
+    hr_copilot = day_module("Day 6", "hr_copilot")
+    (tmp_path / "leave.md").write_text("# Leave\n- Employees get 20 days of annual leave.\n")
+    copilot = make_copilot(hr_copilot, fake_llm, fake_embedder, tmp_path)
+
+    assert copilot.run("How many vacation days do I get?").intent == "leave"
+
+
+def test_cache_hit_recomputes_dated_action(day_module, fake_llm, fake_embedder, tmp_path, monkeypatch):
+    hr_copilot = day_module("Day 6", "hr_copilot")
+    copilot = make_copilot(hr_copilot, fake_llm, fake_embedder, tmp_path)
+    first = copilot.run("Set up an interview with the candidate")
+
+    monkeypatch.setattr(hr_copilot, "suggest_action", lambda intent: f"new action for {intent}")
+    second = copilot.run("Set up an interview with the candidate")
+
+    assert second.response == first.response
+    assert second.action == "new action for interview"
+    assert copilot.answer_cache.stats["hits"] == 1
@@ -0,0 +1,57 @@
+from agentkit.hybrid import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+def make_index():
+    index = BM25Index()
+    index.add("leave", "Employees get 20 days of annual leave per year")
+    index.add("sick", "Sick leave needs a doctor's note after 3 days")
+    index.add("pay", "Salaries are paid on the last working day of the month")
+    return index
+
+
+def test_tokenize_drops_stopwords_and_punctuation():
+    assert tokenize("How many days of Annual-Leave do I get?") == ["many", "days", "annual", "leave", "get"]
+
+
+def test_search_ranks_by_term_overlap():
+    keys = [key for key, _ in make_index().search("annual leave days")]
+    assert keys[0] == "leave"
+    assert "pay" not in keys
+
+
+def test_allowed_limits_results():
+    keys = [key for key, _ in make_index().search("leave", allowed={"sick"})]
+    assert keys == ["sick"]
+
+
+def test_boost_terms_break_ties():
+    index = BM25Index()
+    index.add("a", "policy update")
+    index.add("b", "policy salary")
+    assert index.search("policy", boost_terms=["salary"])[0][0] == "b"
+
+
+def test_remove_and_replace_update_postings():
+    index = make_index()
+    index.remove("pay")
+    assert index.search("salaries") == []
+    assert len(index) == 2
+
+    index.add("sick", "Remote work is allowed twice a week")
+    assert index.search("doctor") == []
+    assert index.search("remote")[0][0] == "sick"
+    assert len(index) == 2
+    assert "doctor" not in index._postings
+
+
+def test_remove_unknown_key_is_a_no_op():
+    index = make_index()
+    index.remove("nope")
+    assert len(index) == 3
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "c", "d"]])
+    assert fused[0] == "b"
+    assert set(fused) == {"a", "b", "c", "d"}
+    assert fused.index("c") < fused.index("d")
@@ -0,0 +1,114 @@
+import faiss
+import numpy as np
+import pytest
+from langchain.schema import Document
+from langchain.vectorstores import FAISS
+
+from agentkit import bench_index, index_factory, resources
+from agentkit.fakes import FakeEmbeddings
+from agentkit.index_manager import IndexManager
+
+
+def clustered(n_major=2000, n_minor=5, dim=16, seed=0):
+    """Most vectors around one direction, a small "tenant" around the opposite one."""
+    rng = np.random.default_rng(seed)
+    axis = np.zeros(dim, dtype="float32")
+    axis[0] = 4.0
+    major = axis + rng.normal(size=(n_major, dim)).astype("float32")
+    minor = -axis + rng.normal(size=(n_minor, dim)).astype("float32")
+    return np.vstack([major, minor]).astype("float32")
+
+
+def test_small_scope_on_ivf_still_finds_its_vectors():
+    vectors = clustered()
+    index, kind = index_factory.build_index(vectors, kind="ivf_flat")
+    assert kind == "ivf_flat"
+    tenant = np.arange(2000, 2005)
+    query = vectors[:1]
+
+    # A selector alone only sees the nprobe lists nearest the query.
+    params = index_factory.search_params(index, faiss.IDSelectorBatch(tenant))
+    _, labels = index.search(query, 3, params=params)
+    assert (labels == -1).all()
+
+    _, labels = index_factory.search_scoped(index, query, 3, tenant)
+    assert set(labels[0].tolist()) <= set(tenant.tolist())
+    assert (labels != -1).all()
+
+
+def test_scoped_search_on_flat_matches_filtering():
+    vectors = clustered(n_major=200)
+    index, _ = index_factory.build_index(vectors, kind="flat")
+    allowed = np.arange(0, 200, 2)
+    _, labels = index_factory.search_scoped(index, vectors[:1], 5, allowed)
+    _, everything = index.search(vectors[:1], 200)
+    assert labels[0].tolist() == [i for i in everything[0].tolist() if i % 2 == 0][:5]
+
+
+def test_bench_from_corpus_uses_stored_vectors(fake_embedder, monkeypatch, tmp_path):
+    corpus = IndexManager(fake_embedder, root=str(tmp_path / "corpus"))
+    corpus.upsert("t/a", [Document(page_content="sick leave"), Document(page_content="payroll")], "v1")
+    questions = tmp_path / "questions.txt"
+    questions.write_text("how many sick days?\n", encoding="utf-8")
+
+    monkeypatch.setattr(resources, "local_embedder", lambda model_name: fake_embedder)
+    embedded = fake_embedder.texts_embedded
+    vectors, queries = bench_index.from_corpus(str(tmp_path / "corpus"), str(questions), "local-model")
+    assert np.allclose(vectors, corpus.vectors()[1])
+    assert queries.shape == (1, 64)
+    assert fake_embedder.texts_embedded == embedded + 1  # only the question
+
+    monkeypatch.setattr(resources, "local_embedder", lambda model_name: FakeEmbeddings(dim=32))
+    with pytest.raises(ValueError):
+        bench_index.from_corpus(str(tmp_path / "corpus"), str(questions), "other-model")
+
+
+def test_choose_kind_grows_with_the_corpus(monkeypatch):
+    monkeypatch.setattr(index_factory, "FORCED_KIND", None)
+    assert index_factory.choose_kind(1_000) == "flat"
+    assert index_factory.choose_kind(100_000) == "ivf_flat"
+    assert index_factory.choose_kind(1_000_000) == "ivf_sq8"
+    assert index_factory.choose_kind(5_000_000) == "ivf_pq"
+    assert index_factory.choose_kind(500_000, mutable=False) == "hnsw"
+    monkeypatch.setattr(index_factory, "FORCED_KIND", "hnsw")
+    assert index_factory.choose_kind(10) == "flat"  # HNSW can't remove ids
+
+
+def test_build_index_keeps_ids_and_falls_back_to_flat_when_untrainable():
+    vectors = clustered(n_major=100, n_minor=0)
+    index, kind = index_factory.build_index(vectors, ids=np.arange(500, 600), kind="ivf_pq")
+    assert kind == "flat"  # too few points to train PQ codebooks
+    _, labels = index.search(vectors[7:8], 1)
+    assert labels[0][0] == 507
+
+    vectors = clustered(n_major=2000, n_minor=0)
+    index, kind = index_factory.build_index(vectors, ids=np.arange(10_000, 12_000), kind="ivf_sq8")
+    assert kind == "ivf_sq8"
+    assert sorted(index_factory.index_ids(index).tolist()) == list(range(10_000, 12_000))
+
+
+def test_optimize_vectorstore_keeps_positions(fake_embedder):
+    texts = [f"policy clause {i} about topic {i % 7}" for i in range(300)]
+    vectordb = FAISS.from_texts(texts, fake_embedder)
+    index_factory.optimize_vectorstore(vectordb, kind="ivf_flat")
+    assert faiss.try_extract_index_ivf(vectordb.index) is not None
+    (doc,) = vectordb.similarity_search(texts[42], k=1)
+    assert doc.page_content == texts[42]
+
+
+def test_corpus_rebuild_to_ivf_keeps_vector_ids(fake_embedder, tmp_path):
+    corpus = IndexManager(fake_embedder, root=str(tmp_path))
+    corpus.upsert("t/a", [Document(page_content=f"clause {i} on leave and pay {i % 9}") for i in range(300)], "v1")
+    corpus.remove("t/a")  # ids never restart: the next document starts at 300
+    corpus.upsert("t/b", [Document(page_content=f"rule {i} on travel {i % 5}") for i in range(300)], "v1")
+    before = sorted(corpus.vector_ids(["t/b"]))
+
+    corpus.rebuild("ivf_flat")
+    assert corpus.manifest["index"]["kind"] == "ivf_flat"
+    assert sorted(index_factory.index_ids(corpus.index).tolist()) == before
+    reloaded = IndexManager(root=str(tmp_path))
+    assert sorted(index_factory.index_ids(reloaded.index).tolist()) == before
+    vid = before[17]
+    ids, vectors = reloaded.vectors(["t/b"])
+    _, labels = index_factory.search_scoped(reloaded.index, vectors[ids.index(vid)][None, :], 1, [vid])
+    assert labels[0][0] == vid
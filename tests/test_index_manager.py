@@ -0,0 +1,125 @@
+import os
+import threading
+
+from langchain.schema import Document
+
+from agentkit.index_factory import index_ids
+from agentkit.index_manager import IndexManager
+
+
+def chunks(*texts):
+    return [Document(page_content=t, metadata={"page": i}) for i, t in enumerate(texts)]
+
+
+def test_upsert_adds_and_removes_only_changed_chunks(fake_embedder, tmp_path):
+    corpus = IndexManager(fake_embedder, root=str(tmp_path))
+    assert corpus.upsert("t/a", chunks("sick leave", "annual leave", "payroll"), "v1") == (3, 0)
+
+    embedded = fake_embedder.texts_embedded
+    assert corpus.upsert("t/a", chunks("sick leave", "annual leave", "parental leave"), "v2") == (1, 1)
+    assert fake_embedder.texts_embedded == embedded + 1
+    assert corpus.index.ntotal == 3
+    assert corpus.version("t/a")["version"] == 2
+
+
+def test_same_version_is_a_no_op(fake_embedder, tmp_path):
+    corpus = IndexManager(fake_embedder, root=str(tmp_path))
+    corpus.upsert("t/a", chunks("sick leave"), "v1")
+    assert corpus.upsert("t/a", chunks("something else"), "v1") == (0, 0)
+    assert corpus.is_current("t/a", "v1")
+
+
+def test_reload_restores_documents_and_vector_ids(fake_embedder, tmp_path):
+    corpus = IndexManager(fake_embedder, root=str(tmp_path))
+    corpus.upsert("t/a", chunks("sick leave", "annual leave"), "v1", metadata={"tenant": "t"})
+    corpus.upsert("u/b", chunks("payroll"), "v1", metadata={"tenant": "u"})
+
+    reloaded = IndexManager(fake_embedder, root=str(tmp_path))
+    assert reloaded.documents(tenant="t") == ["t/a"]
+    assert reloaded.index.ntotal == 3
+    assert sorted(reloaded.vector_ids(["t/a", "u/b"])) == [0, 1, 2]
+    assert reloaded.upsert("t/c", chunks("overtime"), "v1") == (1, 0)
+    assert reloaded.vector_ids(["t/c"]) == [3]
+
+
+def test_remove_drops_every_vector_of_a_document(fake_embedder, tmp_path):
+    corpus = IndexManager(fake_embedder, root=str(tmp_path))
+    corpus.upsert("t/a", chunks("sick leave", "annual leave"), "v1")
+    assert corpus.remove("t/a") == 2
+    assert corpus.index.ntotal == 0
+    assert corpus.version("t/a") is None
+
+
+def test_caller_metadata_may_contain_doc_id(fake_embedder, tmp_path):
+    corpus = IndexManager(fake_embedder, root=str(tmp_path))
+    corpus.upsert("t/a", chunks("sick leave"), "v1", metadata={"doc_id": "other", "tenant": "t"})
+    (vid,) = corpus.vector_ids(["t/a"])
+    assert corpus.chunk(vid).metadata == {"page": 0, "tenant": "t", "doc_id": "t/a"}
+
+
+def test_subscribers_see_adds_and_removes(fake_embedder, tmp_path):
+    corpus = IndexManager(fake_embedder, root=str(tmp_path))
+    corpus.upsert("t/a", chunks("sick leave"), "v1")
+    events = []
+    corpus.subscribe(lambda added, removed: events.append((sorted(added), removed)))
+    corpus.upsert("t/a", chunks("annual leave"), "v2")
+    assert events == [([0], []), ([], [0]), ([1], [])]
+
+
+def test_embedding_happens_outside_the_corpus_lock(fake_embedder, tmp_path):
+    corpus = IndexManager(fake_embedder, root=str(tmp_path))
+    corpus.upsert("t/a", chunks("sick leave"), "v1")
+    embedding, release = threading.Event(), threading.Event()
+
+    class SlowEmbeddings:
+        def embed_documents(self, texts):
+            embedding.set()
+            release.wait(5)
+            return fake_embedder.embed_documents(texts)
+
+    upload = threading.Thread(target=corpus.upsert, args=("t/b", chunks("payroll"), "v1"),
+                              kwargs={"embedder": SlowEmbeddings()})
+    upload.start()
+    assert embedding.wait(5)
+    # A search needs the lock: it must not wait for the upload's embedding.
+    assert corpus.lock.acquire(timeout=1)
+    corpus.lock.release()
+    release.set()
+    upload.join(5)
+    assert corpus.index.ntotal == 2
+
+
+def test_each_change_rewrites_only_its_document_file(fake_embedder, tmp_path):
+    corpus = IndexManager(fake_embedder, root=str(tmp_path))
+    corpus.upsert("t/a", chunks("sick leave"), "v1")
+    corpus.upsert("u/b", chunks("payroll"), "v1")
+    b_file = corpus.version("u/b")["file"]
+    before = os.path.getmtime(tmp_path / "docs" / b_file)
+
+    corpus.upsert("t/a", chunks("sick leave", "annual leave"), "v2")
+    files = sorted(os.listdir(tmp_path / "docs"))
+    assert files == sorted([corpus.version("t/a")["file"], b_file])
+    assert os.path.getmtime(tmp_path / "docs" / b_file) == before
+    assert not os.path.exists(tmp_path / "index.faiss")  # checkpoint not due yet
+
+
+def test_reload_reconciles_a_stale_index_checkpoint(fake_embedder, tmp_path):
+    corpus = IndexManager(fake_embedder, root=str(tmp_path))
+    corpus.upsert("t/a", chunks("sick leave", "payroll"), "v1")
+    corpus.save()
+    corpus.upsert("t/a", chunks("sick leave", "overtime"), "v2")
+
+    reloaded = IndexManager(root=str(tmp_path))
+    assert sorted(index_ids(reloaded.index).tolist()) == sorted(reloaded.vector_ids(["t/a"])) == [0, 2]
+    assert [reloaded.chunk(v).page_content for v in sorted(reloaded.vector_ids(["t/a"]))] == ["sick leave", "overtime"]
+
+
+def test_rebuild_uses_stored_vectors_without_an_embedder(fake_embedder, tmp_path):
+    corpus = IndexManager(fake_embedder, root=str(tmp_path))
+    corpus.upsert("t/a", chunks("sick leave", "payroll"), "v1")
+    reloaded = IndexManager(root=str(tmp_path))
+    reloaded.rebuild("flat")
+    ids, vectors = reloaded.vectors()
+    assert sorted(ids) == [0, 1]
+    _, labels = reloaded.index.search(vectors[:1], 1)
+    assert labels[0][0] == ids[0]
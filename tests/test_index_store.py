@@ -0,0 +1,63 @@
+import os
+
+from langchain.vectorstores import FAISS
+
+from agentkit.index_store import IndexStore, index_key
+
+
+def store_of(texts, embedder):
+    return FAISS.from_texts(texts, embedder, metadatas=[{"page": i} for i in range(len(texts))])
+
+
+def test_key_covers_bytes_chunking_and_model():
+    key = index_key(b"handbook", 600, 100, "m")
+    assert key == index_key(b"handbook", 600, 100, "m")
+    assert len({key, index_key(b"handbook!", 600, 100, "m"), index_key(b"handbook", 500, 100, "m"),
+                index_key(b"handbook", 600, 50, "m"), index_key(b"handbook", 600, 100, "other")}) == 5
+
+
+def test_round_trip_keeps_vectors_texts_and_metadata(fake_embedder, tmp_path):
+    store = IndexStore(str(tmp_path))
+    store.save("k", store_of(["sick leave is 12 days", "payslips arrive monthly"], fake_embedder))
+
+    loaded = store.load("k", fake_embedder)
+    (doc,) = loaded.similarity_search("payslips arrive monthly", k=1)
+    assert doc.page_content == "payslips arrive monthly"
+    assert doc.metadata == {"page": 1}
+    assert store.load("missing", fake_embedder) is None
+
+
+def test_get_or_build_only_builds_on_a_miss(fake_embedder, tmp_path):
+    store = IndexStore(str(tmp_path))
+    builds = []
+
+    def build():
+        builds.append(1)
+        return store_of(["overtime"], fake_embedder)
+
+    store.get_or_build("k", fake_embedder, build)
+    store.get_or_build("k", fake_embedder, build)
+    assert len(builds) == 1
+
+
+def test_corrupt_entry_is_dropped(fake_embedder, tmp_path):
+    store = IndexStore(str(tmp_path))
+    store.save("k", store_of(["overtime"], fake_embedder))
+    with open(tmp_path / "k" / "index.faiss", "wb") as f:
+        f.write(b"not an index")
+    assert store.load("k", fake_embedder) is None
+    assert "k" not in store
+
+
+def test_eviction_drops_least_recently_used_entries(fake_embedder, tmp_path):
+    store = IndexStore(str(tmp_path), max_bytes=10**9)
+    for i, key in enumerate(["old", "used", "new"]):
+        store.save(key, store_of([f"policy {key}"], fake_embedder))
+        os.utime(tmp_path / key, (1000 + i, 1000 + i))
+    store.load("old", fake_embedder)  # touched: now the most recent
+
+    entry_bytes = sum(os.path.getsize(tmp_path / "new" / name) for name in os.listdir(tmp_path / "new"))
+    store.max_bytes = 2 * entry_bytes
+    store.evict()
+    assert "used" not in store
+    assert "old" in store and "new" in store
@@ -0,0 +1,41 @@
+import threading
+
+from agentkit.bench import write_pdf
+from agentkit.ingest import batched, iter_chunks, iter_pdf_pages
+
+
+def make_pdf(tmp_path, pages):
+    path = str(tmp_path / "doc.pdf")
+    write_pdf([f"Page {i} about leave" for i in range(pages)], path)
+    return path
+
+
+def test_pages_come_back_in_order(tmp_path):
+    path = make_pdf(tmp_path, 30)
+    docs = list(iter_pdf_pages(path, workers=3, pages_per_task=4))
+    assert [d.metadata["page"] for d in docs] == list(range(30))
+    assert docs[7].page_content.startswith("Page 7")
+    assert docs[0].metadata["source"] == "doc.pdf"
+
+
+def test_concurrent_callers_from_threads(tmp_path):
+    path = make_pdf(tmp_path, 20)
+    counts = []
+    threads = [threading.Thread(target=lambda: counts.append(len(list(iter_pdf_pages(path, pages_per_task=4)))))
+               for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert counts == [20] * 4
+
+
+def test_chunks_keep_page_metadata(tmp_path):
+    path = make_pdf(tmp_path, 2)
+    chunks = list(iter_chunks(iter_pdf_pages(path), chunk_size=10, chunk_overlap=0))
+    assert len(chunks) > 2
+    assert {c.metadata["page"] for c in chunks} == {0, 1}
+
+
+def test_batched():
+    assert list(batched(range(5), 2)) == [[0, 1], [2, 3], [4]]
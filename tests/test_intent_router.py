@@ -0,0 +1,29 @@
+from agentkit.intent_router import CentroidClassifier, IntentRouter, KeywordMatcher
+
+KEYWORDS = {"leave": ["leave", "day off"], "payslip": ["payslip", "salary"]}
+EXAMPLES = {
+    "leave": ["annual leave days", "sick leave days request"],
+    "payslip": ["payslip salary month", "payroll salary payment"],
+}
+
+
+def test_keyword_matches_at_word_start():
+    matcher = KeywordMatcher(KEYWORDS)
+    assert matcher.labels("How many leaves do I have?") == ["leave"]
+    assert matcher.labels("my sleeve is torn") == []
+    assert sorted(matcher.labels("salary during leave")) == ["leave", "payslip"]
+
+
+def test_single_keyword_label_wins_without_embedding(fake_embedder):
+    router = IntentRouter(KeywordMatcher(KEYWORDS), CentroidClassifier(fake_embedder, EXAMPLES))
+    before = fake_embedder.texts_embedded
+    route = router.route("Can I take a day off?")
+    assert (route.intent, route.source) == ("leave", "keyword")
+    assert fake_embedder.texts_embedded == before
+
+
+def test_embedding_tier_and_fallback(fake_embedder):
+    router = IntentRouter(KeywordMatcher(KEYWORDS), CentroidClassifier(fake_embedder, EXAMPLES), min_score=0.3)
+    assert router.route("payroll payment month").intent == "payslip"
+    assert router.route("zebra quantum lighthouse").source == "fallback"
+    assert IntentRouter(KeywordMatcher(KEYWORDS)).route("payroll payment").source == "fallback"
@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from agentkit.llm_client import AsyncLLMClient, AsyncTokenBucket, is_rate_limit, is_transient
+
+
+class ResourceExhausted(Exception):
+    """Same class name as the Gemini SDK's 429."""
+
+
+class ScriptedModel:
+    """Async chat model that raises the queued ``errors`` first, then streams."""
+
+    model = "scripted"
+
+    def __init__(self, errors=(), delay=0.0, tokens=("Annual ", "leave ", "is 20 days."), fail_after=None):
+        self.errors = list(errors)
+        self.delay = delay
+        self.tokens = tokens
+        self.fail_after = fail_after
+        self.calls = 0
+
+    async def astream(self, prompt, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        await asyncio.sleep(self.delay)
+        for i, token in enumerate(self.tokens):
+            if i == self.fail_after:
+                raise TimeoutError("stream broke")
+            yield AIMessageChunk(content=token)
+
+
+def test_error_classification():
+    assert is_rate_limit(ResourceExhausted()) and is_transient(ResourceExhausted())
+    assert is_rate_limit(RuntimeError("HTTP 429 Too Many Requests"))
+    assert is_transient(TimeoutError()) and not is_transient(ValueError())
+
+
+def test_invoke_and_stream_return_the_model_output():
+    client = AsyncLLMClient(ScriptedModel())
+    assert client.invoke("q").content == "Annual leave is 20 days."
+    assert [c.content for c in client.stream("q")] == ["Annual ", "leave ", "is 20 days."]
+
+
+def test_identical_in_flight_prompts_share_one_call():
+    model = ScriptedModel(delay=0.2)
+    client = AsyncLLMClient(model)
+    replies = []
+    threads = [threading.Thread(target=lambda: replies.append(client.invoke("same").content)) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert replies == ["Annual leave is 20 days."] * 4
+    assert model.calls == 1
+
+    client.invoke("different")
+    assert model.calls == 2
+
+
+def test_transient_errors_are_retried_before_the_first_token():
+    model = ScriptedModel(errors=[TimeoutError(), ResourceExhausted()])
+    bucket = AsyncTokenBucket(rate=1000, capacity=10)
+    client = AsyncLLMClient(model, bucket, base_delay=0)
+    assert client.invoke("q").content == "Annual leave is 20 days."
+    assert model.calls == 3
+    # The 429 halved the rate; the success gave 5% of it back.
+    assert bucket.rate == pytest.approx(1000 * 0.55)
+
+
+def test_permanent_and_mid_stream_errors_are_not_retried():
+    model = ScriptedModel(errors=[ValueError("bad request")])
+    with pytest.raises(ValueError):
+        AsyncLLMClient(model, base_delay=0).invoke("q")
+    assert model.calls == 1
+
+    model = ScriptedModel(fail_after=1)
+    with pytest.raises(TimeoutError):
+        AsyncLLMClient(model, base_delay=0).invoke("q")
+    assert model.calls == 1
+
+
+def test_bucket_spaces_out_calls():
+    client = AsyncLLMClient(ScriptedModel(), AsyncTokenBucket(rate=10, capacity=1))
+    start = time.perf_counter()
+    for i in range(3):
+        client.invoke(f"q{i}")
+    assert time.perf_counter() - start >= 0.18
+
+
+def test_bucket_rate_never_drops_below_the_floor():
+    bucket = AsyncTokenBucket(rate=8)
+    for _ in range(10):
+        bucket.throttled()
+    assert bucket.rate == pytest.approx(1.0)
+    for _ in range(100):
+        bucket.succeeded()
+    assert bucket.rate == pytest.approx(8.0)
+
+
+def test_retry_only_retries_what_retry_if_accepts():
+    from agentkit.ratelimit import retry
+
+    calls = []
+
+    @retry(retries=3, base_delay=0, retry_if=is_transient)
+    def step(exc):
+        calls.append(exc)
+        raise exc
+
+    with pytest.raises(FileNotFoundError):
+        step(FileNotFoundError("report.pdf"))
+    assert len(calls) == 1
+    with pytest.raises(TimeoutError):
+        step(TimeoutError())
+    assert len(calls) == 1 + 4
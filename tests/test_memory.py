@@ -0,0 +1,55 @@
+from agentkit.memory import ConversationMemory, HistoryStore, extractive_summary, llm_summarizer
+
+
+def fill(memory, count):
+    for i in range(count):
+        memory.add("user" if i % 2 == 0 else "assistant", f"Message {i}. More detail here.")
+
+
+def test_window_folds_in_batches_into_the_summary():
+    memory = ConversationMemory(window=4, fold=2)
+    fill(memory, 5)
+    assert [m["seq"] for m in memory.messages] == [1, 2, 3, 4, 5]
+
+    memory.add("user", "Message 5.")
+    assert [m["seq"] for m in memory.messages] == [3, 4, 5, 6]
+    assert memory.folded == 2
+    assert memory.summary == "- user: Message 0.\n- assistant: Message 1."
+    assert len(memory) == 6
+
+
+def test_extractive_summary_stays_under_budget():
+    messages = [{"role": "user", "text": "word " * 40 + "."} for _ in range(20)]
+    summary = extractive_summary("", messages, max_tokens=60)
+    assert 0 < len(summary.splitlines()) < 20
+
+
+def test_llm_summarizer_falls_back_when_the_call_fails():
+    class Broken:
+        def invoke(self, prompt):
+            raise RuntimeError("quota")
+
+    messages = [{"role": "user", "text": "Can I carry over leave? Thanks."}]
+    assert llm_summarizer(Broken())("", messages) == "- user: Can I carry over leave?"
+
+
+def test_context_has_summary_then_window():
+    memory = ConversationMemory(window=2, fold=1)
+    fill(memory, 3)
+    assert memory.context(summary_label="Earlier") == [
+        "Earlier:\n- user: Message 0.", "Message 1. More detail here.", "Message 2. More detail here.",
+    ]
+
+
+def test_history_store_reopens_a_conversation(tmp_path):
+    store = HistoryStore(str(tmp_path / "chat.sqlite3"))
+    memory = ConversationMemory("c1", store=store, window=4, fold=2)
+    fill(memory, 7)
+
+    reopened = ConversationMemory("c1", store=HistoryStore(str(tmp_path / "chat.sqlite3")), window=4, fold=2)
+    assert reopened.summary == memory.summary
+    assert [m["seq"] for m in reopened.messages] == [m["seq"] for m in memory.messages]
+    assert reopened.add("user", "next")["seq"] == 8
+
+    reopened.clear()
+    assert ConversationMemory("c1", store=store).last_seq == 0
@@ -0,0 +1,64 @@
+from agentkit.policy_store import PolicyStore, split_policy
+
+LEAVE = """*Leave Policy*
+- Annual Leave: 20 days per year, accrued monthly.
+- Sick Leave: 10 days per year, fully paid.
+
+## Applying
+To apply, submit a request via the HR portal
+at least 5 days in advance.
+"""
+PAYSLIP = """# Payslips
+- Salaries are paid on the last working day of the month.
+- Payslips are available in the payroll portal.
+"""
+
+
+def test_split_policy_uses_title_headings_bullets_and_paragraphs():
+    title, sections = split_policy("leave", LEAVE)
+    assert title == "Leave Policy"
+    assert [s.text for s in sections] == [
+        "- Annual Leave: 20 days per year, accrued monthly.",
+        "- Sick Leave: 10 days per year, fully paid.",
+        "To apply, submit a request via the HR portal\nat least 5 days in advance.",
+    ]
+    assert [s.heading for s in sections] == [None, None, "Applying"]
+    assert [s.key for s in sections] == ["leave#0", "leave#1", "leave#2"]
+
+
+def make_store(tmp_path, embedder=None, **kwargs):
+    (tmp_path / "leave.md").write_text(LEAVE)
+    (tmp_path / "payslip.md").write_text(PAYSLIP)
+    (tmp_path / "notes.json").write_text("{}")
+    return PolicyStore.from_dir(str(tmp_path), embedder, **kwargs)
+
+
+def test_from_dir_loads_policy_files_only(tmp_path, fake_embedder):
+    store = make_store(tmp_path, fake_embedder)
+    assert store.names == ["leave", "payslip"]
+    assert len(store.sections) == 5
+
+
+def test_context_picks_relevant_sections_in_document_order(tmp_path, fake_embedder):
+    store = make_store(tmp_path, fake_embedder, top_k=2)
+    text = store.context("how many sick leave days per year")
+    assert text.startswith("*Leave Policy*")
+    assert "Sick Leave" in text
+    assert "Salaries" not in text
+
+
+def test_token_budget_and_policy_filter(tmp_path):
+    store = make_store(tmp_path, token_budget=15)
+    sections = store.select("paid days portal", policies=["payslip"])
+    assert sections and all(s.policy == "payslip" for s in sections)
+    assert sum(s.tokens for s in sections) <= 15
+
+
+def test_version_changes_with_policy_text(tmp_path):
+    store = make_store(tmp_path)
+    before = store.version
+    store.add("leave", LEAVE.replace("20 days", "25 days"))
+    store.build()
+    assert store.version != before
+    assert any("25 days" in s.text for s in store.sections.values())
+    assert len(store.sections) == 5
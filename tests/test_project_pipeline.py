@@ -0,0 +1,10 @@
+def test_timeline_context_is_retrieved_with_project_facts_only(day_module, fake_llm, monkeypatch, tmp_path):
+    pipeline = day_module("Day 10", "project_pipeline")
+    project = pipeline.make_project(str(tmp_path / "farm"), "Smart Farm", "Asha, Ravi", 8, "ECE", "IoT")
+    pipeline.create_scaffold(project)
+    queries = []
+    monkeypatch.setattr(pipeline, "project_context", lambda project, query: queries.append(query) or "")
+
+    phases = pipeline.TimelineAgent(fake_llm).run(project)
+    assert phases
+    assert queries == ["Smart Farm: IoT project over 8 weeks"]
@@ -0,0 +1,28 @@
+import io
+import zipfile
+
+from agentkit.reports import consolidated_pdf, iter_zip, pdf_safe, write_report
+
+
+def test_write_report_writes_text_and_pdf_from_one_render(tmp_path):
+    base = str(tmp_path / "report")
+    data = write_report(base, "Title ✅\nLine two")
+    assert data.startswith(b"%PDF")
+    assert (tmp_path / "report.pdf").read_bytes() == data
+    assert (tmp_path / "report.txt").read_text(encoding="utf-8") == "Title ✅\nLine two"
+    assert pdf_safe("Title ✅") == "Title "
+
+
+def test_consolidated_pdf_has_a_page_per_report():
+    assert b"/Count 3" in consolidated_pdf(["one", "two", "three"])
+
+
+def test_iter_zip_streams_bytes_and_files(tmp_path):
+    big = tmp_path / "big.txt"
+    big.write_bytes(b"x" * 300_000)
+    chunks = list(iter_zip([("a.txt", b"hello"), ("dir/big.txt", str(big))], chunk_size=4096))
+    assert len(chunks) > 2
+    with zipfile.ZipFile(io.BytesIO(b"".join(chunks))) as archive:
+        assert archive.namelist() == ["a.txt", "dir/big.txt"]
+        assert archive.read("a.txt") == b"hello"
+        assert archive.read("dir/big.txt") == big.read_bytes()
@@ -0,0 +1,49 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from agentkit import resources
+
+
+def test_concurrent_first_callers_create_the_resource_once():
+    created = []
+
+    def factory():
+        time.sleep(0.05)
+        created.append(object())
+        return created[-1]
+
+    key = ("test-once", time.perf_counter_ns())
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda _: resources.get_or_create(key, factory), range(8)))
+    assert len(created) == 1
+    assert all(r is created[0] for r in results)
+    assert key in resources.loaded()
+
+
+def test_a_slow_resource_does_not_block_others():
+    release = threading.Event()
+    slow = ("test-slow", time.perf_counter_ns())
+    loading = threading.Thread(target=resources.get_or_create, args=(slow, lambda: release.wait(5)))
+    loading.start()
+    try:
+        start = time.perf_counter()
+        assert resources.get_or_create(("test-fast", time.perf_counter_ns()), lambda: "fast") == "fast"
+        assert time.perf_counter() - start < 1
+    finally:
+        release.set()
+        loading.join()
+
+
+def test_keys_never_contain_the_raw_api_key():
+    assert resources._key_id("secret-key") == resources._key_id("secret-key")
+    assert "secret" not in resources._key_id("secret-key")
+    assert resources._key_id("a") != resources._key_id("b")
+
+
+def test_warm_up_runs_loaders_in_the_background():
+    key = ("test-warm", time.perf_counter_ns())
+    thread = resources.warm_up(lambda: resources.get_or_create(key, lambda: "model"))
+    thread.join(5)
+    assert resources.get_or_create(key, lambda: "second copy") == "model"
+    assert resources.warm_up(lambda: None, background=False) is None
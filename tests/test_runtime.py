@@ -0,0 +1,91 @@
+import threading
+
+import pytest
+
+from agentkit import runtime
+from agentkit.runtime import Agent, AgentRuntime
+
+
+class Echo(Agent):
+    name = "echo"
+
+    def run(self, text):
+        self.last_ttft = len(text)
+        return text
+
+
+def test_components_are_built_lazily_and_once():
+    built = []
+    agents = AgentRuntime("test").register("echo", lambda: built.append(1) or Echo())
+    assert built == [] and agents.names == ["echo"]
+    assert agents.run("echo", "hi") == "hi"
+    assert agents["echo"] is agents["echo"]
+    assert built == [1]
+    assert "agent:test.echo" in runtime.startup_times()
+
+
+def test_factories_can_depend_on_other_components():
+    agents = AgentRuntime("deps")
+    agents.register("config", lambda: {"greeting": "hello"})
+    agents.register("greeter", lambda: agents["config"]["greeting"])
+    assert agents.warm_up()["greeter"] == "hello"
+
+
+def test_base_agent_run_is_abstract():
+    with pytest.raises(NotImplementedError):
+        Agent().run()
+
+
+def test_last_ttft_is_per_thread():
+    agent = Echo()
+    agent.run("main")
+    seen = []
+    thread = threading.Thread(target=lambda: seen.append(agent.last_ttft) or agent.run("worker thread"))
+    thread.start()
+    thread.join()
+    assert seen == [None]
+    assert agent.last_ttft == 4
+
+
+def test_shared_runtime_per_name_and_key():
+    builds = []
+
+    def build():
+        builds.append(1)
+        return AgentRuntime("shared")
+
+    a = runtime.shared("test-shared", "key-1", build)
+    assert runtime.shared("test-shared", "key-1", build) is a
+    assert runtime.shared("test-shared", "key-2", build) is not a
+    assert len(builds) == 2
+
+
+def test_day7_runtimes_share_one_corpus(day_module, fake_llm, fake_embedder, tmp_path):
+    hr_agents = day_module("Day 7", "hr_agents")
+    root = str(tmp_path / "corpus")
+    first = hr_agents.build_agents(fake_llm, fake_embedder, root=root).warm_up()
+    second = hr_agents.build_agents(fake_llm, fake_embedder, root=root + "/").warm_up()
+    assert first["retrieval_service"] is second["retrieval_service"]
+    assert first["answer_cache"] is second["answer_cache"]
+    assert hr_agents.build_agents(fake_llm, fake_embedder, root=str(tmp_path / "other"))["retrieval_service"] \
+        is not first["retrieval_service"]
+
+
+def test_day7_shared_corpus_embeds_with_each_callers_embedder(day_module, fake_llm, tmp_path):
+    from agentkit.fakes import FakeEmbeddings
+
+    hr_agents = day_module("Day 7", "hr_agents")
+    root = str(tmp_path / "corpus")
+    alice, bob = FakeEmbeddings(dim=64), FakeEmbeddings(dim=64)
+    first = hr_agents.build_agents(fake_llm, alice, root=root)
+    second = hr_agents.build_agents(fake_llm, bob, root=root)
+    corpus = first["retrieval_service"].corpus
+
+    hr_agents.ingest_document(corpus, "acme", "leave.txt", b"Employees get 12 sick days a year.",
+                              embedder=first["embedder"])
+    uploaded = alice.texts_embedded
+    assert uploaded > 0 and bob.texts_embedded == 0
+
+    second.run("retrieval", "How many sick days do I get?", "acme")
+    assert alice.texts_embedded == uploaded
+    assert bob.texts_embedded > 0
@@ -0,0 +1,62 @@
+import threading
+
+from agentkit import tracing
+from agentkit.fakes import FakeChatModel
+from agentkit.streaming import MarkdownStream, TokenBuffer, stream_text, stream_with_context
+
+
+class Placeholder:
+    def __init__(self):
+        self.drawn = []
+
+    def markdown(self, text):
+        self.drawn.append(text)
+
+
+def test_stream_text_reports_every_token_and_time_to_first_token():
+    llm = FakeChatModel(first_token_latency=0.05, token_latency=0, reply_tokens=5)
+    tokens = []
+    with tracing.trace("test") as trace:
+        text, ttft = stream_text(llm, "How many sick days?", on_token=tokens.append)
+    assert "".join(tokens) == text and len(tokens) == 5
+    assert 0.05 <= ttft < 1
+    (span,) = [s for s in trace.spans if s.name == "llm"]
+    assert span.attrs["ttft_ms"] >= 50
+
+
+class RecordingChatModel(FakeChatModel):
+    prompts: list = []
+
+    def _tokens(self, messages):
+        self.prompts.append([m.content for m in messages])
+        return ["ok"]
+
+
+def test_stream_with_context_puts_the_context_in_the_prompt():
+    llm = RecordingChatModel(first_token_latency=0, prompts=[])
+    assert stream_with_context(llm, "Sick leave is 12 days.", "How many?")[0] == "ok"
+    ((system, human),) = llm.prompts
+    assert "Sick leave is 12 days." in system and human == "How many?"
+
+
+def test_markdown_stream_throttles_redraws():
+    placeholder = Placeholder()
+    stream = MarkdownStream(placeholder, interval=60)
+    for token in ["a", "b", "c"]:
+        stream(token)
+    assert stream.text == "abc"
+    assert placeholder.drawn == ["a ▌"]  # only the first token within the interval
+    assert stream.ttft is not None
+
+
+def test_token_buffer_collects_pushes_from_worker_threads():
+    buffer = TokenBuffer()
+    assert not buffer.changed()
+    workers = [threading.Thread(target=lambda: [buffer.push("x") for _ in range(100)]) for _ in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    assert buffer.text() == "x" * 400
+    assert buffer.changed()
+    assert not buffer.changed()
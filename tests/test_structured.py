@@ -0,0 +1,79 @@
+import pytest
+from langchain_core.messages import AIMessageChunk
+
+from agentkit.structured import (
+    JsonFieldStream, StructuredOutputError, extract_json, format_instructions, generate_structured, parse, validate,
+)
+
+SCHEMA = {
+    "type": "object",
+    "properties": {
+        "intent": {"type": "string", "enum": ["leave", "payslip"]},
+        "weeks": {"type": "integer", "minimum": 1},
+        "phases": {"type": "array", "items": {"type": "string", "minLength": 1}, "minItems": 1},
+    },
+    "required": ["intent", "weeks"],
+}
+
+
+class ScriptedLLM:
+    """Replies with the next canned text on every ``stream`` call."""
+
+    def __init__(self, *replies):
+        self.replies = list(replies)
+        self.prompts = []
+
+    def stream(self, prompt):
+        self.prompts.append(prompt)
+        text = self.replies.pop(0)
+        for i in range(0, len(text), 5):
+            yield AIMessageChunk(content=text[i:i + 5])
+
+
+def test_validate_reports_every_problem_with_a_path():
+    errors = validate({"intent": "bonus", "weeks": 0, "phases": [""]}, SCHEMA)
+    assert errors == [
+        "$.intent: 'bonus' is not one of ['leave', 'payslip']",
+        "$.weeks: below minimum 1",
+        "$.phases[0]: shorter than 1 characters",
+    ]
+    assert validate({"intent": "leave"}, SCHEMA) == ["$: missing 'weeks'"]
+    assert validate({"intent": "leave", "weeks": True}, SCHEMA) == ["$.weeks: expected integer, got bool"]
+
+
+def test_extract_json_tolerates_fences_and_prose():
+    assert extract_json('Sure!\n```json\n{"a": [1, 2]}\n```') == {"a": [1, 2]}
+    assert extract_json('Here you go: {"a": 1} hope that helps') == {"a": 1}
+    with pytest.raises(ValueError):
+        extract_json("no json here")
+
+
+def test_parse_runs_the_check_hook_only_on_valid_values():
+    value, errors = parse('{"intent": "leave", "weeks": 4}', SCHEMA, check=lambda v: ["too short"])
+    assert value["weeks"] == 4 and errors == ["too short"]
+    _, errors = parse('{"intent": "leave"}', SCHEMA, check=lambda v: pytest.fail("check called"))
+    assert errors == ["$: missing 'weeks'"]
+    assert parse("nope", SCHEMA)[1][0].startswith("invalid JSON")
+
+
+def test_generate_structured_repairs_once():
+    llm = ScriptedLLM('{"intent": "leave"}', '{"intent": "leave", "weeks": 2}')
+    value, _ = generate_structured(llm, "classify " + format_instructions(SCHEMA), SCHEMA)
+    assert value == {"intent": "leave", "weeks": 2}
+    assert "missing 'weeks'" in llm.prompts[1][-1].content
+
+
+def test_generate_structured_fails_fast_after_repair():
+    llm = ScriptedLLM("not json", '{"intent": "other", "weeks": 2}')
+    with pytest.raises(StructuredOutputError) as info:
+        generate_structured(llm, "classify", SCHEMA)
+    assert info.value.errors == ["$.intent: 'other' is not one of ['leave', 'payslip']"]
+    assert llm.replies == []
+
+
+def test_json_field_stream_forwards_one_field_across_split_tokens():
+    out = []
+    stream = JsonFieldStream("response", out.append)
+    for token in ['{"intent": "leave", "resp', 'onse": "Line one\\', 'nTab\\t caf\\u00', 'e9 \\"ok\\"', '", "x": "y"}']:
+        stream(token)
+    assert "".join(out) == 'Line one\nTab\t café "ok"'
@@ -0,0 +1,63 @@
+import json
+
+import pytest
+
+from agentkit import tracing
+from agentkit.dag import Node, run_dag
+
+
+def test_spans_nest_under_their_trace():
+    with tracing.trace("request", user="t") as t:
+        with tracing.span("retrieve") as outer:
+            with tracing.span("bm25_search"):
+                pass
+        tracing.record_tokens("fake-model", 10, 5)
+    names = [s.name for s in t.spans]
+    assert names == ["request", "retrieve", "bm25_search"]
+    by_name = {s.name: s for s in t.spans}
+    assert by_name["bm25_search"].parent_id == outer.span_id
+    assert t.depth(by_name["bm25_search"]) == 2
+    assert t.totals() == {"prompt_tokens": 10, "completion_tokens": 5}
+    assert tracing.last_trace("request") is t
+    assert json.loads(json.dumps(t.to_dict()))["spans"][0]["attrs"]["user"] == "t"
+
+
+def test_spans_follow_work_into_dag_worker_threads():
+    @tracing.traced("agent")
+    def agent():
+        return tracing.current_span().trace
+
+    with tracing.trace("workflow") as t:
+        results, _ = run_dag({"a": Node(agent), "b": Node(agent)})
+    assert results["a"] is t and results["b"] is t
+    assert sorted(s.name for s in t.spans) == ["agent", "agent", "workflow"]
+
+
+def test_errors_are_recorded_and_re_raised():
+    with pytest.raises(ValueError):
+        with tracing.trace("request") as t:
+            with tracing.span("parse"):
+                raise ValueError("bad json")
+    assert {s.name: s.error for s in t.spans} == {"request": "ValueError('bad json')",
+                                                  "parse": "ValueError('bad json')"}
+
+
+def test_prometheus_text_renders_counters_gauges_and_histograms():
+    metrics = tracing.Metrics(buckets=(0.1, 1.0))
+    metrics.inc("agentkit_cache_lookups_total", cache="answer", outcome="hit")
+    metrics.inc("agentkit_cache_lookups_total", cache="answer", outcome="hit")
+    metrics.set("agentkit_llm_in_flight", 3)
+    metrics.observe("agentkit_span_seconds", 0.5, span='say "hi"')
+    assert metrics.prometheus_text().splitlines() == [
+        "# TYPE agentkit_cache_lookups_total counter",
+        'agentkit_cache_lookups_total{cache="answer",outcome="hit"} 2',
+        "# TYPE agentkit_llm_in_flight gauge",
+        "agentkit_llm_in_flight 3",
+        "# TYPE agentkit_span_seconds histogram",
+        'agentkit_span_seconds_bucket{span="say \\"hi\\"",le="0.1"} 0',
+        'agentkit_span_seconds_bucket{span="say \\"hi\\"",le="1.0"} 1',
+        'agentkit_span_seconds_bucket{span="say \\"hi\\"",le="+Inf"} 1',
+        'agentkit_span_seconds_sum{span="say \\"hi\\""} 0.5',
+        'agentkit_span_seconds_count{span="say \\"hi\\""} 1',
+    ]
+    assert metrics.value("agentkit_cache_lookups_total", cache="answer", outcome="hit") == 2